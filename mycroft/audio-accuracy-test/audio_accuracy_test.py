@@ -51,7 +51,7 @@ class FileStream(object):
     def calc_progress(self):
         return float(self.file.tell()) / self.size
 
-    def read(self, chunk_size):
+    def read(self, chunk_size, of_exc=False):
 
         progress = self.calc_progress()
         if progress == 1.0:
@@ -0,0 +1,179 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+    Offline evaluation of the phrase end detection of the VAD engines.
+
+    Every mono wav file in the directory is recorded as a phrase by the
+    ResponsiveRecognizer, once for every VAD engine, and the time the
+    recording ended is compared with the end of the speech. The end of the
+    speech is read from a text file next to the wav file with the same
+    name, containing the time in seconds as its last number. Run from the
+    mycroft directory with
+
+        python audio-accuracy-test/vad_accuracy_test.py [directory]
+"""
+import argparse
+import os
+from glob import glob
+from os.path import join, splitext, isfile
+
+from speech_recognition import AudioSource
+
+from audio_accuracy_test import FileStream, bold_str, get_root_dir, \
+    to_percent
+from mycroft.client.speech.hotword_factory import HotWordEngine
+from mycroft.client.speech.mic import ResponsiveRecognizer
+from mycroft.client.speech.vad import VADFactory
+
+
+class PaddedFileStream(FileStream):
+    """ File stream followed by silence, so the phrase can end. """
+
+    def __init__(self, file_name, padding):
+        super(PaddedFileStream, self).__init__(file_name)
+        self.debug = False
+        self.padding = int(padding * self.sample_rate)
+        self.position = 0
+
+    def read(self, chunk_size, of_exc=False):
+        try:
+            data = super(PaddedFileStream, self).read(chunk_size)
+        except EOFError:
+            data = b''
+        missing = chunk_size - len(data) // self.sample_width
+        if missing > 0:
+            if self.padding <= 0:
+                raise EOFError
+            missing = min(missing, self.padding)
+            self.padding -= missing
+            data += b'\0' * (missing * self.sample_width)
+        self.position += len(data) // self.sample_width
+        return data
+
+    def get_time(self):
+        return float(self.position) / self.sample_rate
+
+
+class PaddedFileMicrophone(AudioSource):
+    def __init__(self, file_name, padding):
+        self.stream = PaddedFileStream(file_name, padding)
+        self.SAMPLE_RATE = self.stream.sample_rate
+        self.SAMPLE_WIDTH = self.stream.sample_width
+        self.CHUNK = 1024
+
+    def close(self):
+        self.stream.close()
+
+
+def read_speech_end(file_name):
+    label = splitext(file_name)[0] + '.txt'
+    if not isfile(label):
+        return None
+    with open(label) as f:
+        return float(f.read().split()[-1])
+
+
+def record_phrase(recognizer, file_name, calibration, padding):
+    """
+        Record the phrase in a file.
+
+        Returns:
+            tuple: time the recording ended and if it timed out
+    """
+    source = PaddedFileMicrophone(file_name, padding)
+    sec_per_buffer = float(source.CHUNK) / source.SAMPLE_RATE
+    try:
+        recognizer.adjust_for_ambient_noise(source, calibration)
+        start = source.stream.get_time()
+        recognizer._record_phrase(source, sec_per_buffer)
+        end = source.stream.get_time()
+        timed_out = end - start >= recognizer.RECORDING_TIMEOUT
+    except EOFError:
+        end = source.stream.get_time()
+        timed_out = True
+    finally:
+        source.close()
+    return end, timed_out
+
+
+def evaluate(recognizer, file_names, calibration, padding):
+    """
+        Returns:
+            dict: counts and end of recording latencies of the files
+    """
+    result = {'files': len(file_names), 'timeouts': 0, 'early': 0,
+              'latencies': []}
+    for file_name in file_names:
+        end, timed_out = record_phrase(recognizer, file_name, calibration,
+                                       padding)
+        speech_end = read_speech_end(file_name)
+        if timed_out:
+            result['timeouts'] += 1
+        elif speech_end is not None:
+            if end < speech_end:
+                result['early'] += 1
+            else:
+                result['latencies'].append(end - speech_end)
+        print('{} {:.2f}s{}'.format(os.path.basename(file_name), end,
+                                    ' (timeout)' if timed_out else ''))
+    return result
+
+
+def print_results(results):
+    print(bold_str('{:10} {:>6} {:>9} {:>9} {:>12} {:>12}'.format(
+        'vad', 'files', 'early', 'timeouts', 'mean late', 'max late')))
+    for name, result in results:
+        latencies = result['latencies']
+        mean = sum(latencies) / len(latencies) if latencies else 0.0
+        print('{:10} {:>6} {:>9} {:>9} {:>11.2f}s {:>11.2f}s'.format(
+            name, result['files'],
+            to_percent(float(result['early']) / result['files']),
+            to_percent(float(result['timeouts']) / result['files']),
+            mean, max(latencies or [0.0])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('directory', nargs='?',
+                        default=join(get_root_dir(), 'audio-accuracy-test',
+                                     'data', 'vad'))
+    parser.add_argument('--vad', nargs='+', default=['energy', 'features'],
+                        choices=sorted(VADFactory.CLASSES))
+    parser.add_argument('--calibration', type=float, default=0.5,
+                        help='seconds at the start of the files without '
+                             'speech to measure the ambient noise in')
+    parser.add_argument('--padding', type=float, default=5.0,
+                        help='seconds of silence after the files')
+    args = parser.parse_args()
+
+    file_names = sorted(glob(join(args.directory, '*.wav')))
+    if not file_names:
+        print(bold_str('No wav files found in ' + args.directory))
+        return
+
+    recognizer = ResponsiveRecognizer(HotWordEngine('vad test'))
+    results = []
+    for name in args.vad:
+        config = {'module': name,
+                  'min_silence': ResponsiveRecognizer.MIN_SILENCE_AT_END}
+        recognizer.vad = VADFactory.create_vad(config)
+        print(bold_str(name))
+        results.append((name, evaluate(recognizer, file_names,
+                                       args.calibration, args.padding)))
+    print_results(results)
+
+
+if __name__ == '__main__':
+    main()
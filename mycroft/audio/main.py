@@ -29,7 +29,7 @@ from mycroft.configuration import Configuration
 from mycroft.messagebus.client.ws import WebsocketClient
 from mycroft.messagebus.message import Message
 from mycroft.util import reset_sigint_handler, wait_for_exit_signal, \
-    create_daemon, create_echo_function
+    create_daemon, create_echo_function, bind_signals
 from mycroft.util.log import LOG
 
 try:
@@ -462,6 +462,7 @@ def main():
     reset_sigint_handler()
     ws = WebsocketClient()
     Configuration.init(ws)
+    bind_signals(ws)
     speech.init(ws)
 
     LOG.info("Starting Audio Services")
@@ -26,7 +26,7 @@ from mycroft.client.enclosure.display_manager import \
 from mycroft.configuration import Configuration, LocalConf, USER_CONFIG
 from mycroft.messagebus.message import Message
 from mycroft.util import play_wav, create_signal, connected, \
-    wait_while_speaking
+    wait_while_speaking, bind_signals
 from mycroft.util.audio_test import record
 from mycroft.messagebus.client.ws import WebsocketClient
 from threading import Thread
@@ -565,6 +565,7 @@ class Mark1Enclosure(Enclosure):
         super(Mark1Enclosure, self).__init__(self.ws, "Mark1")
 
         Configuration.init(self.ws)
+        bind_signals(self.ws)
 
         global_config = Configuration.get()
         self.lang = global_config['lang']
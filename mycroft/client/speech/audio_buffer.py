@@ -0,0 +1,78 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+class RingBuffer(object):
+    """
+        Fixed size buffer keeping the latest audio.
+
+        The data is stored twice, back to back, so the latest bytes are
+        always contiguous and can be handed out as a memoryview without
+        copying. Adding audio never allocates.
+
+        Args:
+            capacity (int): bytes of audio to keep
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = bytearray(2 * capacity)
+        self._view = memoryview(self._data)
+        self._pos = 0
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def append(self, chunk):
+        """ Add audio, dropping the oldest audio if the buffer is full. """
+        chunk = memoryview(chunk)[-self.capacity:]
+        size = len(chunk)
+        cap = self.capacity
+        first = min(size, cap - self._pos)
+        self._view[self._pos:self._pos + first] = chunk[:first]
+        self._view[self._pos + cap:self._pos + cap + first] = chunk[:first]
+        rest = size - first
+        if rest:
+            self._view[:rest] = chunk[first:]
+            self._view[cap:cap + rest] = chunk[first:]
+        self._pos = (self._pos + size) % cap
+        self._len = min(self._len + size, cap)
+
+    def view(self, size=None):
+        """
+            Get the latest audio without copying it.
+
+            The view is only valid until audio is added.
+
+            Args:
+                size (int): bytes to get, all audio in the buffer if None or
+                            if there is less audio
+
+            Returns:
+                memoryview: the audio
+        """
+        if size is None or size > self._len:
+            size = self._len
+        end = self._pos + self.capacity
+        return self._view[end - size:end]
+
+    def get(self, size=None):
+        """ Get a copy of the latest audio, see view(). """
+        return self.view(size).tobytes()
+
+    def clear(self):
+        self._pos = 0
+        self._len = 0
@@ -26,6 +26,7 @@ from time import time as get_time
 
 from mycroft.configuration import Configuration
 from subprocess import Popen, PIPE, call
+from queue import Queue
 from threading import Thread
 
 from mycroft.util.log import LOG
@@ -53,8 +54,36 @@ class HotWordEngine(object):
     def update(self, chunk):
         pass
 
+    def is_streaming(self):
+        """ Check if the engine is fed every chunk of audio with update(). """
+        return type(self).update is not HotWordEngine.update
+
+    def add_hot_words(self, engines):
+        """
+            Spot the phrases of other hot word engines as well, where the
+            engine can do it in the same pass over the audio.
+
+            Args:
+                engines (list): the other hot word engines
+        """
+        pass
+
+    def stop(self):
+        """ Release the resources of the engine, e.g. a subprocess. """
+        pass
+
 
 class PocketsphinxHotWord(HotWordEngine):
+    """
+        Spot the key phrase with the keyword search of pocketsphinx.
+
+        By default the whole window of audio is decoded at every check. With
+        "stream" set in the hot word configuration every chunk is decoded
+        once in update(), by an utterance kept running between the checks.
+        A streaming engine can also spot the phrases of other streaming
+        pocketsphinx hot words, in the same decoder pass.
+    """
+
     def __init__(self, key_phrase="hey mycroft", config=None, lang="en-us"):
         super(PocketsphinxHotWord, self).__init__(key_phrase, config, lang)
         # Hotword module imports
@@ -69,27 +98,49 @@ class PocketsphinxHotWord(HotWordEngine):
         self.num_phonemes = len(self.phonemes.split())
         self.threshold = self.config.get("threshold", 1e-90)
         self.sample_rate = self.listener_config.get("sample_rate", 1600)
+        self.stream = self.config.get("stream", False)
+        # Phrases spotted by the decoder with their phonemes and threshold
+        self.phrases = {self.key_phrase: (self.phonemes, self.threshold)}
         dict_name = self.create_dict(self.key_phrase, self.phonemes)
         config = self.create_config(dict_name, Decoder.default_config())
         self.decoder = Decoder(config)
+        # Engine decoding the audio streamed for this one
+        self.spotter = self
+        self.spotted = set()
+        self.utterance_started = False
 
     def create_dict(self, key_phrase, phonemes):
         (fd, file_name) = tempfile.mkstemp()
-        words = key_phrase.split()
-        phoneme_groups = phonemes.split('.')
-        with os.fdopen(fd, 'w') as f:
+        pronunciations = {}
+        for phrase, (phrase_phonemes, _) in sorted(self.phrases.items()):
+            words = phrase.split()
+            phoneme_groups = phrase_phonemes.split('.')
             for word, phoneme in zip(words, phoneme_groups):
+                pronunciations.setdefault(word, phoneme)
+        with os.fdopen(fd, 'w') as f:
+            for word, phoneme in sorted(pronunciations.items()):
                 f.write(word + ' ' + phoneme + '\n')
         return file_name
 
+    def create_kws(self):
+        """ Create the file with the phrases and thresholds to spot. """
+        (fd, file_name) = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as f:
+            for phrase, (_, threshold) in sorted(self.phrases.items()):
+                f.write('{} /{}/\n'.format(phrase, float(threshold)))
+        return file_name
+
     def create_config(self, dict_name, config):
         model_file = join(RECOGNIZER_DIR, 'model', self.lang, 'hmm')
         if not exists(model_file):
             LOG.error('PocketSphinx model not found at ' + str(model_file))
         config.set_string('-hmm', model_file)
         config.set_string('-dict', dict_name)
-        config.set_string('-keyphrase', self.key_phrase)
-        config.set_float('-kws_threshold', float(self.threshold))
+        if len(self.phrases) > 1:
+            config.set_string('-kws', self.create_kws())
+        else:
+            config.set_string('-keyphrase', self.key_phrase)
+            config.set_float('-kws_threshold', float(self.threshold))
         config.set_float('-samprate', self.sample_rate)
         config.set_int('-nfft', 2048)
         config.set_string('-logfn', '/dev/null')
@@ -104,7 +155,50 @@ class PocketsphinxHotWord(HotWordEngine):
             metrics.timer("mycroft.stt.local.time_s", time.time() - start)
         return self.decoder.hyp()
 
+    def is_streaming(self):
+        return self.stream
+
+    def add_hot_words(self, engines):
+        if not self.stream:
+            return
+        added = [engine for engine in engines
+                 if isinstance(engine, PocketsphinxHotWord) and
+                 engine.stream and engine.lang == self.lang and
+                 engine.spotter is engine and engine is not self]
+        if not added:
+            return
+        from pocketsphinx import Decoder
+        for engine in added:
+            self.phrases[engine.key_phrase] = (engine.phonemes,
+                                               engine.threshold)
+            engine.spotter = self
+        dict_name = self.create_dict(self.key_phrase, self.phonemes)
+        config = self.create_config(dict_name, Decoder.default_config())
+        self.decoder = Decoder(config)
+        self.utterance_started = False
+
+    def update(self, chunk):
+        if not self.stream or self.spotter is not self:
+            return
+        if not self.utterance_started:
+            self.decoder.start_utt()
+            self.utterance_started = True
+        self.decoder.process_raw(chunk, False, False)
+        hyp = self.decoder.hyp()
+        if hyp:
+            self.spotted.update(phrase for phrase in self.phrases
+                                if phrase in hyp.hypstr.lower())
+            # Start over, so the phrase isn't spotted again
+            self.decoder.end_utt()
+            self.decoder.start_utt()
+
     def found_wake_word(self, frame_data):
+        if self.stream:
+            spotted = self.spotter.spotted
+            if self.key_phrase in spotted:
+                spotted.discard(self.key_phrase)
+                return True
+            return False
         hyp = self.transcribe(frame_data)
         return hyp and self.key_phrase in hyp.hypstr.lower()
 
@@ -211,6 +305,9 @@ class PreciseHotword(HotWordEngine):
     def check_stdout(self):
         while True:
             line = self.proc.stdout.readline()
+            if not line:
+                # The process was stopped
+                break
             if self.cooldown > 0:
                 self.cooldown -= 1
                 self.has_found = False
@@ -227,6 +324,11 @@ class PreciseHotword(HotWordEngine):
             return True
         return False
 
+    def stop(self):
+        if self.proc.poll() is None:
+            self.proc.terminate()
+            self.proc.wait()
+
 
 class SnowboyHotWord(HotWordEngine):
     def __init__(self, key_phrase="hey mycroft", config=None, lang="en-us"):
@@ -253,6 +355,54 @@ class SnowboyHotWord(HotWordEngine):
         return wake_word == 1
 
 
+class SharedHotWord(object):
+    """
+        Hot word engine shared by several audio sources.
+
+        Every check is done by the next free instance of a pool of engines
+        for the same key phrase, so the sources don't need an engine each.
+        Only engines checking the whole audio in found_wake_word() can be
+        shared, engines fed with update() keep the state of one source.
+
+        Args:
+            engines (list): instances of the engine
+    """
+
+    def __init__(self, engines):
+        self.key_phrase = engines[0].key_phrase
+        self.num_phonemes = engines[0].num_phonemes
+        self.module = engines[0].module
+        self.lang = engines[0].lang
+        self._all_engines = list(engines)
+        self._engines = Queue()
+        for engine in engines:
+            self._engines.put(engine)
+
+    @staticmethod
+    def can_share(engine):
+        return not engine.is_streaming()
+
+    def found_wake_word(self, frame_data):
+        engine = self._engines.get()
+        try:
+            return engine.found_wake_word(frame_data)
+        finally:
+            self._engines.put(engine)
+
+    def update(self, chunk):
+        pass
+
+    def is_streaming(self):
+        return False
+
+    def add_hot_words(self, engines):
+        pass
+
+    def stop(self):
+        for engine in self._all_engines:
+            engine.stop()
+
+
 class HotWordFactory(object):
     CLASSES = {
         "pocketsphinx": PocketsphinxHotWord,
@@ -13,7 +13,8 @@
 # limitations under the License.
 #
 import time
-from threading import Thread
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread, Lock, Semaphore
 import sys
 import speech_recognition as sr
 from pyee import EventEmitter
@@ -21,17 +22,43 @@ from requests import RequestException, HTTPError
 from requests.exceptions import ConnectionError
 
 from mycroft import dialog
-from mycroft.client.speech.hotword_factory import HotWordFactory
-from mycroft.client.speech.mic import MutableMicrophone, ResponsiveRecognizer
+from mycroft.client.speech.hotword_factory import HotWordFactory, \
+    SharedHotWord
+from mycroft.client.speech.mic import MutableMicrophone, FileMicrophone, \
+    ResponsiveRecognizer
+from mycroft.client.speech.stt_stream import STTStreamer
 from mycroft.configuration import Configuration
 from mycroft.metrics import MetricsAggregator, Stopwatch, report_timing
 from mycroft.session import SessionManager
-from mycroft.stt import STTFactory
-from mycroft.util import connected
+from mycroft.stt import STTFactory, StreamingSTT
+from mycroft.util import connected, create_daemon
 from mycroft.util.log import LOG
+from os.path import expanduser
 from queue import Queue, Empty
 
 
+class SourceEmitter(object):
+    """
+        Emitter of the messages about one of several audio sources, adds
+        the id of the source to the data of every message.
+
+        Args:
+            emitter:            emitter to send the messages with
+            source_id (str):    id of the audio source
+    """
+
+    def __init__(self, emitter, source_id):
+        self.emitter = emitter
+        self.source_id = source_id
+
+    def emit(self, event, data=None):
+        if data is None:
+            data = {}
+        if isinstance(data, dict):
+            data = dict(data, source_id=self.source_id)
+        self.emitter.emit(event, data)
+
+
 class AudioProducer(Thread):
     """
     AudioProducer
@@ -47,6 +74,9 @@ class AudioProducer(Thread):
         self.mic = mic
         self.recognizer = recognizer
         self.emitter = emitter
+        # Phrases of one of several sources go on the queue with the
+        # emitter of the source
+        self.source_id = getattr(emitter, 'source_id', None)
 
     def run(self):
         with self.mic as source:
@@ -54,7 +84,14 @@ class AudioProducer(Thread):
             while self.state.running:
                 try:
                     audio = self.recognizer.listen(source, self.emitter)
-                    self.queue.put(audio)
+                    if self.source_id is None or audio is None:
+                        # None when the recognizer was stopped
+                        self.queue.put(audio)
+                    else:
+                        self.queue.put((audio, self.emitter))
+                except EOFError:
+                    LOG.info("End of audio source {}".format(self.source_id))
+                    break
                 except IOError as e:
                     # NOTE: Audio stack on raspi is slightly different, throws
                     # IOError every other listen, almost like it can't handle
@@ -71,56 +108,151 @@ class AudioProducer(Thread):
         self.recognizer.stop()
 
 
+class AudioQueue(Queue):
+    """
+        Queue of recorded phrases for the AudioConsumer.
+
+        If the queue is full the oldest phrase is dropped, the producer
+        never waits for the consumer. The seconds the phrase returned by
+        the last get() spent in the queue are kept in last_wait.
+    """
+
+    def __init__(self, maxsize=0):
+        super(AudioQueue, self).__init__(maxsize)
+        self.dropped = 0
+        self.last_wait = 0.0
+
+    def put(self, item, block=True, timeout=None):
+        with self.mutex:
+            if 0 < self.maxsize <= self._qsize():
+                self.queue.popleft()
+                self.unfinished_tasks -= 1
+                self.dropped += 1
+                LOG.warning("Dropped the oldest recorded phrase, "
+                            "transcription is falling behind")
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def _put(self, item):
+        self.queue.append((time.monotonic(), item))
+
+    def _get(self):
+        queued, item = self.queue.popleft()
+        self.last_wait = time.monotonic() - queued
+        return item
+
+
 class AudioConsumer(Thread):
     """
     AudioConsumer
     Consumes AudioData chunks off the queue
+
+    Phrases are transcribed by a pool of workers, each with its own STT
+    engine, and the utterances are emitted in the order the phrases were
+    recorded. Phrases are only taken off the queue when a worker is free,
+    so a full queue drops the oldest phrases, and phrases waiting longer
+    than max_age seconds are dropped as outdated.
+
+    Phrases recorded from one of several audio sources are queued as
+    (AudioData, SourceEmitter) tuples, the messages about them are sent with
+    the emitter of their source.
     """
 
     # In seconds, the minimum audio size to be sent to remote STT
     MIN_AUDIO_SIZE = 0.5
 
     def __init__(self, state, queue, emitter, stt,
-                 wakeup_recognizer, wakeword_recognizer):
+                 wakeup_recognizer, wakeword_recognizer, streamer=None,
+                 workers=1, max_age=30):
         super(AudioConsumer, self).__init__()
         self.daemon = True
         self.queue = queue
         self.state = state
         self.emitter = emitter
         self.stt = stt
+        self.streamer = streamer
+        self.max_age = max_age
         self.wakeup_recognizer = wakeup_recognizer
         self.wakeword_recognizer = wakeword_recognizer
         self.metrics = MetricsAggregator()
         self.word = self.wakeword_recognizer.key_phrase
+        # Last hot word heard on each of several sources
+        self._words = {}
         self.emitter.on("recognizer_loop:hotword", self._set_word)
 
+        # Every worker uses its own engine, the first is shared with the
+        # streamer and guarded by its lock
+        self._engines = Queue()
+        self._engines.put((stt, streamer.lock if streamer else Lock()))
+        for _ in range(workers - 1):
+            self._engines.put((type(stt)(), Lock()))
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._free_workers = Semaphore(workers)
+
+        # Utterances waiting for the phrases recorded before them
+        self._emit_lock = Lock()
+        self._next_phrase = 0
+        self._next_emit = 0
+        self._results = {}
+
+        self._stats_lock = Lock()
+        self.stats = {'processed': 0, 'stale': 0,
+                      'queue_wait_total': 0.0, 'queue_wait_max': 0.0,
+                      'stt_time_total': 0.0, 'stt_time_max': 0.0}
+
     def _set_word(self, event):
-        self.word = event.get("hotword", self.wakeword_recognizer.key_phrase)
+        word = event.get("hotword", self.wakeword_recognizer.key_phrase)
+        source_id = event.get("source_id")
+        if source_id is None:
+            self.word = word
+        else:
+            self._words[source_id] = word
 
     def run(self):
         while self.state.running:
             self.read()
+        self._pool.shutdown(wait=False)
 
     def read(self):
-        try:
-            audio = self.queue.get(timeout=0.5)
-        except Empty:
-            return
-
-        if audio is None:
+        if not self._free_workers.acquire(timeout=0.5):
             return
-
-        if self.state.sleeping:
-            self.wake_up(audio)
-        else:
-            self.process(audio)
+        submitted = False
+        try:
+            try:
+                audio = self.queue.get(timeout=0.5)
+            except Empty:
+                return
+
+            emitter = self.emitter
+            if isinstance(audio, tuple):
+                audio, emitter = audio
+            if audio is None:
+                return
+
+            queue_wait = getattr(self.queue, 'last_wait', 0.0)
+            if self.max_age and queue_wait > self.max_age:
+                LOG.warning("Dropped a phrase recorded {:.1f}s ago".format(
+                    queue_wait))
+                with self._stats_lock:
+                    self.stats['stale'] += 1
+                if self.streamer:
+                    self.streamer.pop(audio)
+            elif self.state.sleeping:
+                self.wake_up(audio, emitter)
+            else:
+                submitted = self.process(audio, queue_wait, emitter)
+        finally:
+            if not submitted:
+                self._free_workers.release()
 
     # TODO: Localization
-    def wake_up(self, audio):
+    def wake_up(self, audio, emitter=None):
+        emitter = emitter or self.emitter
         if self.wakeup_recognizer.found_wake_word(audio.frame_data):
-            SessionManager.touch()
+            SessionManager.touch(getattr(emitter, 'source_id', None))
             self.state.sleeping = False
-            self.emitter.emit('recognizer_loop:awoken')
+            emitter.emit('recognizer_loop:awoken')
             self.metrics.increment("mycroft.wakeup")
 
     @staticmethod
@@ -129,42 +261,120 @@ class AudioConsumer(Thread):
             audio.sample_rate * audio.sample_width)
 
     # TODO: Localization
-    def process(self, audio):
-        SessionManager.touch()
+    def process(self, audio, queue_wait=0.0, emitter=None):
+        """
+            Hand a phrase to a worker for transcription, a worker must be
+            free.
+
+            Args:
+                audio (AudioData):  the phrase
+                queue_wait (float): seconds the phrase waited in the queue
+                emitter:            emitter of the source of the phrase,
+                                    None for the default source
+
+            Returns:
+                bool: True if the phrase was handed to a worker
+        """
+        emitter = emitter or self.emitter
+        source_id = getattr(emitter, 'source_id', None)
+        SessionManager.touch(source_id)
         payload = {
-            'utterance': self.word,
-            'session': SessionManager.get().session_id,
+            'utterance': self._words.get(source_id, self.word),
+            'session': SessionManager.get(source_id).session_id,
         }
-        self.emitter.emit("recognizer_loop:wakeword", payload)
+        emitter.emit("recognizer_loop:wakeword", payload)
 
         if self._audio_length(audio) < self.MIN_AUDIO_SIZE:
             LOG.warning("Audio too short to be processed")
-        else:
+            if self.streamer:
+                self.streamer.pop(audio)
+            return False
+        phrase = self._next_phrase
+        self._next_phrase += 1
+        self._pool.submit(self._transcribe_phrase, phrase, audio, queue_wait,
+                          emitter)
+        return True
+
+    def _transcribe_phrase(self, phrase, audio, queue_wait, emitter):
+        payload = None
+        try:
             stopwatch = Stopwatch()
             with stopwatch:
-                transcription = self.transcribe(audio)
+                transcription = self.transcribe(audio, emitter)
+            self._add_timing(queue_wait, stopwatch.time)
             if transcription:
                 ident = str(stopwatch.timestamp) + str(hash(transcription))
                 # STT succeeded, send the transcribed speech on for processing
                 payload = {
                     'utterances': [transcription],
                     'lang': self.stt.lang,
-                    'session': SessionManager.get().session_id,
+                    'session': SessionManager.get(
+                        getattr(emitter, 'source_id', None)).session_id,
                     'ident': ident
                 }
-                self.emitter.emit("recognizer_loop:utterance", payload)
-                self.metrics.attr('utterances', [transcription])
             else:
                 ident = str(stopwatch.timestamp)
             # Report timing metrics
             report_timing(ident, 'stt', stopwatch,
                           {'transcription': transcription,
-                           'stt': self.stt.__class__.__name__})
+                           'stt': self.stt.__class__.__name__,
+                           'queue_wait': queue_wait})
+        except Exception:
+            LOG.exception("Error transcribing phrase")
+        finally:
+            self._free_workers.release()
+            self._emit_in_order(phrase, payload, emitter)
+
+    def _emit_in_order(self, phrase, payload, emitter):
+        """ Emit the utterances of all phrases transcribed in order. """
+        with self._emit_lock:
+            self._results[phrase] = (payload, emitter)
+            while self._next_emit in self._results:
+                payload, emitter = self._results.pop(self._next_emit)
+                self._next_emit += 1
+                if payload:
+                    emitter.emit("recognizer_loop:utterance", payload)
+                    self.metrics.attr('utterances', payload['utterances'])
+
+    def _add_timing(self, queue_wait, stt_time):
+        with self._stats_lock:
+            stats = self.stats
+            stats['processed'] += 1
+            stats['queue_wait_total'] += queue_wait
+            stats['queue_wait_max'] = max(stats['queue_wait_max'],
+                                          queue_wait)
+            stats['stt_time_total'] += stt_time
+            stats['stt_time_max'] = max(stats['stt_time_max'], stt_time)
+
+    def get_stats(self):
+        """
+            Get the counts of transcribed and dropped phrases and the time
+            they waited in the queue and took to transcribe in seconds.
+        """
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['dropped'] = getattr(self.queue, 'dropped', 0)
+        return stats
 
-    def transcribe(self, audio):
+    def _execute(self, audio):
+        engine, lock = self._engines.get()
         try:
-            # Invoke the STT engine on the audio clip
-            text = self.stt.execute(audio).lower().strip()
+            with lock:
+                return engine.execute(audio)
+        finally:
+            self._engines.put((engine, lock))
+
+    def transcribe(self, audio, emitter=None):
+        emitter = emitter or self.emitter
+        try:
+            # Get the result of the engine transcribing the audio while it
+            # was recorded, or invoke an STT engine on the audio clip
+            stream = self.streamer.pop(audio) if self.streamer else None
+            if stream:
+                text = stream.result()
+            else:
+                text = self._execute(audio)
+            text = text.lower().strip()
             LOG.debug("STT: " + text)
             return text
         except sr.RequestError as e:
@@ -172,7 +382,7 @@ class AudioConsumer(Thread):
         except ConnectionError as e:
             LOG.error("Connection Error: {0}".format(e))
 
-            self.emitter.emit("recognizer_loop:no_internet")
+            emitter.emit("recognizer_loop:no_internet")
         except HTTPError as e:
             if e.response.status_code == 401:
                 LOG.warning("Access Denied at mycroft.ai")
@@ -182,7 +392,7 @@ class AudioConsumer(Thread):
         except RequestException as e:
             LOG.error(e.__class__.__name__ + ': ' + str(e))
         except Exception as e:
-            self.emitter.emit('recognizer_loop:speech.recognition.unknown')
+            emitter.emit('recognizer_loop:speech.recognition.unknown')
             if isinstance(e, IndexError):
                 LOG.info('no words were transcribed')
             else:
@@ -193,7 +403,7 @@ class AudioConsumer(Thread):
             dialog_name = 'backend.down'
         else:
             dialog_name = 'not connected to the internet'
-        self.emitter.emit('speak', {'utterance': dialog.get(dialog_name)})
+        emitter.emit('speak', {'utterance': dialog.get(dialog_name)})
 
     def __speak(self, utterance):
         payload = {
@@ -209,10 +419,42 @@ class RecognizerLoopState(object):
         self.sleeping = False
 
 
+class ListenerSource(object):
+    """
+        Audio source listened to by the RecognizerLoop.
+
+        Args:
+            source_id (str):    id of the source, None for the microphone of
+                                a loop listening to a single source
+            mic (AudioSource):  the audio source
+            recognizer (ResponsiveRecognizer): wake word detection and phrase
+                                               recording for the source
+            emitter:            emitter for the messages about the source
+            context (dict):     context of the messages about the source
+            added (bool):       True if the source was added while the loop
+                                was running
+    """
+
+    def __init__(self, source_id, mic, recognizer, emitter, context=None,
+                 added=False):
+        self.source_id = source_id
+        self.mic = mic
+        self.recognizer = recognizer
+        self.emitter = emitter
+        self.context = context or {}
+        self.added = added
+
+
 class RecognizerLoop(EventEmitter):
     """
         EventEmitter loop running speech recognition. Local wake word
         recognizer and remote general speech recognition.
+
+        The loop listens to the microphone, or to all audio sources in the
+        "sources" list of the listener configuration. Every source has its
+        own wake word detection and session, the messages about a source
+        carry its id as "source_id". The phrases of all sources are
+        transcribed by the same pool of STT engines.
     """
 
     def __init__(self):
@@ -232,10 +474,12 @@ class RecognizerLoop(EventEmitter):
         rate = self.config.get('sample_rate')
         device_index = self.config.get('device_index')
 
-        self.microphone = MutableMicrophone(device_index, rate,
-                                            mute=self.mute_calls > 0)
-        # FIXME - channels are not been used
-        self.microphone.CHANNELS = self.config.get('channels')
+        self.microphone = None
+        if not self.config.get('sources'):
+            self.microphone = MutableMicrophone(device_index, rate,
+                                                mute=self.mute_calls > 0)
+            # FIXME - channels are not been used
+            self.microphone.CHANNELS = self.config.get('channels')
         self.wakeword_recognizer = self.create_wake_word_recognizer()
         # TODO - localization
         self.wakeup_recognizer = self.create_wakeup_recognizer()
@@ -244,6 +488,184 @@ class RecognizerLoop(EventEmitter):
         self.responsive_recognizer = ResponsiveRecognizer(
             self.wakeword_recognizer, self.hot_word_engines)
         self.state = RecognizerLoopState()
+        self._sources_lock = Lock()
+        self._shared_engines = {}
+        self._used_engines = set()
+        self._source_contexts = {}
+        self.sources = self.create_sources()
+        self.producers = []
+
+    def create_sources(self):
+        """
+            Create the audio sources in the "sources" list of the listener
+            configuration, e.g.
+
+                {"id": "kitchen", "module": "microphone", "device_index": 2}
+                {"id": "test", "module": "file", "path": "~/test.wav"}
+
+            Returns:
+                list: ListenerSources, just the microphone if no sources are
+                      configured
+        """
+        configs = self.config.get('sources') or []
+        if not configs:
+            return [ListenerSource(None, self.microphone,
+                                   self.responsive_recognizer, self)]
+
+        sources = []
+        for i, config in enumerate(configs):
+            source_id = str(config.get('id', i))
+            try:
+                mic = self.create_audio_source(config)
+            except Exception:
+                LOG.exception('Could not create audio source ' + source_id)
+                continue
+            sources.append(ListenerSource(source_id, mic,
+                                          self._create_source_recognizer(),
+                                          SourceEmitter(self, source_id)))
+        return sources
+
+    def _create_source_recognizer(self):
+        """
+            Create the ResponsiveRecognizer for one of several sources.
+
+            Wake word engines which can be shared are shared by all sources,
+            with "shared_hotword_engines" instances of every engine. Engines
+            fed with every chunk are created for every source.
+        """
+        wakeword = self._engine_for_source(
+            self.wakeword_recognizer.key_phrase, self.wakeword_recognizer,
+            self.create_wake_word_recognizer)
+        hot_words = {}
+        for word, data in self.hot_word_engines.items():
+            def create(word=word):
+                return HotWordFactory.create_hotword(word, lang=self.lang)
+            engine = self._engine_for_source(word, data[0], create)
+            hot_words[word] = [engine] + data[1:]
+        recognizer = ResponsiveRecognizer(wakeword, hot_words)
+        # The mic level file is left to a local microphone
+        recognizer.mic_level.level_file = None
+        return recognizer
+
+    def _engine_for_source(self, word, engine, create):
+        """
+            Get an engine for a hot word for another source.
+
+            Args:
+                word (str):             the hot word
+                engine (HotWordEngine): the engine created for the loop, it
+                                        is used by the sources if the loop
+                                        doesn't listen to the microphone
+                create (callable):      creates another instance
+
+            Returns:
+                the engine for the source
+        """
+        if word in self._shared_engines:
+            return self._shared_engines[word]
+        if self.microphone or word in self._used_engines:
+            first = create()
+        else:
+            first = engine
+            self._used_engines.add(word)
+        if not SharedHotWord.can_share(first):
+            return first
+        count = self.config.get('shared_hotword_engines', 2)
+        engines = [first] + [create() for _ in range(count - 1)]
+        self._shared_engines[word] = SharedHotWord(engines)
+        return self._shared_engines[word]
+
+    def add_source(self, source_id, mic, context=None):
+        """
+            Listen to another audio source, e.g. of a remote client. Sources
+            added are closed when the loop stops.
+
+            Args:
+                source_id (str):    id of the source
+                mic (AudioSource):  the source, with a close() method
+                context (dict):     context of the messages about the source
+
+            Returns:
+                ListenerSource: the source
+
+            Raises:
+                ValueError: if a source with the id is listened to
+        """
+        source_id = str(source_id)
+        with self._sources_lock:
+            if any(s.source_id == source_id for s in self.sources):
+                raise ValueError('Audio source {} exists'.format(source_id))
+            source = ListenerSource(source_id, mic,
+                                    self._create_source_recognizer(),
+                                    SourceEmitter(self, source_id), context,
+                                    added=True)
+            self.sources.append(source)
+            self._source_contexts[source_id] = context or {}
+            if self.state.running:
+                self._start_producer(source)
+        return source
+
+    def remove_source(self, source):
+        """
+            Stop listening to a source added with add_source(), its audio
+            must end with EOFError for its producer to stop. The engines
+            created for the source are stopped once its producer ends.
+        """
+        with self._sources_lock:
+            if source not in self.sources:
+                return
+            self.sources.remove(source)
+            self._source_contexts.pop(source.source_id, None)
+            producers = [p for p in self.producers if p.mic is source.mic]
+        if producers:
+            # The producer may still be reading the rest of the audio
+            create_daemon(self._release_source, (source, producers))
+        else:
+            self._release_source(source, [])
+
+    def _release_source(self, source, producers):
+        for producer in producers:
+            producer.join()
+        recognizer = source.recognizer
+        engines = [(self.wakeword_recognizer.key_phrase,
+                    recognizer.wake_word_recognizer)]
+        engines += [(word, data[0])
+                    for word, data in recognizer.hot_word_engines.items()]
+        for word, engine in engines:
+            if isinstance(engine, SharedHotWord):
+                continue
+            if engine is self.wakeword_recognizer or \
+                    engine is self.hot_word_engines.get(word, [None])[0]:
+                # The engine of the loop can be used by another source
+                self._used_engines.discard(word)
+                continue
+            engine.stop()
+
+    def get_source_context(self, source_id):
+        """ Get the context of the messages about an audio source. """
+        return self._source_contexts.get(source_id, {})
+
+    def create_audio_source(self, config):
+        """
+            Create an audio source from its configuration.
+
+            Args:
+                config (dict): an entry of the "sources" list
+
+            Returns:
+                AudioSource: the source
+        """
+        module = config.get('module', 'microphone')
+        mute = self.mute_calls > 0
+        if module == 'microphone':
+            rate = config.get('sample_rate', self.config.get('sample_rate'))
+            return MutableMicrophone(config.get('device_index'), rate,
+                                     mute=mute)
+        elif module == 'file':
+            return FileMicrophone(expanduser(config['path']),
+                                  config.get('realtime', True),
+                                  config.get('loop', False), mute=mute)
+        raise ValueError('Unknown audio source module ' + str(module))
 
     def create_hot_word_engines(self):
         LOG.info("creating hotword engines")
@@ -290,31 +712,70 @@ class RecognizerLoop(EventEmitter):
         """
             Start consumer and producer threads
         """
-        self.state.running = True
-        queue = Queue()
-        self.producer = AudioProducer(self.state, queue, self.microphone,
-                                      self.responsive_recognizer, self)
-        self.producer.start()
-        self.consumer = AudioConsumer(self.state, queue, self,
-                                      STTFactory.create(),
+        consumer_config = self.config.get('consumer', {})
+        queue = AudioQueue(consumer_config.get('max_queued', 5))
+        stt = STTFactory.create()
+        streamer = None
+        # Streaming needs an engine for every phrase being recorded, so it's
+        # only done with a single source
+        if isinstance(stt, StreamingSTT) and self.microphone and \
+                self.config_core.get('stt', {}).get('stream', True):
+            streamer = STTStreamer(stt, self, self.state)
+        self.responsive_recognizer.streamer = streamer
+        self.queue = queue
+        with self._sources_lock:
+            self.state.running = True
+            self.producers = []
+            for source in self.sources:
+                self._start_producer(source)
+        self.consumer = AudioConsumer(self.state, queue, self, stt,
                                       self.wakeup_recognizer,
-                                      self.wakeword_recognizer)
+                                      self.wakeword_recognizer, streamer,
+                                      consumer_config.get('workers', 1),
+                                      consumer_config.get('max_age', 30))
         self.consumer.start()
 
+    def _start_producer(self, source):
+        # Forget the producers of removed sources
+        self.producers = [p for p in self.producers if p.is_alive()]
+        producer = AudioProducer(self.state, self.queue, source.mic,
+                                 source.recognizer, source.emitter)
+        producer.start()
+        self.producers.append(producer)
+
     def stop(self):
-        self.state.running = False
-        self.producer.stop()
+        with self._sources_lock:
+            self.state.running = False
+            for source in self.sources:
+                if source.added:
+                    source.mic.close()
+        for producer in self.producers:
+            producer.stop()
         # wait for threads to shutdown
-        self.producer.join()
+        for producer in self.producers:
+            producer.join()
         self.consumer.join()
+        # The sources are created again by reload()
+        with self._sources_lock:
+            sources = list(self.sources)
+        for source in sources:
+            self._release_source(source, [])
+
+    def _stop_engines(self):
+        """ Stop the engines of the loop, before they are created again. """
+        engines = [self.wakeword_recognizer, self.wakeup_recognizer]
+        engines += [data[0] for data in self.hot_word_engines.values()]
+        engines += list(self._shared_engines.values())
+        for engine in engines:
+            engine.stop()
 
     def mute(self):
         """
             Mute microphone and increase number of requests to mute
         """
         self.mute_calls += 1
-        if self.microphone:
-            self.microphone.mute()
+        for source in list(self.sources):
+            source.mic.mute()
 
     def unmute(self):
         """
@@ -324,8 +785,9 @@ class RecognizerLoop(EventEmitter):
         if self.mute_calls > 0:
             self.mute_calls -= 1
 
-        if self.mute_calls <= 0 and self.microphone:
-            self.microphone.unmute()
+        if self.mute_calls <= 0:
+            for source in list(self.sources):
+                source.mic.unmute()
             self.mute_calls = 0
 
     def force_unmute(self):
@@ -336,8 +798,8 @@ class RecognizerLoop(EventEmitter):
         self.unmute()
 
     def is_muted(self):
-        if self.microphone:
-            return self.microphone.is_muted()
+        if self.sources:
+            return all(source.mic.is_muted() for source in list(self.sources))
         else:
             return True  # consider 'no mic' muted
 
@@ -366,6 +828,7 @@ class RecognizerLoop(EventEmitter):
             Reload configuration and restart consumer and producer
         """
         self.stop()
+        self._stop_engines()
         # load config
         self._load_config()
         # restart
@@ -17,13 +17,14 @@ from threading import Lock
 from mycroft import dialog
 from mycroft.client.enclosure.api import EnclosureAPI
 from mycroft.client.speech.listener import RecognizerLoop
+from mycroft.client.speech.remote_audio import start_remote_audio_server
 from mycroft.configuration import Configuration
 from mycroft.identity import IdentityManager
 from mycroft.lock import Lock as PIDLock  # Create/Support PID locking file
 from mycroft.messagebus.client.ws import WebsocketClient
 from mycroft.messagebus.message import Message
 from mycroft.util import create_daemon, wait_for_exit_signal, \
-    reset_sigint_handler
+    reset_sigint_handler, bind_signals
 from mycroft.util.log import LOG
 
 ws = None
@@ -31,30 +32,46 @@ lock = Lock()
 loop = None
 
 
-def handle_record_begin():
+def source_context(event):
+    """
+        Context of a message about one of several audio sources, carrying
+        the id of the source the listener added to the event and the
+        context of remote sources.
+    """
+    if event and event.get('source_id') is not None:
+        context = dict(loop.get_source_context(event['source_id']))
+        context['source_id'] = event['source_id']
+        return context
+    return None
+
+
+def handle_record_begin(event=None):
     LOG.info("Begin Recording...")
-    ws.emit(Message('recognizer_loop:record_begin'))
+    ws.emit(Message('recognizer_loop:record_begin', event,
+                    source_context(event)))
 
 
-def handle_record_end():
+def handle_record_end(event=None):
     LOG.info("End Recording...")
-    ws.emit(Message('recognizer_loop:record_end'))
+    ws.emit(Message('recognizer_loop:record_end', event,
+                    source_context(event)))
 
 
-def handle_no_internet():
+def handle_no_internet(event=None):
     LOG.debug("Notifying enclosure of no internet connection")
     ws.emit(Message('enclosure.notify.no_internet'))
 
 
-def handle_awoken():
+def handle_awoken(event=None):
     """ Forward mycroft.awoken to the messagebus. """
     LOG.info("Listener is now Awake: ")
-    ws.emit(Message('mycroft.awoken'))
+    ws.emit(Message('mycroft.awoken', event, source_context(event)))
 
 
 def handle_wakeword(event):
     LOG.info("Wakeword Detected: " + event['utterance'])
-    ws.emit(Message('recognizer_loop:wakeword', event))
+    ws.emit(Message('recognizer_loop:wakeword', event,
+                    source_context(event)))
 
 
 def handle_utterance(event):
@@ -64,18 +81,30 @@ def handle_utterance(event):
     if 'ident' in event:
         ident = event.pop('ident')
         context['ident'] = ident
+    context.update(source_context(event) or {})
     ws.emit(Message('recognizer_loop:utterance', event, context))
 
 
-def handle_unknown():
-    ws.emit(Message('mycroft.speech.recognition.unknown'))
+def handle_mic_level(event):
+    ws.emit(Message('recognizer_loop:mic_level', event,
+                    source_context(event)))
+
+
+def handle_partial_utterance(event):
+    ws.emit(Message('recognizer_loop:partial_utterance', event,
+                    source_context(event)))
+
+
+def handle_unknown(event=None):
+    ws.emit(Message('mycroft.speech.recognition.unknown', event,
+                    source_context(event)))
 
 
 def handle_speak(event):
     """
         Forward speak message to message bus.
     """
-    ws.emit(Message('speak', event))
+    ws.emit(Message('speak', event, source_context(event)))
 
 
 def handle_complete_intent_failure(event):
@@ -90,7 +119,8 @@ def handle_hotword(event):
     suw = config.get("stand_up_word", "wake up")
     if event["hotword"] != ww and event["hotword"] != suw:
         LOG.info("Hotword Detected: " + event['hotword'])
-        ws.emit(Message('recognizer_loop:hotword', event))
+        ws.emit(Message('recognizer_loop:hotword', event,
+                        source_context(event)))
 
 
 def handle_sleep():
@@ -148,8 +178,10 @@ def main():
     PIDLock("voice")
     ws = WebsocketClient()
     Configuration.init(ws)
+    bind_signals(ws)
     loop = RecognizerLoop()
     loop.on('recognizer_loop:utterance', handle_utterance)
+    loop.on('recognizer_loop:partial_utterance', handle_partial_utterance)
     loop.on('recognizer_loop:speech.recognition.unknown', handle_unknown)
     loop.on('speak', handle_speak)
     loop.on('recognizer_loop:record_begin', handle_record_begin)
@@ -158,6 +190,7 @@ def main():
     loop.on('recognizer_loop:hotword', handle_hotword)
     loop.on('recognizer_loop:record_end', handle_record_end)
     loop.on('recognizer_loop:no_internet', handle_no_internet)
+    loop.on('recognizer_loop:mic_level', handle_mic_level)
     ws.on('open', handle_open)
     ws.on('complete_intent_failure', handle_complete_intent_failure)
     ws.on('recognizer_loop:sleep', handle_sleep)
@@ -172,6 +205,11 @@ def main():
     create_daemon(ws.run_forever)
     create_daemon(loop.run)
 
+    remote_config = Configuration.get().get('listener', {}).get(
+        'remote_audio', {})
+    if remote_config.get('enabled', False):
+        start_remote_audio_server(loop, remote_config)
+
     wait_for_exit_signal()
 
 
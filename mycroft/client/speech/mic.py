@@ -22,6 +22,8 @@ import os
 import pyaudio
 import requests
 import speech_recognition
+import wave
+from contextlib import closing
 from hashlib import md5
 from io import BytesIO, StringIO
 from speech_recognition import (
@@ -31,6 +33,9 @@ from speech_recognition import (
 )
 from threading import Thread, Lock
 
+from mycroft.client.speech.audio_buffer import RingBuffer
+from mycroft.client.speech.mic_level import MicLevelPublisher
+from mycroft.client.speech.vad import VADFactory
 from mycroft.configuration import Configuration
 from mycroft.util import (
     check_for_signal,
@@ -142,6 +147,106 @@ class MutableMicrophone(Microphone):
         return self.muted
 
 
+class FileStream(object):
+    """
+        Stream of the audio in a wav file.
+
+        Args:
+            file_name (str):    mono wav file
+            realtime (bool):    return the audio no faster than it would
+                                be recorded
+            loop (bool):        start over at the end of the file instead of
+                                raising EOFError
+    """
+
+    def __init__(self, file_name, realtime=True, loop=False):
+        self.wav = wave.open(file_name, 'rb')
+        self.sample_rate = self.wav.getframerate()
+        self.sample_width = self.wav.getsampwidth()
+        self.realtime = realtime
+        self.loop = loop
+        self.muted = False
+        self._next_read = None
+
+    def read(self, size, of_exc=False):
+        """
+            Read the next frames of the file.
+
+            Arguments:
+                size (int): Number of frames to read
+                of_exc (bool): unused, files don't overflow
+
+            Returns:
+                the audio, shorter than size frames only at the end of the
+                file
+
+            Raises:
+                EOFError: at the end of the file
+        """
+        data = self.wav.readframes(size)
+        if not data and self.loop:
+            self.wav.rewind()
+            data = self.wav.readframes(size)
+        if not data:
+            raise EOFError
+        if self.realtime:
+            now = get_time()
+            if self._next_read is None or self._next_read < now:
+                self._next_read = now
+            sleep(self._next_read - now)
+            self._next_read += (float(len(data)) / self.sample_width /
+                                self.sample_rate)
+        if self.muted:
+            return get_silence(len(data))
+        return data
+
+    def close(self):
+        self.wav.close()
+
+
+class FileMicrophone(AudioSource):
+    """
+        Audio source reading a wav file, can be muted like the
+        MutableMicrophone.
+    """
+
+    def __init__(self, file_name, realtime=True, loop=False,
+                 chunk_size=1024, mute=False):
+        self.file_name = file_name
+        self.realtime = realtime
+        self.loop = loop
+        self.CHUNK = chunk_size
+        with closing(wave.open(file_name, 'rb')) as wav:
+            self.SAMPLE_RATE = wav.getframerate()
+            self.SAMPLE_WIDTH = wav.getsampwidth()
+        self.stream = None
+        self.muted = mute
+
+    def __enter__(self):
+        assert self.stream is None, \
+            "This audio source is already inside a context manager"
+        self.stream = FileStream(self.file_name, self.realtime, self.loop)
+        self.stream.muted = self.muted
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream.close()
+        self.stream = None
+
+    def mute(self):
+        self.muted = True
+        if self.stream:
+            self.stream.muted = True
+
+    def unmute(self):
+        self.muted = False
+        if self.stream:
+            self.stream.muted = False
+
+    def is_muted(self):
+        return self.muted
+
+
 def get_silence(num_bytes):
     return b'\0' * num_bytes
 
@@ -191,9 +296,26 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
         self.save_wake_words = listener_config.get('record_hotwords', False)
         self.upload_lock = Lock()
         self.filenames_to_upload = []
-        self.mic_level_file = os.path.join(get_ipc_directory(), "mic_level")
+        level_config = listener_config.get('mic_level', {})
+        level_file = None
+        if level_config.get('file', False):
+            level_file = os.path.join(get_ipc_directory(), "mic_level")
+        self.mic_level = MicLevelPublisher(
+            interval=level_config.get('interval', 0.2),
+            level_file=level_file)
         self._stop_signaled = False
         self.hot_word_engines = hot_word_engines or {}
+        # Streaming engines may spot the hot words in the same pass
+        wake_word_recognizer.add_hot_words(
+            [data[0] for data in self.hot_word_engines.values()])
+
+        # Streams the recorded phrases to the STT engine if set
+        self.streamer = None
+
+        # Speech detection while recording a phrase
+        vad_config = dict(listener_config.get('vad', {}))
+        vad_config.setdefault('min_silence', self.MIN_SILENCE_AT_END)
+        self.vad = VADFactory.create_vad(vad_config)
 
         # The maximum audio in seconds to keep for transcribing a phrase
         # The wake word must fit in this time
@@ -202,6 +324,10 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
         self.TEST_WW_SEC = num_phonemes * len_phoneme
         self.SAVED_WW_SEC = max(3, self.TEST_WW_SEC)
 
+        # Audio buffers, allocated once for the audio source
+        self._ww_buffer = None
+        self._phrase_buffer = None
+
         try:
             self.account_id = "666"#DeviceApi().get()['user']['uuid']
         except (requests.HTTPError, requests.ConnectionError, AttributeError):
@@ -231,22 +357,7 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
         """
 
         num_loud_chunks = 0
-        noise = 0
-
-        max_noise = 25
-        min_noise = 0
-
-        silence_duration = 0
-
-        def increase_noise(level):
-            if level < max_noise:
-                return level + 200 * sec_per_buffer
-            return level
-
-        def decrease_noise(level):
-            if level > min_noise:
-                return level - 100 * sec_per_buffer
-            return level
+        self.vad.start(sec_per_buffer, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
 
         # Smallest number of loud chunks required to return
         min_loud_chunks = int(self.MIN_LOUD_SEC_PER_PHRASE / sec_per_buffer)
@@ -259,40 +370,43 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
         max_chunks_of_silence = int(self.RECORDING_TIMEOUT_WITH_SILENCE /
                                     sec_per_buffer)
 
-        # bytearray to store audio in
-        byte_data = get_silence(source.SAMPLE_WIDTH)
+        # bytearray to store audio in, large enough for the longest phrase
+        silence = get_silence(source.SAMPLE_WIDTH)
+        max_size = len(silence) + (max_chunks + 1) * source.CHUNK * \
+            source.SAMPLE_WIDTH
+        if self._phrase_buffer is None or len(self._phrase_buffer) < max_size:
+            self._phrase_buffer = bytearray(max_size)
+        byte_data = memoryview(self._phrase_buffer)
+        byte_data[:len(silence)] = silence
+        size = len(silence)
 
         phrase_complete = False
         while num_chunks < max_chunks and not phrase_complete:
             chunk = self.record_sound_chunk(source)
-            byte_data += chunk
+            if size + len(chunk) > len(byte_data):
+                # Larger chunks than the source announced
+                byte_data.release()
+                self._phrase_buffer.extend(bytes(len(chunk)))
+                byte_data = memoryview(self._phrase_buffer)
+            byte_data[size:size + len(chunk)] = chunk
+            size += len(chunk)
             num_chunks += 1
+            if self.streamer:
+                self.streamer.stream_chunk(chunk)
 
             energy = self.calc_energy(chunk, source.SAMPLE_WIDTH)
             test_threshold = self.energy_threshold * self.multiplier
-            is_loud = energy > test_threshold
+            is_loud = self.vad.update(chunk, energy, test_threshold)
             if is_loud:
-                noise = increase_noise(noise)
                 num_loud_chunks += 1
             else:
-                noise = decrease_noise(noise)
                 self._adjust_threshold(energy, sec_per_buffer)
 
-            if num_chunks % 10 == 0:
-                with open(self.mic_level_file, 'w') as f:
-                    f.write("Energy:  cur=" + str(energy) + " thresh=" +
-                            str(self.energy_threshold))
-                f.close()
+            self.mic_level.update(energy, self.energy_threshold)
 
             was_loud_enough = num_loud_chunks > min_loud_chunks
 
-            quiet_enough = noise <= min_noise
-            if quiet_enough:
-                silence_duration += sec_per_buffer
-                if silence_duration < self.MIN_SILENCE_AT_END:
-                    quiet_enough = False  # gotta be silent for min of 1/4 sec
-            else:
-                silence_duration = 0
+            quiet_enough = self.vad.is_quiet()
             recorded_too_much_silence = num_chunks > max_chunks_of_silence
             if quiet_enough and (was_loud_enough or recorded_too_much_silence):
                 phrase_complete = True
@@ -301,7 +415,9 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
             if check_for_signal('buttonPress'):
                 phrase_complete = True
 
-        return byte_data
+        phrase = byte_data[:size].tobytes()
+        byte_data.release()
+        return phrase
 
     @staticmethod
     def sec_to_bytes(sec, source):
@@ -349,9 +465,6 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
 
         silence = get_silence(num_silent_bytes)
 
-        # bytearray to store audio in
-        byte_data = silence
-
         buffers_per_check = self.SEC_BETWEEN_WW_CHECKS / sec_per_buffer
         buffers_since_check = 0.0
 
@@ -359,6 +472,13 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
         max_size = self.sec_to_bytes(self.SAVED_WW_SEC, source)
         test_size = self.sec_to_bytes(self.TEST_WW_SEC, source)
 
+        # Rolling buffer to store audio in
+        if self._ww_buffer is None or self._ww_buffer.capacity != max_size:
+            self._ww_buffer = RingBuffer(max_size)
+        byte_data = self._ww_buffer
+        byte_data.clear()
+        byte_data.append(silence)
+
         said_wake_word = False
 
         # Rolling buffer to track the audio energy (loudness) heard on
@@ -368,7 +488,6 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
         idx_energy = 0
         avg_energy = 0.0
         energy_avg_samples = int(5 / sec_per_buffer)  # avg over last 5 secs
-        counter = 0
 
         while not said_wake_word and not self._stop_signaled:
             if self._skip_wake_word():
@@ -398,28 +517,20 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
 
             # Periodically output energy level stats.  This can be used to
             # visualize the microphone input, e.g. a needle on a meter.
-            if counter % 3:
-                with open(self.mic_level_file, 'w') as f:
-                    f.write("Energy:  cur=" + str(energy) + " thresh=" +
-                            str(self.energy_threshold))
-                f.close()
-            counter += 1
+            self.mic_level.update(energy, self.energy_threshold)
 
             # At first, the buffer is empty and must fill up.  After that
-            # just drop the first chunk bytes to keep it the same size.
-            needs_to_grow = len(byte_data) < max_size
-            if needs_to_grow:
-                byte_data += chunk
-            else:  # Remove beginning of audio and add new chunk to end
-                byte_data = byte_data[len(chunk):] + chunk
+            # the oldest audio is overwritten to keep it the same size.
+            byte_data.append(chunk)
 
             buffers_since_check += 1.0
             self.wake_word_recognizer.update(chunk)
+            for data in self.hot_word_engines.values():
+                data[0].update(chunk)
             if buffers_since_check > buffers_per_check:
                 buffers_since_check -= buffers_per_check
-                chopped = byte_data[-test_size:] \
-                    if test_size < len(byte_data) else byte_data
-                audio_data = chopped + silence
+                # The engines need bytes, copied once per check
+                audio_data = b''.join((byte_data.view(test_size), silence))
                 said_wake_word = \
                     self.wake_word_recognizer.found_wake_word(audio_data)
                 if said_wake_word:
@@ -441,7 +552,8 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
                     # if a wake word is success full then record audio in temp
                     # file.
                     if self.save_wake_words:
-                        audio = self._create_audio_data(byte_data, source)
+                        audio = self._create_audio_data(byte_data.get(),
+                                                        source)
 
                         # if not os.path.exists(self.save_wake_words_dir):
                         #    os.makedirs(self.save_wake_words_dir)
@@ -477,7 +589,8 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
                     if said_hot_word:
                         # reset bytearray to store audio in, else many
                         # serial detections
-                        byte_data = silence
+                        byte_data.clear()
+                        byte_data.append(silence)
 
     def check_for_hotwords(self, audio_data, emitter):
         # check hot word
@@ -552,6 +665,7 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
         #       speech is detected, but there is no code to actually do that.
         self.adjust_for_ambient_noise(source, 1.0)
 
+        self.mic_level.emitter = emitter
         LOG.debug("Waiting for wake word...")
         self._wait_until_wake_word(source, sec_per_buffer, emitter)
         if self._stop_signaled:
@@ -560,8 +674,12 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
         LOG.debug("Recording...")
         emitter.emit("recognizer_loop:record_begin")
 
+        if self.streamer:
+            self.streamer.stream_start(source)
         frame_data = self._record_phrase(source, sec_per_buffer)
         audio_data = self._create_audio_data(frame_data, source)
+        if self.streamer:
+            self.streamer.stream_stop(audio_data)
         emitter.emit("recognizer_loop:record_end")
         if self.save_utterances:
             LOG.info("Recording utterance")
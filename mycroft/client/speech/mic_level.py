@@ -0,0 +1,129 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+    Microphone level telemetry.
+
+    The listener reports the energy of the audio and the current speech
+    threshold with a recognizer_loop:mic_level message, at most a few times
+    a second. Clients such as the cli meter read it with MicLevelMonitor.
+
+    The old mic_level file in the IPC directory can still be written for
+    tools polling it by setting "file": true in the "mic_level" section of
+    the listener configuration.
+"""
+from time import time
+
+from mycroft.util.log import LOG
+
+MIC_LEVEL_MESSAGE = 'recognizer_loop:mic_level'
+
+
+def format_mic_level(energy, threshold):
+    """ Format a level as written to the mic_level file. """
+    return "Energy:  cur=" + str(energy) + " thresh=" + str(threshold)
+
+
+def parse_mic_level(line):
+    """
+        Parse a level written to the mic_level file.
+
+        Args:
+            line (str): e.g. "Energy:  cur=4 thresh=1.5"
+
+        Returns:
+            tuple: (energy, threshold) as floats
+    """
+    parts = line.split("=")
+    return float(parts[-2].split(" ")[0]), float(parts[-1])
+
+
+class MicLevelPublisher(object):
+    """
+        Rate limited publisher of the microphone level.
+
+        Args:
+            emitter:            emitter to send the levels with, may be set
+                                later
+            interval (float):   minimum seconds between two levels
+            level_file (str):   file to write the levels to as well, None to
+                                only send messages
+    """
+
+    def __init__(self, emitter=None, interval=0.2, level_file=None):
+        self.emitter = emitter
+        self.interval = interval
+        self.level_file = level_file
+        self._last = None
+
+    def update(self, energy, threshold):
+        """
+            Report the level of the latest audio, skipped if the last level
+            was reported less than interval seconds ago.
+        """
+        now = time()
+        if self._last is not None and 0 <= now - self._last < self.interval:
+            return
+        self._last = now
+        if self.emitter:
+            self.emitter.emit(MIC_LEVEL_MESSAGE,
+                              {'energy': energy, 'threshold': threshold})
+        if self.level_file:
+            try:
+                with open(self.level_file, 'w') as f:
+                    f.write(format_mic_level(energy, threshold))
+            except IOError as e:
+                LOG.warning('Could not write mic level: ' + repr(e))
+                self.level_file = None
+
+
+class MicLevelMonitor(object):
+    """
+        Keep the latest microphone level sent by the listener.
+
+        Args:
+            ws:                 messagebus connection
+            on_update:          function called with energy and threshold
+                                for every level received
+            max_age (float):    seconds a level is valid, older levels are
+                                reported as missing since the listener
+                                stopped sending them
+    """
+
+    def __init__(self, ws, on_update=None, max_age=2.0):
+        self.on_update = on_update
+        self.max_age = max_age
+        self.energy = None
+        self.threshold = None
+        self.received = None
+        ws.on(MIC_LEVEL_MESSAGE, self.handle_mic_level)
+
+    def handle_mic_level(self, message):
+        self.energy = message.data['energy']
+        self.threshold = message.data['threshold']
+        self.received = time()
+        if self.on_update:
+            self.on_update(self.energy, self.threshold)
+
+    def get(self):
+        """
+            Get the latest level.
+
+            Returns:
+                tuple: (energy, threshold) or None if no recent level was
+                       received
+        """
+        if self.received is None or time() - self.received > self.max_age:
+            return None
+        return self.energy, self.threshold
@@ -0,0 +1,468 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+    Audio of thin clients streamed to the listener over a websocket.
+
+    Satellites without a speech client of their own connect to the remote
+    audio channel of the listener and stream the raw audio of their
+    microphone. Every connection becomes an audio source of the
+    RecognizerLoop with its own wake word detection and session, and the
+    messages about it carry the context the client started the stream with.
+
+    The audio doesn't go through the messagebus, the channel is a websocket
+    of its own. Text frames carry serialized Messages to control the stream,
+    binary frames carry the raw audio:
+
+        client                                  listener
+        remote_audio.start {source_id,
+            sample_rate, sample_width}  ---->
+                                        <----   remote_audio.ready {window}
+        binary frames of audio          ---->
+                                        <----   remote_audio.ack {bytes}
+        remote_audio.stop               ---->
+
+    The client never has more than "window" bytes of audio unacknowledged.
+    The listener acknowledges the audio once its recognizer has read it, so
+    a listener falling behind makes the client drop audio instead of the
+    audio piling up on the listener.
+"""
+import argparse
+import socket
+from threading import Condition, Lock
+from time import sleep
+
+from speech_recognition import AudioSource
+from tornado import ioloop, web
+from tornado.websocket import WebSocketHandler, WebSocketClosedError
+from websocket import create_connection, WebSocketException
+
+from mycroft.configuration import Configuration
+from mycroft.messagebus.message import Message
+from mycroft.util import create_daemon
+from mycroft.util.log import LOG
+
+START_MESSAGE = 'remote_audio.start'
+READY_MESSAGE = 'remote_audio.ready'
+ACK_MESSAGE = 'remote_audio.ack'
+STOP_MESSAGE = 'remote_audio.stop'
+ERROR_MESSAGE = 'remote_audio.error'
+
+
+class RemoteStream(object):
+    """
+        Audio received from a remote client, read by the recognizer.
+
+        Args:
+            sample_width (int): bytes per sample
+            max_buffer (int):   bytes kept at most, the oldest audio is
+                                dropped if more is received
+            on_consumed:        called with the number of bytes read or
+                                dropped
+    """
+
+    def __init__(self, sample_width, max_buffer, on_consumed=None):
+        self.sample_width = sample_width
+        self.max_buffer = max_buffer
+        self.on_consumed = on_consumed
+        self.muted = False
+        self.dropped = 0
+        self._buffer = bytearray()
+        self._closed = False
+        self._cond = Condition()
+
+    def write(self, data):
+        """ Add audio received from the client. """
+        with self._cond:
+            if self._closed:
+                return
+            self._buffer += data
+            excess = len(self._buffer) - self.max_buffer
+            if excess > 0:
+                # Drop whole samples
+                excess += -excess % self.sample_width
+                del self._buffer[:excess]
+                self.dropped += excess
+            self._cond.notify()
+        if excess > 0:
+            LOG.warning('Dropped {} bytes of remote audio'.format(excess))
+            if self.on_consumed:
+                self.on_consumed(excess)
+
+    def read(self, size, of_exc=False):
+        """
+            Read audio, waits until it has been received.
+
+            Arguments:
+                size (int): Number of frames to read
+                of_exc (bool): unused, the client drops audio instead
+
+            Returns:
+                the audio, shorter than size frames only when the stream
+                was closed
+
+            Raises:
+                EOFError: once the stream is closed and all audio was read
+        """
+        num_bytes = size * self.sample_width
+        with self._cond:
+            while len(self._buffer) < num_bytes and not self._closed:
+                self._cond.wait()
+            if not self._buffer:
+                raise EOFError
+            data = bytes(self._buffer[:num_bytes])
+            del self._buffer[:num_bytes]
+        if self.on_consumed:
+            self.on_consumed(len(data))
+        if self.muted:
+            return b'\0' * len(data)
+        return data
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class RemoteMicrophone(AudioSource):
+    """
+        Audio source of a remote client.
+
+        Args:
+            sample_rate (int):  sample rate of the audio
+            sample_width (int): bytes per sample
+            window (int):       bytes the client may send before they are
+                                acknowledged
+            send:               thread safe function sending a Message to
+                                the client
+            on_close:           called when the source is closed
+    """
+
+    def __init__(self, sample_rate, sample_width, window, send,
+                 on_close=None, chunk_size=1024):
+        self.SAMPLE_RATE = sample_rate
+        self.SAMPLE_WIDTH = sample_width
+        self.CHUNK = chunk_size
+        self.window = window
+        self.send = send
+        self.on_close = on_close
+        self.stream = RemoteStream(sample_width, window, self._consumed)
+        self.muted = False
+        self._lock = Lock()
+        self._consumed_bytes = 0
+        self._acked_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def _consumed(self, num_bytes):
+        """ Acknowledge the audio in steps of a quarter of the window. """
+        with self._lock:
+            self._consumed_bytes += num_bytes
+            if self._consumed_bytes - self._acked_bytes < self.window // 4:
+                return
+            self._acked_bytes = self._consumed_bytes
+        self.send(Message(ACK_MESSAGE, {'bytes': self._acked_bytes}))
+
+    def close(self):
+        self.stream.close()
+        if self.on_close:
+            self.on_close()
+
+    def mute(self):
+        self.muted = True
+        self.stream.muted = True
+
+    def unmute(self):
+        self.muted = False
+        self.stream.muted = False
+
+    def is_muted(self):
+        return self.muted
+
+
+class RemoteAudioConnection(object):
+    """
+        Protocol of a connection of a remote client, independent of the
+        websocket server.
+
+        Args:
+            listener (RecognizerLoop): loop to add the audio source to
+            config (dict):  the "remote_audio" section of the listener
+                            configuration
+            send:           thread safe function sending a Message to the
+                            client
+            close:          thread safe function closing the connection
+    """
+
+    def __init__(self, listener, config, send, close):
+        self.listener = listener
+        self.config = config
+        self.send = send
+        self.close = close
+        self.mic = None
+        self.source = None
+        self.starting = False
+        self.closed = False
+        self._lock = Lock()
+
+    def on_text(self, text):
+        try:
+            message = Message.deserialize(text)
+        except ValueError:
+            LOG.warning('Invalid remote audio message')
+            return
+        if message.type == START_MESSAGE:
+            self.start(message)
+        elif message.type == STOP_MESSAGE:
+            self.close()
+
+    def on_binary(self, data):
+        if self.mic:
+            self.mic.stream.write(data)
+
+    def start(self, message):
+        """ Start listening to the audio of the client. """
+        data = message.data
+        sample_rate = data.get('sample_rate', 16000)
+        sample_width = data.get('sample_width', 2)
+        expected_rate = self.listener.config.get('sample_rate', 16000)
+        if self.starting:
+            self.error('The stream has already started')
+        elif sample_rate != expected_rate or sample_width != 2:
+            self.error('The audio must be 16 bit at {} Hz'.format(
+                expected_rate))
+        elif not data.get('source_id'):
+            self.error('The source_id is missing')
+        else:
+            self.starting = True
+            # Creating the wake word engines of the source may take a while,
+            # e.g. downloading a model, so it's kept off the server thread
+            create_daemon(self._add_source, (data['source_id'], sample_rate,
+                                             sample_width, message.context))
+
+    def _add_source(self, source_id, sample_rate, sample_width, context):
+        window = self.config.get('window', 65536)
+        mic = RemoteMicrophone(sample_rate, sample_width, window, self.send,
+                               self.close)
+        try:
+            source = self.listener.add_source(source_id, mic, context)
+        except ValueError as e:
+            self.error(str(e))
+            return
+        except Exception:
+            LOG.exception('Could not add remote audio source ' + source_id)
+            self.error('Could not listen to the source')
+            return
+        with self._lock:
+            closed = self.closed
+            if not closed:
+                self.source = source
+                self.mic = mic
+        if closed:
+            # The client left while the source was added
+            self.listener.remove_source(source)
+            mic.stream.close()
+            return
+        LOG.info('Remote audio source {} connected'.format(source_id))
+        self.send(Message(READY_MESSAGE, {'window': window}))
+
+    def error(self, text):
+        LOG.warning('Remote audio error: ' + text)
+        self.send(Message(ERROR_MESSAGE, {'error': text}))
+        self.close()
+
+    def on_close(self):
+        with self._lock:
+            self.closed = True
+            source, self.source = self.source, None
+        if source:
+            LOG.info('Remote audio source {} disconnected'.format(
+                source.source_id))
+            self.listener.remove_source(source)
+        if self.mic:
+            # Ends the producer of the source once the audio is read
+            self.mic.stream.close()
+
+
+class RemoteAudioHandler(WebSocketHandler):
+    def initialize(self, listener, config):
+        self.listener = listener
+        self.config = config
+        self.io_loop = None
+        self.connection = None
+
+    def open(self):
+        self.io_loop = ioloop.IOLoop.current()
+        self.connection = RemoteAudioConnection(
+            self.listener, self.config, self.send, self.close_connection)
+
+    def on_message(self, message):
+        if isinstance(message, bytes):
+            self.connection.on_binary(message)
+        else:
+            self.connection.on_text(message)
+
+    def on_close(self):
+        self.connection.on_close()
+
+    def send(self, message):
+        self.io_loop.add_callback(self._write, message.serialize())
+
+    def _write(self, text):
+        try:
+            self.write_message(text)
+        except WebSocketClosedError:
+            pass
+
+    def close_connection(self):
+        self.io_loop.add_callback(self.close)
+
+    def check_origin(self, origin):
+        return True
+
+
+def start_remote_audio_server(listener, config):
+    """
+        Start accepting remote audio on a websocket of its own.
+
+        Args:
+            listener (RecognizerLoop): loop to add the audio sources to
+            config (dict): the "remote_audio" section of the listener
+                           configuration
+    """
+    route = config.get('route', '/audio')
+    application = web.Application([
+        (route, RemoteAudioHandler, {'listener': listener, 'config': config})
+    ])
+    application.listen(config.get('port', 8182), config.get('host', '0.0.0.0'))
+    LOG.info('Remote audio on port {} {}'.format(config.get('port', 8182),
+                                                 route))
+    create_daemon(ioloop.IOLoop.instance().start)
+
+
+class RemoteAudioClient(object):
+    """
+        Stream the audio of a microphone to the remote audio channel of a
+        listener, reconnecting when the connection is lost.
+
+        Args:
+            url (str):          url of the channel, e.g.
+                                ws://192.168.1.2:8182/audio
+            source_id (str):    id of the audio source on the listener
+            mic (AudioSource):  microphone to stream
+            context (dict):     context of the messages about the audio
+    """
+    RETRY_SEC = 5
+
+    def __init__(self, url, source_id, mic, context=None):
+        self.url = url
+        self.source_id = source_id
+        self.mic = mic
+        self.context = context or {}
+        self.running = False
+        self.dropped = 0
+        self._lock = Lock()
+        self._window = 0
+        self._sent = 0
+        self._acked = 0
+
+    def handle_message(self, message):
+        """ Handle a control Message of the listener. """
+        with self._lock:
+            if message.type == READY_MESSAGE:
+                self._window = message.data['window']
+            elif message.type == ACK_MESSAGE:
+                self._acked = max(self._acked, message.data['bytes'])
+        if message.type == ERROR_MESSAGE:
+            LOG.error('Remote audio error: ' + message.data.get('error'))
+
+    def send_chunk(self, ws, chunk):
+        """
+            Send a chunk of audio if the window allows it.
+
+            Returns:
+                bool: True if sent, False if dropped
+        """
+        with self._lock:
+            if self._sent - self._acked + len(chunk) > self._window:
+                self.dropped += len(chunk)
+                return False
+            self._sent += len(chunk)
+        ws.send_binary(chunk)
+        return True
+
+    def _receive(self, ws):
+        try:
+            while True:
+                self.handle_message(Message.deserialize(ws.recv()))
+        except (WebSocketException, socket.error, ValueError):
+            pass
+
+    def _stream(self, source):
+        ws = create_connection(self.url)
+        try:
+            with self._lock:
+                self._window = self._sent = self._acked = 0
+            ws.send(Message(START_MESSAGE, {
+                'source_id': self.source_id,
+                'sample_rate': source.SAMPLE_RATE,
+                'sample_width': source.SAMPLE_WIDTH
+            }, self.context).serialize())
+            create_daemon(self._receive, (ws,))
+            while self.running:
+                self.send_chunk(ws, source.stream.read(source.CHUNK, False))
+            ws.send(Message(STOP_MESSAGE).serialize())
+        finally:
+            ws.close()
+
+    def run(self):
+        self.running = True
+        with self.mic as source:
+            while self.running:
+                try:
+                    self._stream(source)
+                except (WebSocketException, socket.error) as e:
+                    LOG.warning('Remote audio connection failed: ' + repr(e))
+                    sleep(self.RETRY_SEC)
+
+    def stop(self):
+        self.running = False
+
+
+def main():
+    """ Stream the microphone of a satellite to a listener. """
+    from mycroft.client.speech.mic import MutableMicrophone
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('url', help='e.g. ws://192.168.1.2:8182/audio')
+    parser.add_argument('source_id', help='name of the satellite')
+    args = parser.parse_args()
+
+    config = Configuration.get().get('listener', {})
+    mic = MutableMicrophone(config.get('device_index'),
+                            config.get('sample_rate', 16000))
+    client = RemoteAudioClient(args.url, args.source_id, mic,
+                               {'client_name': args.source_id})
+    try:
+        client.run()
+    except KeyboardInterrupt:
+        client.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+    Streaming of phrases to the STT engine while they are recorded.
+
+    The ResponsiveRecognizer hands every recorded chunk to the STTStreamer,
+    which passes it on to a StreamingSTT engine on a separate thread. The
+    AudioConsumer then only waits for the result of the stream instead of
+    sending the whole phrase after the recording.
+"""
+from queue import Queue, Empty
+from threading import Event, Lock
+from weakref import WeakKeyDictionary
+
+from mycroft.session import SessionManager
+from mycroft.util import create_daemon
+
+
+class STTStream(object):
+    """
+        Transcription of a single phrase.
+
+        Args:
+            stt (StreamingSTT): engine to transcribe with
+            emitter:            emitter for the partial transcriptions
+            sample_rate (int):  sample rate of the audio
+            sample_width (int): bytes per sample
+            lock (Lock):        lock held while using the engine
+    """
+
+    def __init__(self, stt, emitter, sample_rate, sample_width, lock):
+        self.stt = stt
+        self.emitter = emitter
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.lock = lock
+        self.transcription = None
+        self.error = None
+        self._queue = Queue()
+        self._done = Event()
+        create_daemon(self._run)
+
+    def feed(self, chunk):
+        self._queue.put(chunk)
+
+    def finish(self):
+        """ Mark the end of the phrase. """
+        self._queue.put(None)
+
+    def _get_audio(self):
+        """
+            Get the audio recorded since the last call, waits for audio if
+            there is none.
+
+            Returns:
+                tuple: (audio, True if the phrase ended)
+        """
+        chunks = [self._queue.get()]
+        try:
+            while chunks[-1] is not None:
+                chunks.append(self._queue.get_nowait())
+        except Empty:
+            pass
+        finished = chunks[-1] is None
+        if finished:
+            chunks.pop()
+        return b''.join(chunks), finished
+
+    def _run(self):
+        try:
+            with self.lock:
+                self.stt.stream_start(self.sample_rate, self.sample_width)
+                partial = None
+                finished = False
+                while not finished:
+                    audio, finished = self._get_audio()
+                    if audio:
+                        text = self.stt.stream_data(audio)
+                        if text and text != partial:
+                            partial = text
+                            self.emit_partial(text)
+                self.transcription = self.stt.stream_stop()
+        except Exception as e:
+            self.error = e
+        finally:
+            self._done.set()
+
+    def emit_partial(self, text):
+        self.emitter.emit('recognizer_loop:partial_utterance', {
+            'utterance': text.lower().strip(),
+            'lang': self.stt.lang,
+            'session': SessionManager.get().session_id
+        })
+
+    def result(self, timeout=None):
+        """
+            Wait for the transcription.
+
+            Args:
+                timeout (float): seconds to wait at most
+
+            Returns:
+                str: the transcription
+
+            Raises:
+                the error of the engine if transcribing failed
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError('STT stream did not finish')
+        if self.error is not None:
+            raise self.error
+        return self.transcription
+
+
+class STTStreamer(object):
+    """
+        Stream the phrases recorded by a ResponsiveRecognizer to the STT
+        engine.
+
+        Args:
+            stt (StreamingSTT):         engine to transcribe with
+            emitter:                    emitter for partial transcriptions
+            state (RecognizerLoopState): phrases aren't streamed while the
+                                         loop is sleeping
+    """
+
+    def __init__(self, stt, emitter, state):
+        self.stt = stt
+        self.emitter = emitter
+        self.state = state
+        self.lock = Lock()
+        self._current = None
+        self._streams = WeakKeyDictionary()
+        self._streams_lock = Lock()
+
+    def stream_start(self, source):
+        """ Start streaming a phrase recorded from the source. """
+        if self._current:
+            # The last recording was aborted
+            self._current.finish()
+        self._current = None
+        if not self.state.sleeping:
+            self._current = STTStream(self.stt, self.emitter,
+                                      source.SAMPLE_RATE, source.SAMPLE_WIDTH,
+                                      self.lock)
+
+    def stream_chunk(self, chunk):
+        if self._current:
+            self._current.feed(chunk)
+
+    def stream_stop(self, audio):
+        """
+            End the phrase.
+
+            Args:
+                audio (AudioData): the recorded phrase
+        """
+        if self._current:
+            self._current.finish()
+            with self._streams_lock:
+                self._streams[audio] = self._current
+            self._current = None
+
+    def pop(self, audio):
+        """
+            Get the stream of a recorded phrase.
+
+            Args:
+                audio (AudioData): the phrase
+
+            Returns:
+                STTStream: the stream or None if the phrase wasn't streamed
+        """
+        with self._streams_lock:
+            return self._streams.pop(audio, None)
@@ -0,0 +1,243 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+    Voice activity detection for recording phrases.
+
+    The ResponsiveRecognizer asks its VAD engine whether each recorded chunk
+    contains speech and whether the speaker has stopped. The engine is
+    selected with the "vad" section of the listener configuration.
+"""
+import audioop
+import json
+from os.path import expanduser
+
+from mycroft.util.log import LOG
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class VADEngine(object):
+    """
+        Decide per chunk if a phrase is being spoken.
+
+        Args:
+            config (dict): the "vad" section of the listener configuration
+    """
+
+    def __init__(self, config=None):
+        self.config = config or {}
+
+    def start(self, sec_per_buffer, sample_rate, sample_width):
+        """ Prepare for recording a new phrase from an audio source. """
+        pass
+
+    def update(self, chunk, energy, threshold):
+        """
+            Process the next chunk of the phrase.
+
+            Args:
+                chunk (bytes):      the audio
+                energy (float):     rms of the chunk
+                threshold (float):  energy above which audio is loud
+
+            Returns:
+                bool: True if the chunk contains speech
+        """
+        return energy > threshold
+
+    def is_quiet(self):
+        """ Check if there was enough silence to end the phrase. """
+        return False
+
+
+class EnergyVAD(VADEngine):
+    """
+        Compare the energy of every chunk with the threshold.
+
+        A noise level rises with loud chunks and decays with quiet ones, the
+        phrase is over once it has decayed and stayed down for min_silence
+        seconds.
+    """
+    MAX_NOISE = 25
+    MIN_NOISE = 0
+
+    def __init__(self, config=None):
+        super(EnergyVAD, self).__init__(config)
+        self.min_silence = self.config.get('min_silence', 0.25)
+        self.sec_per_buffer = 0
+        self.noise = 0
+        self.silence_duration = 0
+
+    def start(self, sec_per_buffer, sample_rate, sample_width):
+        self.sec_per_buffer = sec_per_buffer
+        self.noise = 0
+        self.silence_duration = 0
+
+    def update(self, chunk, energy, threshold):
+        is_loud = energy > threshold
+        if is_loud:
+            if self.noise < self.MAX_NOISE:
+                self.noise += 200 * self.sec_per_buffer
+        elif self.noise > self.MIN_NOISE:
+            self.noise -= 100 * self.sec_per_buffer
+
+        if self.noise <= self.MIN_NOISE:
+            self.silence_duration += self.sec_per_buffer
+        else:
+            self.silence_duration = 0
+        return is_loud
+
+    def is_quiet(self):
+        return (self.noise <= self.MIN_NOISE and
+                self.silence_duration >= self.min_silence)
+
+
+def frame_features(frames, previous=None):
+    """
+        Calculate the features of a batch of audio frames.
+
+        Args:
+            frames (ndarray):   frames x samples
+            previous (ndarray): normalized spectrum of the frame before the
+                                batch, None if it is the first batch
+
+        Returns:
+            tuple: energy (rms), zero crossing rate and spectral flux of
+                   every frame and the normalized spectrum of the last frame
+    """
+    x = frames.astype(np.float32)
+    energy = np.sqrt(np.mean(x * x, axis=1))
+    signs = np.signbit(x)
+    zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+    spectrum = np.abs(np.fft.rfft(x * np.hanning(x.shape[1]), axis=1))
+    spectrum /= spectrum.sum(axis=1, keepdims=True) + 1e-9
+    if previous is None:
+        previous = spectrum[0]
+    before = np.vstack((previous[np.newaxis], spectrum[:-1]))
+    flux = np.maximum(spectrum - before, 0).sum(axis=1)
+    return energy, zcr, flux, spectrum[-1]
+
+
+class FeatureVAD(VADEngine):
+    """
+        Classify short frames by energy, zero crossing rate and spectral
+        flux, computed with numpy for all frames of a chunk at once.
+
+        A frame is speech if a linear model of log(energy / threshold), the
+        zero crossing rate and the spectral flux scores above zero. Hissing
+        noise like a fan a bit louder than the threshold crosses zero often
+        and scores low, so it doesn't keep the recording going. The phrase
+        is over after min_silence seconds of frames without speech.
+
+        The model can be replaced with a json file with "weights" (three
+        numbers) and "bias", set as "model" in the configuration.
+    """
+    FRAME_SEC = 0.02
+    WEIGHTS = (4.0, -6.0, 1.0)
+    BIAS = -1.0
+
+    def __init__(self, config=None):
+        super(FeatureVAD, self).__init__(config)
+        if np is None:
+            raise ImportError('numpy is needed for the feature VAD')
+        self.min_silence = self.config.get('min_silence', 0.25)
+        self.speech_ratio = self.config.get('speech_ratio', 0.3)
+        self.weights = np.array(self.WEIGHTS)
+        self.bias = self.BIAS
+        if self.config.get('model'):
+            self.load_model(expanduser(self.config['model']))
+        self.sample_width = 2
+        self.frame_size = int(16000 * self.FRAME_SEC)
+        self.trailing_silence = 0.0
+        self._rest = b''
+        self._spectrum = None
+
+    def load_model(self, path):
+        with open(path) as f:
+            model = json.load(f)
+        self.weights = np.array(model['weights'], dtype=np.float64)
+        self.bias = float(model.get('bias', 0.0))
+
+    def start(self, sec_per_buffer, sample_rate, sample_width):
+        self.sample_width = sample_width
+        self.frame_size = int(sample_rate * self.FRAME_SEC)
+        self.trailing_silence = 0.0
+        self._rest = b''
+        self._spectrum = None
+
+    def classify(self, audio, threshold):
+        """
+            Classify the frames of a batch of audio, the audio not filling
+            a frame is kept for the next call.
+
+            Args:
+                audio (bytes):      audio in the format passed to start()
+                threshold (float):  energy above which audio is loud
+
+            Returns:
+                ndarray: True for every frame containing speech
+        """
+        if self.sample_width != 2:
+            audio = audioop.lin2lin(audio, self.sample_width, 2)
+        data = self._rest + audio
+        num_frames = len(data) // (2 * self.frame_size)
+        used = num_frames * 2 * self.frame_size
+        self._rest = data[used:]
+        if num_frames == 0:
+            return np.zeros(0, dtype=bool)
+
+        frames = np.frombuffer(data[:used], dtype='<i2').reshape(
+            num_frames, self.frame_size)
+        energy, zcr, flux, self._spectrum = frame_features(frames,
+                                                           self._spectrum)
+        loudness = np.log(np.maximum(energy, 1.0) / max(threshold, 1.0))
+        features = np.column_stack((loudness, zcr, flux))
+        return features.dot(self.weights) + self.bias > 0
+
+    def update(self, chunk, energy, threshold):
+        speech = self.classify(chunk, threshold)
+        if len(speech) == 0:
+            return False
+        if speech.any():
+            last = len(speech) - 1 - int(np.argmax(speech[::-1]))
+            self.trailing_silence = (len(speech) - 1 - last) * self.FRAME_SEC
+        else:
+            self.trailing_silence += len(speech) * self.FRAME_SEC
+        return speech.mean() >= self.speech_ratio
+
+    def is_quiet(self):
+        return self.trailing_silence >= self.min_silence
+
+
+class VADFactory(object):
+    CLASSES = {
+        "energy": EnergyVAD,
+        "features": FeatureVAD
+    }
+
+    @staticmethod
+    def create_vad(config=None):
+        config = config or {}
+        module = config.get("module", "energy")
+        clazz = VADFactory.CLASSES.get(module)
+        try:
+            return clazz(config)
+        except Exception:
+            LOG.exception('Could not create VAD. Falling back to energy.')
+            return EnergyVAD(config)
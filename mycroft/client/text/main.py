@@ -38,6 +38,7 @@ import textwrap
 import json
 import mycroft.version
 from threading import Thread, Lock
+from mycroft.client.speech.mic_level import MicLevelMonitor, parse_mic_level
 from mycroft.messagebus.client.ws import WebsocketClient
 from mycroft.messagebus.message import Message
 from mycroft.util import get_ipc_directory
@@ -279,9 +280,7 @@ class MicMonitorThread(Thread):
 
                 # Just adjust meter settings
                 # Ex:Energy:  cur=4 thresh=1.5
-                parts = line.split("=")
-                meter_thresh = float(parts[-1])
-                meter_cur = float(parts[-2].split(" ")[0])
+                meter_cur, meter_thresh = parse_mic_level(line)
 
 
 def start_mic_monitor(filename):
@@ -291,6 +290,15 @@ def start_mic_monitor(filename):
         thread.start()
 
 
+def handle_mic_level(energy, threshold):
+    global meter_cur
+    global meter_thresh
+
+    meter_cur = energy
+    meter_thresh = threshold
+    draw_screen()
+
+
 def add_log_message(message):
     """ Show a message for the user (mixed in the logs) """
     global filteredLog
@@ -883,6 +891,7 @@ def gui_main(stdscr):
     ws = WebsocketClient()
     ws.on('speak', handle_speak)
     ws.on('message', handle_message)
+    MicLevelMonitor(ws, handle_mic_level)
     event_thread = Thread(target=connect)
     event_thread.setDaemon(True)
     event_thread.start()
@@ -1066,7 +1075,8 @@ start_log_monitor(localLogPath + "/mycroft-voice.log")
 start_log_monitor("/var/log/mycroft-skills.log")
 start_log_monitor("/var/log/mycroft-speech-client.log")
 
-# Monitor IPC file containing microphone level info
+# Monitor IPC file containing microphone level info, only written if enabled
+# in the listener config, the level is sent on the messagebus otherwise
 start_mic_monitor(os.path.join(get_ipc_directory(), "mic_level"))
 
 
@@ -19,6 +19,7 @@ import traceback
 import tornado.websocket
 from pyee import EventEmitter
 
+from mycroft.configuration import Configuration
 from mycroft.messagebus.message import Message
 from mycroft.util.log import LOG
 
@@ -33,16 +34,20 @@ class WebsocketEventHandler(tornado.websocket.WebSocketHandler):
         tornado.websocket.WebSocketHandler.__init__(
             self, application, request, **kwargs)
         self.emitter = EventBusEmitter
+        # Message types too frequent to log, e.g. the mic level
+        self.ignore_logs = Configuration.get().get("ignore_logs") or []
 
     def on(self, event_name, handler):
         self.emitter.on(event_name, handler)
 
     def on_message(self, message):
-        LOG.debug(message)
         try:
             deserialized_message = Message.deserialize(message)
-        except:
+        except Exception:
+            LOG.debug(message)
             return
+        if deserialized_message.type not in self.ignore_logs:
+            LOG.debug(message)
 
         try:
             self.emitter.emit(deserialized_message.type, deserialized_message)
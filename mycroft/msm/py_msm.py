@@ -5,8 +5,13 @@ from mycroft.messagebus.message import Message
 from mycroft.util.log import LOG
 from os.path import exists, expanduser, join, isdir
 from os import makedirs, listdir, remove, utime
+from multiprocessing.pool import ThreadPool
+import hashlib
+import io
+import json
 import requests
 import subprocess
+import time
 from git import Repo
 from git.cmd import Git, GitCommandError
 
@@ -22,6 +27,98 @@ class PipRequirementsException(Exception):
     pass
 
 
+_session = None
+
+
+def get_session():
+    """ http session shared by all skill managers, reuses connections """
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+
+class IndexCache(object):
+    """
+        on disk cache of the skill repo index files
+
+        files younger than ttl seconds are used as they are, older files are
+        revalidated with a conditional request and if the server can't be
+        reached the cached file is used whatever its age
+    """
+
+    def __init__(self, cache_dir, ttl=3600, timeout=10):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.timeout = timeout
+        self.entries = {}
+
+    def _path(self, url):
+        return join(self.cache_dir,
+                    hashlib.md5(url.encode("utf-8")).hexdigest())
+
+    def _load(self, url):
+        if url not in self.entries:
+            try:
+                with open(self._path(url) + ".json") as f:
+                    entry = json.load(f)
+                with io.open(self._path(url), encoding="utf-8") as f:
+                    entry["text"] = f.read()
+                self.entries[url] = entry
+            except (IOError, ValueError):
+                return None
+        return self.entries[url]
+
+    def _store(self, url, entry):
+        self.entries[url] = entry
+        try:
+            if not exists(self.cache_dir):
+                makedirs(self.cache_dir)
+            with io.open(self._path(url), "w", encoding="utf-8") as f:
+                f.write(entry["text"])
+            meta = dict((k, v) for k, v in entry.items() if k != "text")
+            with open(self._path(url) + ".json", "w") as f:
+                json.dump(meta, f)
+        except IOError as e:
+            LOG.warning("could not cache " + url + ": " + str(e))
+
+    def get(self, url):
+        """ content of url, None if not cached and it can't be downloaded """
+        entry = self._load(url)
+        if entry and time.time() - entry["fetched"] < self.ttl:
+            return entry["text"]
+
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            response = get_session().get(url, headers=headers,
+                                         timeout=self.timeout)
+        except requests.RequestException as e:
+            LOG.warning("could not download " + url + ": " + str(e))
+            return entry["text"] if entry else None
+
+        if response.status_code == 304 and entry:
+            LOG.debug("not modified: " + url)
+            entry["fetched"] = time.time()
+            self._store(url, entry)
+            return entry["text"]
+        if response.status_code != 200:
+            LOG.warning("could not download " + url + ": " +
+                        str(response.status_code))
+            return entry["text"] if entry else None
+        self._store(url, {"url": url,
+                          "text": response.text,
+                          "etag": response.headers.get("ETag"),
+                          "last_modified":
+                              response.headers.get("Last-Modified"),
+                          "fetched": time.time()})
+        return response.text
+
+
 class MycroftSkillsManager(object):
     DEFAULT_SKILLS = {'core': [u'mycroft-pairing', u'mycroft-configuration', u'mycroft-installer', u'mycroft-stop',
                                u'mycroft-naptime', u'mycroft-playback-control', u'mycroft-speak', u'mycroft-volume'],
@@ -41,6 +138,14 @@ class MycroftSkillsManager(object):
                       }
     SKILLS_MODULES = "https://raw.githubusercontent.com/MycroftAI/mycroft-skills/master/.gitmodules"
     SKILLS_DEFAULTS_URL = "https://raw.githubusercontent.com/MycroftAI/mycroft-skills/master/DEFAULT-SKILLS"
+    # hashes of the requirements files installed last, in the skills dir
+    HASHES_FILE = ".msm_requirements.json"
+    # git repos fetched at the same time
+    INSTALL_WORKERS = 8
+    # cache of the index files, relative to the data dir
+    INDEX_CACHE = ".msm-index"
+    # seconds index files are used without asking the server for changes
+    INDEX_TTL = 3600
 
     def __init__(self, emitter=None, skills_config=None, defaults_url=None, modules_url=None):
         self._skills_config = skills_config
@@ -48,6 +153,13 @@ class MycroftSkillsManager(object):
         self.defaults_url = defaults_url or self.SKILLS_DEFAULTS_URL
         self.skills = {}
         self.default_skills = {}
+        self.requirement_hashes = {}
+        self.index = {"name": {}, "url": {}}
+        self._indexed = None
+        data_dir = expanduser(
+            Configuration.get().get("data_dir", "~/.mycroft"))
+        self.index_cache = IndexCache(join(data_dir, self.INDEX_CACHE),
+                                      self.INDEX_TTL)
         LOG.info("platform: " + self.platform)
         self.prepare_msm()
         self.bind(emitter)
@@ -97,7 +209,7 @@ class MycroftSkillsManager(object):
         defaults = {}
         try:
             # get core and common skillw
-            text = requests.get(self.defaults_url).text
+            text = self.fetch(self.defaults_url)
             core = text.split("# core")[1]
             core, common = core.split("# common")
             core = [c for c in core.split("\n") if c]
@@ -108,7 +220,7 @@ class MycroftSkillsManager(object):
         defaults["common"] = common
         # get picroft
         try:
-            text = requests.get(self.defaults_url + ".picroft").text
+            text = self.fetch(self.defaults_url + ".picroft")
             picroft = text.split("# picroft")[1]
             picroft = [c for c in picroft.split("\n") if c]
         except:
@@ -116,7 +228,7 @@ class MycroftSkillsManager(object):
         defaults["picroft"] = picroft
         # get kde
         try:
-            text = requests.get(self.defaults_url+".kde").text
+            text = self.fetch(self.defaults_url + ".kde")
             kde = text.split("# desktop")[1]
             kde = [c for c in kde.split("\n") if c]
         except:
@@ -124,7 +236,7 @@ class MycroftSkillsManager(object):
         defaults["desktop"] = kde
         # get mark 1
         try:
-            text = requests.get(self.defaults_url+".mycroft_mark_1").text
+            text = self.fetch(self.defaults_url + ".mycroft_mark_1")
             mk1 = text.split("# mark 1")[1]
             mk1 = [c for c in mk1.split("\n") if c]
         except:
@@ -142,6 +254,9 @@ class MycroftSkillsManager(object):
             LOG.info("creating skills dir")
             makedirs(self.skills_dir)
 
+        # requirements installed so far
+        self.requirement_hashes = self.load_requirement_hashes()
+
         # update default skills list
         self.default_skills = self.get_default_skills()
 
@@ -167,13 +282,17 @@ class MycroftSkillsManager(object):
             for skill_folder in skill_list:
                 skills.append(skill_folder)
                 self.read_skill_folder(skill_folder)
+        self.build_index()
         LOG.info("scanned: " + str(skills))
         return skills
 
     def scan_skills_repo(self):
         """ get skills list from skills repo """
         LOG.info("scanning skills repo")
-        text = requests.get(self.modules_url).text
+        text = self.fetch(self.modules_url)
+        if text is None:
+            LOG.error("skills repo not available")
+            return []
         modules = text.split('[submodule "')
         skills = []
         for module in modules:
@@ -185,6 +304,7 @@ class MycroftSkillsManager(object):
             skill_data = self.url_info(url)
             skill_data["name"] = name
             self.skills[skill_data["folder"]] = skill_data
+        self.build_index()
         LOG.info("scanned: " + str(skills))
         return skills
 
@@ -222,28 +342,112 @@ class MycroftSkillsManager(object):
 
     def install_defaults(self, ignore_errors=True):
         """ installs the default skills, updates all others """
-        for skill in self.default_skills["core"]:
-            LOG.info("installing core skills")
-            self.install_by_name(skill, ignore_errors=ignore_errors)
-        for skill in self.default_skills["common"]:
-            LOG.info("installing common skills")
-            self.install_by_name(skill, ignore_errors=ignore_errors)
-        for skill in self.default_skills.get(self.platform, []):
-            LOG.info("installing platform specific skills")
-            self.install_by_name(skill, ignore_errors=ignore_errors)
-        self.update_skills(ignore_errors=ignore_errors)
+        LOG.info("installing default skills")
+        names = self.default_skills["core"] + self.default_skills["common"] + \
+            self.default_skills.get(self.platform, [])
+        urls = []
+        for name in names:
+            skill_folder = self.match_name_to_folder(name)
+            if skill_folder is None:
+                self.skill_not_found(name)
+            elif self.skills[skill_folder]["repo"] not in urls:
+                urls.append(self.skills[skill_folder]["repo"])
+        for skill in self.downloaded_skills:
+            url = self.skills[skill]["repo"]
+            if url and url not in urls:
+                urls.append(url)
+        self.send_message("msm.updating")
+        self.install_skills(urls, ignore_errors=ignore_errors)
+        self.send_message("msm.updated")
 
     def install_by_url(self, url, ignore_errors=False):
         """ installs from the specified github repo """
         url = url.strip()
         self.github_url_check(url)
-        data = self.url_info(url)
-        skill_folder = data["folder"]
+        return self.install_skills([url], ignore_errors)[url]
+
+    def install_skills(self, urls, ignore_errors=True, workers=None):
+        """
+            installs or updates several skills from their github repos
+
+            the repos are fetched concurrently, the requirements.sh and
+            requirements.txt of a skill only run if they changed since they
+            were last installed and the requirements.txt of all skills are
+            installed with a single pip run
+
+            returns a dict of url: True if the skill was installed
+        """
+        results = {}
+        fetching = []
+        for url in urls:
+            url = url.strip()
+            try:
+                self.github_url_check(url)
+            except AttributeError as e:
+                LOG.error(str(e))
+                self.install_failed({"repo": url}, "not a github url")
+                results[url] = False
+                continue
+            data = self.url_info(url)
+            self.send_message("msm.installing", data)
+            fetching.append((url, data))
+        if not fetching:
+            return results
+
+        # git operations don't depend on each other
+        pool = ThreadPool(min(workers or self.INSTALL_WORKERS, len(fetching)))
+        try:
+            errors = pool.map(
+                lambda item: self.fetch_skill(item[1], ignore_errors),
+                fetching)
+        finally:
+            pool.close()
+
+        fetched = []
+        for (url, data), error in zip(fetching, errors):
+            if error:
+                self.install_failed(data, error)
+                results[url] = False
+                continue
+            skill_folder = data["folder"]
+            if skill_folder not in self.skills:
+                self.skills[skill_folder] = data
+            self.skills[skill_folder]["downloaded"] = True
+            fetched.append((url, data))
+        self.build_index()
+
+        # system requirements one by one, they may ask for a password
+        installing = []
+        for url, data in fetched:
+            try:
+                self.run_requirements_sh(data["folder"])
+            except SystemRequirementsException:
+                if not ignore_errors:
+                    self.install_failed(data, "could not run requirements.sh")
+                    results[url] = False
+                    continue
+            installing.append((url, data))
+
+        pip_failed = self.run_pip_merged(
+            [data["folder"] for url, data in installing])
+
+        for url, data in installing:
+            if data["folder"] in pip_failed and not ignore_errors:
+                self.install_failed(
+                    data, "could not run install requirements.txt")
+                results[url] = False
+                continue
+            self.run_skills_requirements(data["folder"])
+            self.send_message("msm.install.succeeded", data)
+            self.send_message("msm.installed")
+            results[url] = True
+        return results
+
+    def fetch_skill(self, data, ignore_errors=False):
+        """ clones or pulls the repo of a skill, returns the error if any """
         path = data["path"]
-        self.send_message("msm.installing", data)
         if exists(path):
             LOG.info("skill exists, updating")
-            # TODO get hashes before pulling to decide if pip and res.sh should be run
             # TODO ensure skill master branch is checked out, else dont update
             g = Git(path)
             try:
@@ -252,40 +456,27 @@ class MycroftSkillsManager(object):
                 LOG.error("skill modified by user")
                 if not ignore_errors:
                     LOG.info("not updating")
-                    data["error"] = "skill modified by user"
-                    self.send_message("msm.install.failed", data)
-                    self.send_message("msm.installed")
-                    return False
+                    return "skill modified by user"
         else:
-            LOG.info("Downloading skill: " + url)
-            Repo.clone_from(url, path)
-
-        if skill_folder not in self.skills:
-            self.skills[skill_folder] = data
-
-        self.skills[skill_folder]["downloaded"] = True
-        try:
-            self.run_requirements_sh(skill_folder)
-        except SystemRequirementsException:
-            if not ignore_errors:
-                data["error"] = "could not run requirements.sh"
-                self.send_message("msm.install.failed", data)
-                self.send_message("msm.installed")
-                return False
+            LOG.info("Downloading skill: " + data["repo"])
+            try:
+                Repo.clone_from(data["repo"], path)
+            except GitCommandError as e:
+                LOG.error("could not download skill: " + str(e))
+                return "could not download skill"
+        return None
 
-        try:
-            self.run_pip(skill_folder)
-        except PipRequirementsException:
-            if not ignore_errors:
-                data["error"] = "could not run install requirements.txt"
-                self.send_message("msm.install.failed", data)
-                self.send_message("msm.installed")
-                return False
-
-        self.run_skills_requirements(skill_folder)
-        self.send_message("msm.install.succeeded", data)
+    def install_failed(self, data, error):
+        data["error"] = error
+        self.send_message("msm.install.failed", data)
         self.send_message("msm.installed")
-        return True
+
+    def skill_not_found(self, name):
+        data = {"name": name}
+        self.send_message("msm.installing", data)
+        data["error"] = "skill not found"
+        self.send_message("msm.install.failed", data)
+        self.send_message("msm.installed", data)
 
     def install_by_name(self, name, ignore_errors=False):
         """ installs the mycroft-skill matching <name> """
@@ -294,21 +485,19 @@ class MycroftSkillsManager(object):
         if skill_folder is not None:
             skill = self.skills[skill_folder]
             return self.install_by_url(skill["repo"], ignore_errors)
-        data = {"name": name}
-        self.send_message("msm.installing", data)
-        data["error"] = "skill not found"
-        self.send_message("msm.install.failed", data)
-        self.send_message("msm.installed", data)
+        self.skill_not_found(name)
         return False
 
     def update_skills(self, ignore_errors=True):
         """ update all downloaded skills """
         LOG.info("updating downloaded skills")
         self.send_message("msm.updating")
-        for skill in self.skills:
-            if self.skills[skill]["downloaded"]:
+        urls = []
+        for skill in self.downloaded_skills:
+            if self.skills[skill]["repo"]:
                 LOG.info("updating " + skill)
-                self.install_by_url(self.skills[skill]["repo"], ignore_errors)
+                urls.append(self.skills[skill]["repo"])
+        self.install_skills(urls, ignore_errors)
         self.send_message("msm.updated")
 
     def remove_by_url(self, url):
@@ -374,13 +563,41 @@ class MycroftSkillsManager(object):
         self.scan_skills_repo()
         return self.skills
 
+    def fetch(self, url):
+        """ content of an index file, cached, None if not available """
+        return self.index_cache.get(url)
+
+    def build_index(self):
+        """ index the known skills by name, folder and repo url """
+        index = {"name": {}, "url": {}}
+        for skill_folder, skill in self.skills.items():
+            index["name"][skill_folder.lower()] = skill_folder
+            if skill.get("repo"):
+                index["url"][skill["repo"]] = skill_folder
+        # names take precedence over folders
+        for skill_folder, skill in self.skills.items():
+            if skill.get("name"):
+                index["name"][skill["name"].lower()] = skill_folder
+        self.index = index
+        self._indexed = self._index_key()
+
+    def _index_key(self):
+        """ the indexed fields of every skill, changes if one does """
+        return tuple((skill_folder, skill.get("name"), skill.get("repo"))
+                     for skill_folder, skill in self.skills.items())
+
+    def get_index(self):
+        if self._indexed != self._index_key():
+            self.build_index()
+        return self.index
+
     def url_info(self, url):
         """ shows information about the skill in the specified repo """
         LOG.info("getting skill info from github url: " + url)
-        for skill in self.skills:
-            if url == self.skills[skill]["repo"]:
-                LOG.info("found skill!")
-                return self.skills[skill]
+        skill = self.get_index()["url"].get(url)
+        if skill in self.skills and self.skills[skill]["repo"] == url:
+            LOG.info("found skill!")
+            return self.skills[skill]
         self.github_url_check(url)
         if url.endswith("/"):
             url = url[:-1]
@@ -402,31 +619,109 @@ class MycroftSkillsManager(object):
         LOG.warning("skill not found")
         return {}
 
-    def run_pip(self, skill_folder):
-        LOG.info("running pip for: " + skill_folder)
+    @property
+    def hashes_file(self):
+        return join(self.skills_dir, self.HASHES_FILE)
+
+    def load_requirement_hashes(self):
+        """ hashes of the requirements files of every skill last installed """
+        try:
+            with open(self.hashes_file) as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return {}
+
+    def save_requirement_hashes(self):
+        try:
+            with open(self.hashes_file, "w") as f:
+                json.dump(self.requirement_hashes, f)
+        except IOError as e:
+            LOG.error("could not store requirement hashes: " + str(e))
+
+    def requirements_changed(self, skill_folder, filename):
+        """ check if a requirements file changed since it was installed """
+        path = join(self.skills[skill_folder]["path"], filename)
+        installed = self.requirement_hashes.get(skill_folder, {}).get(filename)
+        return file_hash(path) != installed
+
+    def requirements_installed(self, skill_folder, filename):
+        path = join(self.skills[skill_folder]["path"], filename)
+        hashes = self.requirement_hashes.setdefault(skill_folder, {})
+        hashes[filename] = file_hash(path)
+        self.save_requirement_hashes()
+
+    @staticmethod
+    def pip_install(args):
+        import pip # must be here or pip throws error code 2 on threads
+        pip_code = pip.main(['install'] + args)
+        # TODO parse pip code
+
+        if str(pip_code) == "1":
+            LOG.error("pip code: " + str(pip_code))
+            raise PipRequirementsException
+        LOG.debug("pip code: " + str(pip_code))
+
+    def run_pip(self, skill_folder, force=False):
         skill = self.skills[skill_folder]
+        reqs = join(skill["path"], "requirements.txt")
         # no need for sudo if in venv
         # TODO handle sudo if not in venv
-        # TODO check hash before re running
-        if exists(join(skill["path"], "requirements.txt")):
-            import pip # must be here or pip throws error code 2 on threads
-            pip_code = pip.main(['install', '-r', join(skill["path"], "requirements.txt")])
-            # TODO parse pip code
-
-            if str(pip_code) == "1":
-                LOG.error("pip code: " + str(pip_code))
-                raise PipRequirementsException
-            LOG.debug("pip code: " + str(pip_code))
+        if exists(reqs):
+            if not force and not self.requirements_changed(
+                    skill_folder, "requirements.txt"):
+                LOG.info("requirements.txt unchanged for: " + skill_folder)
+                return True
+            LOG.info("running pip for: " + skill_folder)
+            self.pip_install(['-r', reqs])
+            self.requirements_installed(skill_folder, "requirements.txt")
             return False
         else:
             LOG.info("no requirements.txt to run")
         return True
 
-    def run_requirements_sh(self, skill_folder):
+    def run_pip_merged(self, skill_folders):
+        """
+            installs the changed requirements.txt of several skills with a
+            single pip run, if it fails pip runs for every skill to find the
+            skills with broken requirements
+
+            returns the skills whose requirements could not be installed
+        """
+        changed = []
+        args = []
+        for skill_folder in skill_folders:
+            reqs = join(self.skills[skill_folder]["path"], "requirements.txt")
+            if exists(reqs) and self.requirements_changed(
+                    skill_folder, "requirements.txt"):
+                changed.append(skill_folder)
+                args += ['-r', reqs]
+        if not changed:
+            return []
+
+        LOG.info("running pip for: " + ", ".join(changed))
+        try:
+            self.pip_install(args)
+        except PipRequirementsException:
+            LOG.warning("pip failed, installing requirements skill by skill")
+            failed = []
+            for skill_folder in changed:
+                try:
+                    self.run_pip(skill_folder, force=True)
+                except PipRequirementsException:
+                    failed.append(skill_folder)
+            return failed
+        for skill_folder in changed:
+            self.requirements_installed(skill_folder, "requirements.txt")
+        return []
+
+    def run_requirements_sh(self, skill_folder, force=False):
         skill = self.skills[skill_folder]
         reqs = join(skill["path"], "requirements.sh")
-        # TODO check hash before re running
         if exists(reqs):
+            if not force and not self.requirements_changed(
+                    skill_folder, "requirements.sh"):
+                LOG.info("requirements.sh unchanged for: " + skill_folder)
+                return True
             LOG.info("running requirements.sh for: " + skill_folder)
             # make exec
             subprocess.call((["chmod", "+x", reqs]))
@@ -442,6 +737,7 @@ class MycroftSkillsManager(object):
                 LOG.error("Requirements.sh failed with error code: " + str(rc))
                 raise SystemRequirementsException
             LOG.info("Successfully ran requirements.sh for " + skill_folder)
+            self.requirements_installed(skill_folder, "requirements.sh")
         else:
             LOG.info("no requirements.sh to run")
             return False
@@ -464,7 +760,12 @@ class MycroftSkillsManager(object):
 
     def match_name_to_folder(self, name):
         LOG.info("searching skill by name: " + name)
-        folders = self.skills.keys()
+        skill = self.get_index()["name"].get(name.lower().strip())
+        if skill in self.skills:
+            return skill
+        folders = list(self.skills.keys())
+        if not folders:
+            return None
         names = [self.skills[skill]["name"] for skill in folders]
         f_skill, f_score = match_one(name, folders)
         n_skill, n_score = match_one(name, names)
@@ -642,7 +943,7 @@ class JarbasSkillsManager(MycroftSkillsManager):
         defaults = {}
         try:
             # get core and common skills
-            text = requests.get(self.defaults_url).text
+            text = self.fetch(self.defaults_url)
             core = text.split("# core")[1]
             core, common = core.split("# common")
             core = [c for c in core.split("\n") if c]
@@ -653,7 +954,7 @@ class JarbasSkillsManager(MycroftSkillsManager):
         defaults["common"] = common
         # get picroft
         try:
-            text = requests.get(self.defaults_url + ".picroft").text
+            text = self.fetch(self.defaults_url + ".picroft")
             picroft = text.split("# picroft")[1]
             picroft = [c for c in picroft.split("\n") if c]
         except:
@@ -661,7 +962,7 @@ class JarbasSkillsManager(MycroftSkillsManager):
         defaults["picroft"] = picroft
         # get kde
         try:
-            text = requests.get(self.defaults_url + ".kde").text
+            text = self.fetch(self.defaults_url + ".kde")
             kde = text.split("# desktop")[1]
             kde = [c for c in kde.split("\n") if c]
         except:
@@ -669,7 +970,7 @@ class JarbasSkillsManager(MycroftSkillsManager):
         defaults["desktop"] = kde
         # get mark 1
         try:
-            text = requests.get(self.defaults_url + ".mycroft_mark_1").text
+            text = self.fetch(self.defaults_url + ".mycroft_mark_1")
             mk1 = text.split("# mark 1")[1]
             mk1 = [c for c in mk1.split("\n") if c]
         except:
@@ -677,7 +978,7 @@ class JarbasSkillsManager(MycroftSkillsManager):
         defaults["mycroft_mark_1"] = mk1
         # get jarbas
         try:
-            text = requests.get(self.defaults_url + ".jarbas").text
+            text = self.fetch(self.defaults_url + ".jarbas")
             jarbas = text.split("# jarbas")[1]
             jarbas = [c for c in jarbas.split("\n") if c]
         except:
@@ -693,7 +994,9 @@ class JarbasSkillsManager(MycroftSkillsManager):
         platforms = ["core", "common", "kde", "jarbas", "desktop", "picroft",  "mycroft_mark_1"]
         scanned = []
         for platform in platforms:
-            text = requests.get(self.modules_url+platform+".txt").text
+            text = self.fetch(self.modules_url + platform + ".txt")
+            if text is None:
+                continue
             skills = text.splitlines()
             for s in skills:
                 try:
@@ -717,9 +1020,19 @@ class JarbasSkillsManager(MycroftSkillsManager):
                                              "author": skill_author, "name": name, "downloaded": downloaded}
 
             LOG.info("scanned " + platform + ": " + str(skills))
+        self.build_index()
         return scanned
 
 
+def file_hash(path):
+    """ md5 of the content of a file, None if it doesn't exist """
+    try:
+        with open(path, "rb") as f:
+            return hashlib.md5(f.read()).hexdigest()
+    except IOError:
+        return None
+
+
 def touch(fname):
     try:
         utime(fname, None)
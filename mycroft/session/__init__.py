@@ -52,35 +52,37 @@ class Session(object):
 
 class SessionManager(object):
     """
-    Keeps track of the current active session
+    Keeps track of the current active session of every audio source
     """
-    __current_session = None
+    __sessions = {}
     __lock = Lock()
 
     @staticmethod
-    def get():
+    def get(source_id=None):
         """
         get the active session.
 
+        :param source_id: id of the audio source the session belongs to,
+                          None for the default source
         :return: An active session
         """
         config = Configuration.get().get('session')
 
         with SessionManager.__lock:
-            if (not SessionManager.__current_session or
-                    SessionManager.__current_session.expired()):
-                SessionManager.__current_session = Session(
-                    str(uuid4()), expiration_seconds=config.get('ttl', 180))
-                LOG.info(
-                    "New Session Start: " +
-                    SessionManager.__current_session.session_id)
-            return SessionManager.__current_session
+            session = SessionManager.__sessions.get(source_id)
+            if not session or session.expired():
+                session = Session(str(uuid4()),
+                                  expiration_seconds=config.get('ttl', 180))
+                SessionManager.__sessions[source_id] = session
+                LOG.info("New Session Start: " + session.session_id)
+            return session
 
     @staticmethod
-    def touch():
+    def touch(source_id=None):
         """
         Update the last_touch timestamp on the current session
 
+        :param source_id: id of the audio source the session belongs to
         :return: None
         """
-        SessionManager.get().touch()
+        SessionManager.get(source_id).touch()
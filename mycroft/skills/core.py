@@ -17,7 +17,6 @@ import operator
 import sys
 import time
 import csv
-import inspect
 from inspect import signature
 from datetime import datetime, timedelta
 
@@ -28,7 +27,9 @@ from os.path import join, abspath, dirname, basename, exists
 from os import listdir
 from os.path import join, abspath, dirname, splitext, basename, exists, \
     realpath
-from threading import Event
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from contextlib import contextmanager
+from threading import Event, Lock, local
 
 from mycroft import dialog
 from mycroft.api import DeviceApi
@@ -39,6 +40,9 @@ from mycroft.dialog import DialogLoader
 from mycroft.filesystem import FileSystemAccess
 from mycroft.messagebus.message import Message
 from mycroft.metrics import report_metric, report_timing, Stopwatch
+from mycroft.skills.executor import get_handler_executor
+from mycroft.skills.manifest import ManifestRecorder, save_manifest
+from mycroft.skills.profiler import SkillLoadProfile
 from mycroft.skills.settings import SkillSettings
 from mycroft.skills.skill_data import (load_vocabulary, load_regex, to_alnum,
                                        munge_regex, munge_intent_parser)
@@ -50,20 +54,82 @@ from mycroft.dialog import get_all_vocab
 # python 2+3 compatibility
 from past.builtins import basestring
 
+try:
+    from contextvars import ContextVar
+except ImportError:
+    ContextVar = None
+
 MainModule = '__init__'
 
+# Events handled right away instead of waiting for a slot in the handler
+# executor behind the skill's other handlers
+UNQUEUED_EVENTS = ['mycroft.stop', 'converse.deactivate',
+                   'mycroft.skill.enable_intent',
+                   'mycroft.skill.disable_intent']
+
+
+class _LocalMessage(object):
+    """ Thread local stand-in for ContextVar on older pythons. """
+
+    def __init__(self):
+        self._local = local()
+
+    def get(self):
+        return getattr(self._local, 'message', None)
+
+    def set(self, message):
+        token = self.get()
+        self._local.message = message
+        return token
+
+    def reset(self, token):
+        self._local.message = token
+
+
+# Message being handled in the current context
+if ContextVar is not None:
+    _current_message = ContextVar('current_message', default=None)
+else:
+    _current_message = _LocalMessage()
+
+
+@contextmanager
+def handling_message(message):
+    """
+        Make a message the one returned by dig_for_message() while handling
+        it, handlers running on other threads need to set it themselves.
+
+        Args:
+            message (Message): message being handled
+    """
+    token = _current_message.set(message)
+    try:
+        yield
+    finally:
+        _current_message.reset(token)
+
 
 def dig_for_message():
     """
-        Dig Through the stack for message.
+        Get the message handled by the current event handler.
+
+        Handlers registered directly on the emitter don't set the message,
+        for those the calling frames are searched for a message variable.
+
+        Returns:
+            Message: the message or None outside of a handler
     """
-    stack = inspect.stack()
-    # Limit search to 10 frames back
-    stack = stack if len(stack) < 10 else stack[:10]
-    local_vars = [frame[0].f_locals for frame in stack]
-    for l in local_vars:
-        if 'message' in l and isinstance(l['message'], Message):
-            return l['message']
+    message = _current_message.get()
+    if message is None:
+        # Limit search to 10 frames back
+        frame = sys._getframe(1)
+        for _ in range(10):
+            if frame is None:
+                break
+            if isinstance(frame.f_locals.get('message'), Message):
+                return frame.f_locals['message']
+            frame = frame.f_back
+    return message
 
 
 def unmunge_message(message, skill_id):
@@ -95,20 +161,28 @@ def open_intent_envelope(message):
                   intent_dict.get('optional'))
 
 
-def load_skill(skill_descriptor, emitter, skill_id, BLACKLISTED_SKILLS=None):
+def load_skill(skill_descriptor, emitter, skill_id, BLACKLISTED_SKILLS=None,
+               registered=False, profile=None):
     """
         load skill from skill descriptor.
 
+        The registrations and events of the skill are recorded in its
+        manifest, see mycroft.skills.manifest.
+
         Args:
             skill_descriptor: descriptor of skill to load
             emitter:          messagebus emitter
             skill_id:         id number for skill
+            registered:       vocab and intents were already registered from
+                              the skill manifest, don't register them again
+            profile:          SkillLoadProfile recording the loading steps
         Returns:
             MycroftSkill: the loaded skill or None on failure
     """
     BLACKLISTED_SKILLS = BLACKLISTED_SKILLS or []
     path = skill_descriptor["path"]
     name = basename(path)
+    profile = profile or SkillLoadProfile(skill_id, path)
     LOG.info("ATTEMPTING TO LOAD SKILL: {} with ID {}".format(
         name, skill_id
     ))
@@ -116,8 +190,9 @@ def load_skill(skill_descriptor, emitter, skill_id, BLACKLISTED_SKILLS=None):
         LOG.info("SKILL IS BLACKLISTED " + name)
         return None
     main_file = join(path, MainModule + '.py')
+    profile.start()
     try:
-        with open(main_file, 'rb') as fp:
+        with open(main_file, 'rb') as fp, profile.phase('import'):
             skill_module = imp.load_module(
                 name.replace('.', '_'), fp, main_file,
                 ('.py', 'rb', imp.PY_SOURCE)
@@ -125,15 +200,27 @@ def load_skill(skill_descriptor, emitter, skill_id, BLACKLISTED_SKILLS=None):
         if (hasattr(skill_module, 'create_skill') and
                 callable(skill_module.create_skill)):
             # v2 skills framework
-            skill = skill_module.create_skill()
+            with profile.phase('create'):
+                skill = skill_module.create_skill()
+            recorder = ManifestRecorder(emitter, registered)
             skill.settings.allow_overwrite = True
             skill.settings.load_skill_settings_from_file()
-            skill.bind(emitter)
+            skill.bind(recorder)
             skill.skill_id = skill_id
-            skill.load_data_files(path)
+            with profile.data_file_phases(skill):
+                skill.load_data_files(path)
             # Set up intent handlers
-            skill.initialize()
-            skill._register_decorated()
+            with profile.phase('initialize'):
+                skill.initialize()
+            with profile.phase('register'):
+                skill._register_decorated()
+            # Loading is done, talk to the messagebus directly again
+            recorder.stop()
+            profile.messages = recorder.sent
+            skill.emitter = emitter
+            skill.enclosure.ws = emitter
+            save_manifest(path, recorder.get_manifest(
+                path, skill, lazy=not isinstance(skill, FallbackSkill)))
             LOG.info("Loaded " + name)
 
             # The very first time a skill is run, speak the intro
@@ -150,6 +237,8 @@ def load_skill(skill_descriptor, emitter, skill_id, BLACKLISTED_SKILLS=None):
             LOG.warning("Module {} does not appear to be skill".format(name))
     except Exception:
         LOG.exception("Failed to load skill: " + name)
+    finally:
+        profile.stop()
     return None
 
 
@@ -227,6 +316,7 @@ class MycroftSkill(object):
         self.registered_intents = []
         self.log = LOG.create_logger(self.name)
         self.reload_skill = True  # allow reloading
+        self.last_used = time.time()
         self.events = []
         self.scheduled_repeats = []
         self.skill_id = ""
@@ -618,9 +708,11 @@ class MycroftSkill(object):
                                 removed after it has been run once.
         """
 
-        def wrapper(message):
+        def run_handler(message):
             skill_data = {'name': get_handler_name(handler)}
             stopwatch = Stopwatch()
+            if name not in UNQUEUED_EVENTS:
+                self.last_used = time.time()
             try:
                 message = unmunge_message(message, self.skill_id)
                 # Indicate that the skill handler is starting
@@ -629,7 +721,7 @@ class MycroftSkill(object):
                     msg_type = handler_info + '.start'
                     self.emitter.emit(message.reply(msg_type, skill_data))
 
-                with stopwatch:
+                with stopwatch, handling_message(message):
                     if len(signature(handler).parameters) == 0:
                         handler()
                     else:
@@ -659,13 +751,27 @@ class MycroftSkill(object):
                     report_timing(context['ident'], 'skill_handler', stopwatch,
                                   {'handler': handler.__name__})
 
+        def wrapper(message):
+            executor = get_handler_executor()
+            if executor and name not in UNQUEUED_EVENTS:
+                executor.submit(self.skill_id, get_handler_name(handler),
+                                run_handler, message)
+            else:
+                run_handler(message)
+
         if handler:
+            # The message context is updated before the handler runs so
+            # replies from the handler carry the context of its message
             if once:
-                self.emitter.once(name, wrapper)
                 self.emitter.once(name, self.handle_update_message_context)
+                self.emitter.once(name, wrapper)
             else:
-                self.emitter.on(name, wrapper)
                 self.emitter.on(name, self.handle_update_message_context)
+                self.emitter.on(name, wrapper)
+            # Remembered so _shutdown() removes them, the wrapper holds a
+            # reference to the skill
+            self.events.append((name, self.handle_update_message_context))
+            self.events.append((name, wrapper))
 
     def handle_update_message_context(self, message):
         self.message_context = message.reply(message.type,{},
@@ -681,7 +787,7 @@ class MycroftSkill(object):
                 bool: True if found and removed, False if not found
         """
         removed = False
-        for _name, _handler in self.events:
+        for _name, _handler in list(self.events):
             if name == _name:
                 try:
                     self.events.remove((_name, _handler))
@@ -1018,8 +1124,13 @@ class MycroftSkill(object):
         """
         pass
 
-    def _shutdown(self):
-        """Parent function called internally to shut down everything"""
+    def _shutdown(self, detach=True):
+        """Parent function called internally to shut down everything
+
+        Args:
+            detach (bool): remove the intents of the skill, False if they
+                           stay registered to load the skill again on use
+        """
         try:
             self.shutdown()
         except Exception as e:
@@ -1034,8 +1145,9 @@ class MycroftSkill(object):
             self.emitter.remove(e, f)
         self.events = []  # Remove reference to wrappers
 
-        self.emitter.emit(
-            Message("detach_skill", {"skill_id": str(self.skill_id) + ":"}))
+        if detach:
+            self.emitter.emit(Message("detach_skill",
+                                      {"skill_id": str(self.skill_id) + ":"}))
         try:
             self.stop()
         except:
@@ -1192,6 +1304,32 @@ class MycroftSkill(object):
 #######################################################################
 # FallbackSkill base class
 #######################################################################
+_fallback_local = local()
+
+
+class FallbackEmitter(object):
+    """
+        Emitter proxy used by fallbacks running in a parallel tier.
+
+        Messages emitted from a thread evaluating a fallback are held back
+        so only the messages of the fallback selected by arbitration reach
+        the messagebus. Everything else is passed on to the wrapped emitter.
+    """
+
+    def __init__(self, emitter):
+        self.emitter = emitter
+
+    def emit(self, message):
+        held = getattr(_fallback_local, 'held', None)
+        if held is not None:
+            held.append((self.emitter, message))
+        else:
+            self.emitter.emit(message)
+
+    def __getattr__(self, attr):
+        return getattr(self.emitter, attr)
+
+
 class FallbackSkill(MycroftSkill):
     """
         FallbackSkill is used to declare a fallback to be called when
@@ -1202,9 +1340,13 @@ class FallbackSkill(MycroftSkill):
     skills_config = Configuration.get().get("skills", {})
     fallback_handlers = {}
     folders = {}
+    # Skills are initialized in parallel, guards the handlers and folders
+    _fallback_lock = Lock()
     override = skills_config.get("fallback_override", False)
     order = skills_config.get("fallback_priority", [])
+    parallel_config = skills_config.get("fallback_parallel", {})
     context = {}
+    executor = None
 
     def __init__(self, name=None, emitter=None):
         MycroftSkill.__init__(self, name, emitter)
@@ -1219,10 +1361,10 @@ class FallbackSkill(MycroftSkill):
         def ordered_handler(message):
             LOG.info("Overriding fallback order")
             LOG.info("Fallback order " + str(cls.order))
-            missing_folders = cls.folders.keys()
+            missing_folders = list(cls.folders.keys())
             LOG.info("Fallbacks " + str(missing_folders))
             # try fallbacks in ordered list
-            for folder in cls.order:
+            for folder in cls._ordered_folders():
                 for f in cls.folders.keys():
                     if folder == f:
                         if f in missing_folders:
@@ -1294,6 +1436,27 @@ class FallbackSkill(MycroftSkill):
                                   handler.__self__.name + " " + str(e))
             return False
 
+        def parallel_handler(message):
+            # try fallback tiers in order, running each tier at once
+            for tier in cls._fallback_tiers():
+                handler = cls._run_fallback_tier(tier, message)
+                if handler:
+                    try:
+                        message_context = handler.__self__.message_context
+                    except Exception:
+                        message_context = cls.context
+                    #  indicate completion
+                    ws.emit(message.reply(
+                        'mycroft.skill.handler.complete',
+                        data={'handler': "fallback",
+                              "fallback_handler": get_handler_name(
+                                  handler)},
+                        context=message_context))
+                    handler.__self__.make_active()
+                    cls.context = message.context
+                    return True
+            return False
+
         def handler(message):
             cls.context = message.context
             # indicate fallback handling start
@@ -1303,8 +1466,10 @@ class FallbackSkill(MycroftSkill):
 
             stopwatch = Stopwatch()
             handler_name = None
-            with stopwatch:
-                if cls.override:
+            with stopwatch, handling_message(message):
+                if cls.parallel_config.get("enabled", False):
+                    success = parallel_handler(message)
+                elif cls.override:
                     success = ordered_handler(message)
                 else:
                     success = priority_handler(message)
@@ -1325,6 +1490,110 @@ class FallbackSkill(MycroftSkill):
 
         return handler
 
+    @classmethod
+    def _ordered_folders(cls):
+        """ Flatten the configured fallback order, tiers included. """
+        folders = []
+        for entry in cls.order:
+            folders += entry if isinstance(entry, list) else [entry]
+        return folders
+
+    @classmethod
+    def _fallback_tiers(cls):
+        """
+            Group the registered fallback handlers into priority tiers.
+
+            With fallback_override every entry of the fallback order is a
+            tier, entries that are lists of skill folders make a tier with
+            several fallbacks. Fallbacks missing from the order form the last
+            tier. Otherwise priorities are grouped in blocks of tier_size.
+
+            Returns:
+                list: tiers in the order to try them, each a list of
+                      handlers sorted from highest to lowest priority
+        """
+        tiers = []
+        if cls.override:
+            ordered = []
+            for entry in cls.order:
+                folders = entry if isinstance(entry, list) else [entry]
+                ordered += folders
+                tier = [cls.folders[f] for f in folders if f in cls.folders]
+                if tier:
+                    tiers.append(tier)
+            missing = [cls.folders[f] for f in cls.folders
+                       if f not in ordered]
+            if missing:
+                tiers.append(missing)
+        else:
+            tier_size = cls.parallel_config.get("tier_size", 10)
+            by_tier = {}
+            for priority, handler in sorted(cls.fallback_handlers.items(),
+                                            key=operator.itemgetter(0)):
+                by_tier.setdefault(priority // tier_size, []).append(handler)
+            tiers = [by_tier[key] for key in sorted(by_tier)]
+        return tiers
+
+    @classmethod
+    def _run_fallback_tier(cls, tier, message):
+        """
+            Run all fallbacks of a tier at the same time.
+
+            The highest priority fallback that succeeds within the timeout
+            wins, the messages it emitted are then sent on. Fallbacks that
+            didn't start yet are cancelled and the messages of all other
+            fallbacks are dropped.
+
+            Args:
+                tier (list):        handlers sorted by priority
+                message (Message):  intent failure message
+
+            Returns:
+                the winning handler or None if no fallback succeeded
+        """
+        if cls.executor is None:
+            cls.executor = ThreadPoolExecutor(
+                max_workers=cls.parallel_config.get("workers", 8))
+        timeout = cls.parallel_config.get("timeout", 10)
+
+        def run(handler):
+            _fallback_local.held = []
+            try:
+                handler.__self__.handle_update_message_context(message)
+                with handling_message(message):
+                    return handler(message), _fallback_local.held
+            finally:
+                _fallback_local.held = None
+
+        for handler in tier:
+            skill = handler.__self__
+            if not isinstance(skill.emitter, FallbackEmitter):
+                skill.emitter = FallbackEmitter(skill.emitter)
+
+        futures = [cls.executor.submit(run, handler) for handler in tier]
+        deadline = time.time() + timeout
+        winner = None
+        for handler, future in zip(tier, futures):
+            try:
+                success, held = future.result(
+                    timeout=max(deadline - time.time(), 0))
+            except TimeoutError:
+                LOG.warning('Fallback timed out: ' + handler.__self__.name)
+                continue
+            except Exception as e:
+                LOG.exception('Exception in fallback: ' +
+                              handler.__self__.name + " " + str(e))
+                continue
+            if success:
+                winner = handler
+                for emitter, msg in held:
+                    emitter.emit(msg)
+                break
+
+        for future in futures:
+            future.cancel()
+        return winner
+
     @classmethod
     def _register_fallback(cls, handler, priority, skill_folder=None):
         """
@@ -1335,18 +1604,19 @@ class FallbackSkill(MycroftSkill):
         Lower priority gets run first
         0 for high priority 100 for low priority
         """
-        while priority in cls.fallback_handlers:
-            priority += 1
+        with cls._fallback_lock:
+            while priority in cls.fallback_handlers:
+                priority += 1
 
-        cls.fallback_handlers[priority] = handler
+            cls.fallback_handlers[priority] = handler
 
-        # folder name
-        if skill_folder is None:
-            skill_folder = handler.__self__._dir
-            skill_folder = skill_folder.split("/")[-1]
-            cls.folders[skill_folder] = handler
-        else:
-            LOG.error("skill folder error registering fallback")
+            # folder name
+            if skill_folder is None:
+                skill_folder = handler.__self__._dir
+                skill_folder = skill_folder.split("/")[-1]
+                cls.folders[skill_folder] = handler
+            else:
+                LOG.error("skill folder error registering fallback")
 
     def register_fallback(self, handler, priority):
         """
@@ -1371,23 +1641,23 @@ class FallbackSkill(MycroftSkill):
             Args:
                 handler_to_del: reference to handler
         """
-        success = False
-        for priority, handler in \
-                cls.fallback_handlers.items():
-            if handler == handler_to_del:
-                del cls.fallback_handlers[priority]
-                success = True
-        if not success:
-            LOG.warning('Could not remove fallback!')
-
-        success = False
-        for folder in cls.folders.keys():
-            handler = cls.folders[folder]
-            if handler == handler_to_del:
-                del cls.folders[folder]
-                success = True
-        if not success:
-            LOG.warning('Could not remove ordered fallback!')
+        with cls._fallback_lock:
+            success = False
+            for priority, handler in \
+                    list(cls.fallback_handlers.items()):
+                if handler == handler_to_del:
+                    del cls.fallback_handlers[priority]
+                    success = True
+            if not success:
+                LOG.warning('Could not remove fallback!')
+
+            success = False
+            for folder, handler in list(cls.folders.items()):
+                if handler == handler_to_del:
+                    del cls.folders[folder]
+                    success = True
+            if not success:
+                LOG.warning('Could not remove ordered fallback!')
 
     def remove_instance_handlers(self):
         """
@@ -1397,9 +1667,9 @@ class FallbackSkill(MycroftSkill):
             handler = self.instance_fallback_handlers.pop()
             self.remove_fallback(handler)
 
-    def _shutdown(self):
+    def _shutdown(self, detach=True):
         """
             Remove all registered handlers and perform skill shutdown.
         """
         self.remove_instance_handlers()
-        super(FallbackSkill, self)._shutdown()
+        super(FallbackSkill, self)._shutdown(detach)
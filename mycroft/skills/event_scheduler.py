@@ -12,16 +12,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import heapq
+import io
 import json
+import os
 import time
-from threading import Thread
+from itertools import count
+from threading import Thread, Condition, Event, Lock
 
-from os.path import isfile, join, expanduser
+from os.path import isfile, join, expanduser, dirname
 
 from mycroft.configuration import Configuration
 from mycroft.messagebus.message import Message
+from mycroft.util import create_daemon
 from mycroft.util.log import LOG
-from queue import Queue
+
+# Longest sleep between checks, catches changes of the system clock
+MAX_WAIT = 60
 
 
 def repeat_time(sched_time, repeat):
@@ -41,12 +48,197 @@ def repeat_time(sched_time, repeat):
     return next_time
 
 
+def apply_change(events, change):
+    """
+        Apply a change recorded in the journal to an events dict.
+
+        Args:
+            events (dict):  event: list of (time, repeat, data)
+            change (list):  ['schedule', event, time, repeat, data],
+                            ['remove', event] or ['update', event, data]
+    """
+    op, event = change[0], change[1]
+    if op == 'schedule':
+        events.setdefault(event, []).append(tuple(change[2:5]))
+    elif op == 'remove':
+        events.pop(event, None)
+    elif op == 'update' and events.get(event):
+        sched_time, repeat, _ = events[event][0]
+        events[event][0] = (sched_time, repeat, change[2])
+
+
+class ScheduleJournal(object):
+    """
+        Append only log of the changes to the schedule, so events
+        scheduled since the last clean shutdown survive a crash.
+
+        The journal starts with the complete schedule, written when it is
+        compacted, followed by the changes since. Changes are synced to
+        disk in batches, at most sync_interval seconds after they were
+        made. Repeating events aren't recorded, like on shutdown they are
+        left for the skills to schedule again.
+
+        Args:
+            path (str):             journal file
+            sync_interval (float):  seconds changes may wait for fsync
+            compact_after (int):    changes before the journal is rewritten,
+                                    at least the size of the schedule
+    """
+
+    def __init__(self, path, sync_interval=0.5, compact_after=1000):
+        self.path = path
+        self.sync_interval = sync_interval
+        self.compact_after = compact_after
+        self.changes = 0
+        self.compacted = 0
+        self._file = None
+        self._lock = Lock()
+        self._pending = Event()
+        self._syncer = None
+
+    def replay(self):
+        """
+            Read the schedule from the journal.
+
+            Returns:
+                dict: event: list of (time, repeat, data), None if there
+                      is no journal
+        """
+        if not isfile(self.path):
+            return None
+        events = {}
+        with io.open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    apply_change(events, json.loads(line))
+                except (ValueError, IndexError):
+                    # Partly written at a crash
+                    LOG.warning('Skipping broken journal entry')
+        return events
+
+    def record(self, *change):
+        """ Append a change, see apply_change() for the format. """
+        if change[0] == 'schedule' and change[3]:
+            return
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(json.dumps(change) + '\n')
+            self.changes += 1
+        self._pending.set()
+
+    @property
+    def needs_compaction(self):
+        return (self._file is not None and self.changes - self.compacted >=
+                max(self.compact_after, self.compacted))
+
+    def compact(self, events):
+        """
+            Replace the journal with one holding the current schedule.
+
+            The new journal is written next to the old one and renamed, the
+            old journal stays valid until the new one is complete.
+        """
+        tmp_path = self.path + '.tmp'
+        try:
+            # Written without the lock, record() isn't kept waiting for
+            # the fsync
+            entries = 0
+            with io.open(tmp_path, 'w', encoding='utf-8') as f:
+                for event in events:
+                    for sched_time, repeat, data in events[event]:
+                        if not repeat:
+                            f.write(json.dumps(['schedule', event,
+                                                sched_time, repeat,
+                                                data]) + '\n')
+                            entries += 1
+                f.flush()
+                os.fsync(f.fileno())
+            with self._lock:
+                if self._file:
+                    self._file.close()
+                os.replace(tmp_path, self.path)
+                self._file = io.open(self.path, 'a', encoding='utf-8')
+                self.changes = self.compacted = entries
+            self._sync_dir()
+        except (IOError, OSError) as e:
+            LOG.error('Schedule journal disabled: ' + repr(e))
+            with self._lock:
+                if self._file:
+                    self._file.close()
+                self._file = None
+        if self._syncer is None and self._file:
+            self._syncer = create_daemon(self._sync_loop)
+
+    def _sync_dir(self):
+        """ Make the rename of the journal durable. """
+        try:
+            fd = os.open(dirname(self.path), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def sync(self):
+        """ Write the recorded changes to disk. """
+        with self._lock:
+            if not self._file:
+                return
+            self._file.flush()
+            # The fsync can take long on slow storage, it's done on a
+            # duplicate so changes can be recorded in the meantime
+            fd = os.dup(self._file.fileno())
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _sync_loop(self):
+        while True:
+            self._pending.wait()
+            if self._file is None:
+                return
+            # Let changes made in the meantime share the sync
+            time.sleep(self.sync_interval)
+            self._pending.clear()
+            try:
+                self.sync()
+            except (IOError, OSError, ValueError) as e:
+                LOG.error('Failed to sync schedule journal: ' + repr(e))
+
+    def close(self):
+        """ Sync and close the journal. """
+        self.sync()
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+        self._pending.set()
+
+    def remove(self):
+        """ Remove the journal, the schedule was stored. """
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
 class EventScheduler(Thread):
     def __init__(self, emitter, schedule_file='schedule.json'):
         """
             Create an event scheduler thread. Will send messages at a
             predetermined time to the registered targets.
 
+            Pending times are kept in a heap ordered by time, the thread
+            sleeps until the first one is due or the schedule changes.
+            Changes are recorded in a journal next to the schedule file
+            as they happen, so they survive a crash.
+
             Args:
                 emitter:        event emitter to use to send messages
                 schedule_file:  File to store pending events to on shutdown
@@ -57,13 +249,17 @@ class EventScheduler(Thread):
         self.events = {}
         self.emitter = emitter
         self.isRunning = True
+        # (time, sequence number, event), entries of removed events stay
+        # in the heap and are skipped when they come up
+        self._heap = []
+        self._counter = count()
+        self._stale = 0
+        self._cond = Condition()
         self.schedule_file = join(data_dir, schedule_file)
+        self.journal = ScheduleJournal(self.schedule_file + '.journal')
         if self.schedule_file:
             self.load()
 
-        self.add = Queue()
-        self.remove = Queue()
-        self.update = Queue()
         self.emitter.on('mycroft.scheduler.schedule_event',
                         self.schedule_event_handler)
         self.emitter.on('mycroft.scheduler.remove_event',
@@ -76,98 +272,118 @@ class EventScheduler(Thread):
 
     def load(self):
         """
-            Load json data with active events from json file.
+            Load json data with active events from json file, or from the
+            journal if the scheduler wasn't shut down cleanly.
         """
-        if isfile(self.schedule_file):
-            json_data = {}
+        json_data = {}
+        try:
+            journal_data = self.journal.replay()
+        except (IOError, OSError) as e:
+            LOG.error('Could not read schedule journal: ' + repr(e))
+            journal_data = None
+        if journal_data is not None:
+            LOG.info('Restoring schedule from journal')
+            json_data = journal_data
+        elif isfile(self.schedule_file):
             with open(self.schedule_file) as f:
                 try:
                     json_data = json.load(f)
                 except Exception as e:
                     LOG.error(e)
-            current_time = time.time()
+        current_time = time.time()
+        with self._cond:
             for key in json_data:
                 event_list = json_data[key]
                 # discard non repeating events that has already happened
                 self.events[key] = [tuple(e) for e in event_list
                                     if e[0] > current_time or e[1]]
-
-    def fetch_new_events(self):
+            self._rebuild_heap()
+            # Start the journal from the loaded schedule
+            self.journal.compact(self.events)
+
+    def _record(self, *change):
+        """ Record a change in the journal, holding the lock. """
+        self.journal.record(*change)
+        if self.journal.needs_compaction:
+            self.journal.compact(self.events)
+
+    def _rebuild_heap(self):
+        """ Recreate the heap from the events, dropping stale entries. """
+        self._heap = [(t, next(self._counter), event)
+                      for event in self.events for t, _, _ in
+                      self.events[event]]
+        heapq.heapify(self._heap)
+        self._stale = 0
+
+    def _push(self, event, sched_time):
+        heapq.heappush(self._heap, (sched_time, next(self._counter), event))
+
+    def _pop_due(self, current_time):
         """
-            Fetch new events and add to list of pending events.
+            Take the events that are due from the schedule, repeating
+            events are scheduled again.
+
+            Returns:
+                list: (event, data) to emit
         """
-        while not self.add.empty():
-            event, sched_time, repeat, data = self.add.get(timeout=1)
-            # get current list of scheduled times for event, [] if missing
+        due = []
+        while self._heap and self._heap[0][0] <= current_time:
+            sched_time, _, event = heapq.heappop(self._heap)
             event_list = self.events.get(event, [])
-
-            # Don't schedule if the event is repeating and already scheduled
-            if repeat and event in self.events:
-                LOG.debug('Repeating event {} is already scheduled, discarding'
-                          .format(event))
+            for i, (t, repeat, data) in enumerate(event_list):
+                if t == sched_time:
+                    break
             else:
-                # add received event and time
-                event_list.append((sched_time, repeat, data))
-                self.events[event] = event_list
-
-    def remove_events(self):
-        """
-            Remove event from event list.
-        """
-        while not self.remove.empty():
-            event = self.remove.get()
-            if event in self.events:
-                self.events.pop(event)
-
-    def update_events(self):
-        """
-            Update event list with new data.
-        """
-        while not self.remove.empty():
-            event, data = self.update.get()
-            # if there is an active event with this name
-            if len(self.events.get(event, [])) > 0:
-                time, repeat, _ = self.events[event][0]
-                self.events[event][0] = (time, repeat, data)
+                # The event was removed
+                self._stale = max(self._stale - 1, 0)
+                continue
+            del event_list[i]
+            due.append((event, data))
+            # if this is a repeated event add a new trigger time
+            if repeat:
+                next_time = repeat_time(sched_time, repeat)
+                event_list.append((next_time, repeat, data))
+                self._push(event, next_time)
+        return due
+
+    def _next_timeout(self):
+        """ Seconds until the first event is due, None if there is none. """
+        if not self._heap:
+            return None
+        return min(max(self._heap[0][0] - time.time(), 0), MAX_WAIT)
 
     def run(self):
         while self.isRunning:
             self.check_state()
-            time.sleep(0.5)
+            with self._cond:
+                if self.isRunning:
+                    self._cond.wait(self._next_timeout())
 
     def check_state(self):
         """
-            Check if an event should be triggered.
+            Emit the events that are due.
         """
-        # Remove events
-        self.remove_events()
-        # Fetch newly scheduled events
-        self.fetch_new_events()
-        # Update events
-        self.update_events()
-
-        # Check all events
-        for event in self.events:
-            current_time = time.time()
-            e = self.events[event]
-            # Get scheduled times that has passed
-            passed = [(t, r, d) for (t, r, d) in e if t <= current_time]
-            # and remaining times that we're still waiting for
-            remaining = [(t, r, d) for t, r, d in e if t > current_time]
-            # Trigger registered methods
-            for sched_time, repeat, data in passed:
-                self.emitter.emit(Message(event, data))
-                # if this is a repeated event add a new trigger time
-                if repeat:
-                    next_time = repeat_time(sched_time, repeat)
-                    remaining.append((next_time, repeat, data))
-            # update list of events
-            self.events[event] = remaining
+        with self._cond:
+            due = self._pop_due(time.time())
+        for event, data in due:
+            self.emitter.emit(Message(event, data))
 
     def schedule_event(self, event, sched_time, repeat=None, data=None):
-        """ Send event to thread using thread safe queue. """
+        """ Add event to the schedule and wake up the thread if needed. """
         data = data or {}
-        self.add.put((event, sched_time, repeat, data))
+        with self._cond:
+            # Don't schedule if the event is repeating and already scheduled
+            if repeat and event in self.events:
+                LOG.debug('Repeating event {} is already scheduled, discarding'
+                          .format(event))
+                return
+            # add received event and time
+            self.events.setdefault(event, []).append((sched_time, repeat,
+                                                      data))
+            self._push(event, sched_time)
+            self._record('schedule', event, sched_time, repeat, data)
+            if self._heap[0][0] == sched_time:
+                self._cond.notify()
 
     def schedule_event_handler(self, message):
         """
@@ -193,8 +409,15 @@ class EventScheduler(Thread):
             LOG.error('Scheduled event time not provided')
 
     def remove_event(self, event):
-        """ Remove event using thread safe queue. """
-        self.remove.put(event)
+        """ Remove event from the schedule. """
+        with self._cond:
+            if event in self.events:
+                self._stale += len(self.events.pop(event))
+                self._record('remove', event)
+                # Don't let removed entries pile up in the heap
+                if self._stale > len(self._heap) // 2:
+                    self._rebuild_heap()
+                self._cond.notify()
 
     def remove_event_handler(self, message):
         """ Messagebus interface to the remove_event method. """
@@ -202,7 +425,14 @@ class EventScheduler(Thread):
         self.remove_event(event)
 
     def update_event(self, event, data):
-        self.update((event, data))
+        """ Replace the data of the first pending time of an event. """
+        with self._cond:
+            # if there is an active event with this name
+            if len(self.events.get(event, [])) > 0:
+                sched_time, repeat, _ = self.events[event][0]
+                self.events[event][0] = (sched_time, repeat, data)
+                self._record('update', event, data)
+                self._cond.notify()
 
     def update_event_handler(self, message):
         """ Messagebus interface to the update_event method. """
@@ -217,8 +447,9 @@ class EventScheduler(Thread):
         """
         event_name = message.data.get("name")
         event = None
-        if event_name in self.events:
-            event = self.events[event_name]
+        with self._cond:
+            if event_name in self.events:
+                event = list(self.events[event_name])
         emitter_name = 'mycroft.event_status.callback.{}'.format(event_name)
         self.emitter.emit(message.reply(emitter_name, data=event))
 
@@ -226,8 +457,9 @@ class EventScheduler(Thread):
         """
             Write current schedule to disk.
         """
-        with open(self.schedule_file, 'w') as f:
-            json.dump(self.events, f)
+        with self._cond:
+            with open(self.schedule_file, 'w') as f:
+                json.dump(self.events, f)
 
     def clear_repeating(self):
         """
@@ -245,7 +477,9 @@ class EventScheduler(Thread):
 
     def shutdown(self):
         """ Stop the running thread. """
-        self.isRunning = False
+        with self._cond:
+            self.isRunning = False
+            self._cond.notify()
         # Remove listeners
         self.emitter.remove_all_listeners('mycroft.scheduler.schedule_event')
         self.emitter.remove_all_listeners('mycroft.scheduler.remove_event')
@@ -256,4 +490,6 @@ class EventScheduler(Thread):
         self.clear_repeating()
         self.clear_empty()
         # Store all pending scheduled events
+        self.journal.close()
         self.store()
+        self.journal.remove()
@@ -0,0 +1,214 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+    Executor running skill event handlers.
+
+    Handlers are run on a dedicated thread pool instead of the messagebus
+    threads delivering the messages, so a slow handler can't stall the
+    messagebus. Every skill may run a limited number of handlers at the
+    same time, further calls are queued.
+"""
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, Event
+
+from mycroft.configuration import Configuration
+from mycroft.util import create_daemon
+from mycroft.util.log import LOG
+
+
+class _Job(object):
+    def __init__(self, name, func, args):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.queued = time.monotonic()
+        self.started = None
+        self.timed_out = False
+
+
+class _SkillQueue(object):
+    """ Handlers of a single skill, running and waiting. """
+
+    def __init__(self):
+        self.pending = deque()
+        self.running = []
+        self.stats = {'submitted': 0, 'completed': 0, 'errors': 0,
+                      'rejected': 0, 'expired': 0, 'timeouts': 0,
+                      'queue_wait_total': 0.0, 'queue_wait_max': 0.0,
+                      'run_time_total': 0.0, 'run_time_max': 0.0}
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats['running'] = len(self.running)
+        stats['queued'] = len(self.pending)
+        return stats
+
+
+class HandlerExecutor(object):
+    """
+        Run skill handlers with a per skill concurrency limit.
+
+        Args:
+            workers (int):          threads shared by all skills
+            max_concurrent (int):   handlers a skill may run at the same time
+            max_queued (int):       handlers a skill may have waiting, more
+                                    calls are dropped
+            timeout (float):        seconds a handler may run, slower
+                                    handlers are reported and no longer
+                                    count towards the skill's limit
+            queue_timeout (float):  seconds a handler may wait for its turn
+                                    before it is dropped as outdated
+    """
+
+    def __init__(self, workers=20, max_concurrent=2, max_queued=20,
+                 timeout=60, queue_timeout=30):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self._skills = {}
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._watchdog = None
+
+    def submit(self, skill_id, name, func, *args):
+        """
+            Run a handler of a skill.
+
+            Args:
+                skill_id:   skill the handler belongs to
+                name (str): name of the handler for logs
+                func:       function to call
+                args:       arguments to call it with
+
+            Returns:
+                bool: False if the handler was dropped since the skill's
+                      queue is full
+        """
+        job = _Job(name, func, args)
+        with self._lock:
+            if self._watchdog is None and self.timeout:
+                self._watchdog = create_daemon(self._watch)
+            queue = self._skills.setdefault(skill_id, _SkillQueue())
+            queue.stats['submitted'] += 1
+            if len(queue.running) < self.max_concurrent:
+                self._start(queue, job)
+            elif len(queue.pending) < self.max_queued:
+                queue.pending.append(job)
+            else:
+                queue.stats['rejected'] += 1
+                LOG.warning('Dropped {} of {}, {} handlers waiting'.format(
+                    name, skill_id, len(queue.pending)))
+                return False
+        return True
+
+    def _start(self, queue, job):
+        """ Start a job, must be called holding the lock. """
+        queue.running.append(job)
+        self.pool.submit(self._run, queue, job)
+
+    def _run(self, queue, job):
+        job.started = time.monotonic()
+        wait = job.started - job.queued
+        outcome = 'errors'
+        try:
+            if self.queue_timeout and wait > self.queue_timeout:
+                outcome = 'expired'
+                LOG.warning('Dropped {} after waiting {:.1f}s'.format(
+                    job.name, wait))
+            else:
+                job.func(*job.args)
+                outcome = 'completed'
+        except Exception:
+            LOG.exception('Error in handler ' + job.name)
+        finally:
+            run_time = time.monotonic() - job.started
+            with self._lock:
+                stats = queue.stats
+                stats[outcome] += 1
+                stats['queue_wait_total'] += wait
+                stats['queue_wait_max'] = max(stats['queue_wait_max'], wait)
+                stats['run_time_total'] += run_time
+                stats['run_time_max'] = max(stats['run_time_max'], run_time)
+                if not job.timed_out:
+                    self._finish(queue, job)
+
+    def _finish(self, queue, job):
+        """ Free the slot of a job and start the next, holding the lock. """
+        queue.running.remove(job)
+        if queue.pending:
+            self._start(queue, queue.pending.popleft())
+
+    def check_timeouts(self):
+        """ Report handlers running past the timeout and free their slot. """
+        now = time.monotonic()
+        with self._lock:
+            for skill_id, queue in self._skills.items():
+                for job in list(queue.running):
+                    if job.started and now - job.started > self.timeout:
+                        job.timed_out = True
+                        queue.stats['timeouts'] += 1
+                        LOG.warning('{} of {} still running after {}s'.format(
+                            job.name, skill_id, self.timeout))
+                        self._finish(queue, job)
+
+    def _watch(self):
+        while not self._stop_event.wait(1):
+            self.check_timeouts()
+
+    def get_stats(self):
+        """
+            Get the handler statistics of every skill.
+
+            Returns:
+                dict: skill_id: counts and queue wait / run time in seconds
+        """
+        with self._lock:
+            return {str(skill_id): queue.get_stats()
+                    for skill_id, queue in self._skills.items()}
+
+    def shutdown(self):
+        self._stop_event.set()
+        self.pool.shutdown(wait=False)
+
+
+_executor = None
+_executor_lock = Lock()
+
+
+def get_handler_executor():
+    """
+        Get the process wide handler executor.
+
+        Returns:
+            HandlerExecutor: the executor or None if handlers should run on
+                             the messagebus threads
+    """
+    global _executor
+    config = Configuration.get().get('skills', {}).get('handler_executor', {})
+    if not config.get('enabled', False):
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = HandlerExecutor(
+                workers=config.get('workers', 20),
+                max_concurrent=config.get('max_concurrent', 2),
+                max_queued=config.get('max_queued', 20),
+                timeout=config.get('timeout', 60),
+                queue_timeout=config.get('queue_timeout', 30))
+        return _executor
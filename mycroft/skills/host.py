@@ -0,0 +1,154 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+    Skill host process.
+
+    Runs the skills the SkillSupervisor of the skills service assigns to it,
+    see mycroft.skills.supervisor. Started as
+
+        python -m mycroft.skills.host <host id>
+"""
+import os
+import sys
+from threading import Lock
+
+from os.path import basename
+
+from mycroft.configuration import Configuration
+from mycroft.messagebus.client.ws import WebsocketClient
+from mycroft.messagebus.message import Message
+from mycroft.metrics import Stopwatch
+from mycroft.skills.core import load_skill, create_skill_descriptor, \
+    FallbackSkill, handling_message
+from mycroft.util import reset_sigint_handler, create_daemon, \
+    wait_for_exit_signal, bind_signals
+from mycroft.util.log import LOG
+
+
+class SkillHost(object):
+    """
+        Load and unload skills on request of the SkillSupervisor.
+
+        Args:
+            host_id (str):  id the supervisor knows this host by
+            ws:             messagebus connection
+    """
+
+    def __init__(self, host_id, ws):
+        self.host_id = host_id
+        self.ws = ws
+        self.skills = {}
+        self._lock = Lock()
+
+        ws.on('skill_host.load', self.handle_load)
+        ws.on('skill_host.unload', self.handle_unload)
+        ws.on('skill.converse.request', self.handle_converse_request)
+        ws.on('open', self.handle_open)
+
+    def _is_mine(self, message):
+        return message.data.get('host') == self.host_id
+
+    def handle_open(self, message=None):
+        """ Ask the supervisor for the skills to run, also on reconnect. """
+        self.ws.emit(Message('skill_host.ready', {'host': self.host_id,
+                                                  'pid': os.getpid()}))
+
+    def handle_load(self, message):
+        if self._is_mine(message):
+            self.load_skill(message.data['path'])
+
+    def handle_unload(self, message):
+        if self._is_mine(message):
+            self.unload_skill(message.data['path'])
+
+    def load_skill(self, skill_path):
+        """
+            Load a skill, fallback skills are handed back to the skills
+            service since fallbacks are run from there.
+        """
+        with self._lock:
+            if skill_path in self.skills:
+                return
+            skill_id = basename(skill_path)
+            blacklist = Configuration.get().get("skills", {}).get(
+                "blacklisted_skills", [])
+            stopwatch = Stopwatch()
+            with stopwatch:
+                instance = load_skill(create_skill_descriptor(skill_path),
+                                      self.ws, skill_id, blacklist)
+            data = {'path': skill_path, 'id': skill_id, 'host': self.host_id}
+            if instance is None:
+                self.ws.emit(Message('mycroft.skills.loading_failure', data))
+            elif isinstance(instance, FallbackSkill):
+                instance._shutdown()
+                self.ws.emit(Message('skill_host.rejected', data))
+            else:
+                self.skills[skill_path] = instance
+                data.update({'name': instance.name,
+                             'load_time': stopwatch.time})
+                LOG.info("Loaded {} in {:.3f}s".format(skill_id,
+                                                       stopwatch.time))
+                self.ws.emit(Message('mycroft.skills.loaded', data))
+
+    def unload_skill(self, skill_path):
+        with self._lock:
+            instance = self.skills.pop(skill_path, None)
+            if instance is None:
+                return
+            try:
+                instance._shutdown()
+            except Exception:
+                LOG.exception('Shutting down skill: ' + skill_path)
+            self.ws.emit(Message('mycroft.skills.shutdown',
+                                 {'path': skill_path,
+                                  'id': basename(skill_path),
+                                  'host': self.host_id}))
+
+    def handle_converse_request(self, message):
+        """ Answer converse requests for the skills of this host. """
+        skill_id = message.data['skill_id']
+        for instance in list(self.skills.values()):
+            if instance.skill_id == skill_id:
+                try:
+                    with handling_message(message):
+                        result = instance.converse(message.data['utterances'],
+                                                   message.data['lang'])
+                except BaseException:
+                    LOG.exception("Error in converse method for skill " +
+                                  str(skill_id))
+                    result = False
+                self.ws.emit(message.reply('skill.converse.response', {
+                    'skill_id': skill_id, 'result': result}))
+                return
+
+    def shutdown(self):
+        for skill_path in list(self.skills):
+            self.unload_skill(skill_path)
+
+
+def main():
+    reset_sigint_handler()
+    ws = WebsocketClient()
+    Configuration.init(ws)
+    bind_signals(ws)
+    host = SkillHost(sys.argv[1], ws)
+    create_daemon(ws.run_forever)
+    wait_for_exit_signal()
+    host.shutdown()
+    ws.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,9 @@
 # limitations under the License.
 #
 import time
+from multiprocessing.pool import ThreadPool
+from os.path import expanduser
+
 from adapt.context import ContextManagerFrame
 from adapt.engine import IntentDeterminationEngine
 from adapt.intent import IntentBuilder
@@ -20,11 +23,30 @@ from adapt.intent import IntentBuilder
 from mycroft.configuration import Configuration
 from mycroft.messagebus.message import Message
 from mycroft.skills.core import open_intent_envelope
+from mycroft.util import create_daemon
 from mycroft.util.log import LOG
 from mycroft.util.parse import normalize
 from mycroft.metrics import report_timing, Stopwatch
 
 
+def load_utterances(source):
+    """ Get the utterances to resolve in a batch.
+
+    Args:
+        source (list/str): list of utterances or path to a text file with
+                           one utterance per line. Empty lines and lines
+                           starting with # are skipped in files.
+
+    Returns:
+        list: utterances to resolve
+    """
+    if isinstance(source, str):
+        with open(expanduser(source)) as f:
+            lines = [line.strip() for line in f]
+        return [line for line in lines if line and not line.startswith('#')]
+    return [utterance for utterance in source if utterance]
+
+
 class AdaptIntent(IntentBuilder):
     def __init__(self, name=''):
         super().__init__(name)
@@ -147,6 +169,8 @@ class IntentService(object):
         self.emitter.on("mycroft.vocab.manifest", self.handle_vocab_manifest)
         self.emitter.on("mycroft.intent.manifest", self.handle_intent_manifest)
         self.emitter.on("mycroft.intent.get", self.handle_intent_get)
+        self.emitter.on("mycroft.intent.get_batch",
+                        self.handle_intent_get_batch)
         # Context related handlers
         self.emitter.on('add_context', self.handle_add_context)
         self.emitter.on('remove_context', self.handle_remove_context)
@@ -204,6 +228,104 @@ class IntentService(object):
         self.emitter.emit(Message("intent.response", {"utterance": utterance,
                                                       "intent_data": intent}))
 
+    def handle_intent_get_batch(self, message):
+        """ Resolve a list or a file of utterances.
+
+        Every result is streamed back as an "intent.batch.match" message in
+        input order and a final "intent.batch.response" carries the summary.
+        The batch runs in its own thread to keep the bus threads free.
+        """
+        source = message.data.get("utterances") or \
+            message.data.get("file") or []
+        lang = message.data.get("lang", "en-us")
+        workers = message.data.get("workers", 4)
+
+        def emit_match(result):
+            self.emitter.emit(message.reply("intent.batch.match", result))
+
+        def resolve():
+            try:
+                summary = self.resolve_batch(source, lang, workers,
+                                             emit_match)
+            except Exception as e:
+                LOG.exception(e)
+                summary = {"error": repr(e)}
+            self.emitter.emit(message.reply("intent.batch.response",
+                                            summary))
+
+        create_daemon(resolve)
+
+    def resolve_batch(self, utterances, lang="en-us", workers=4,
+                      callback=None):
+        """ Resolve many utterances on a pool of worker threads.
+
+        Each utterance is matched on its own, the same way a single
+        "mycroft.intent.get" request would be.
+
+        Args:
+            utterances (list/str): utterances or path to an utterance file
+            lang (str):            language of the utterances
+            workers (int):         number of worker threads
+            callback (function):   called with the result of every
+                                   utterance, in input order, as soon as
+                                   it is available
+
+        Returns:
+            dict: summary of the batch with the number of utterances,
+                  matches, no match rate, elapsed time, throughput
+                  (utterances per second), per utterance timing and
+                  per intent counts
+        """
+        utterances = load_utterances(utterances)
+
+        def resolve(item):
+            index, utterance = item
+            stopwatch = Stopwatch()
+            with stopwatch:
+                intent = self.get_intent(utterance, lang)
+            return {"index": index,
+                    "utterance": utterance,
+                    "intent_type": intent.get("intent_type") if intent
+                    else None,
+                    "confidence": intent.get("confidence", 0.0) if intent
+                    else 0.0,
+                    "time": stopwatch.time,
+                    "intent_data": intent}
+
+        intent_counts = {}
+        no_match = 0
+        total_time = 0.0
+        max_time = 0.0
+        pool = ThreadPool(max(1, workers))
+        stopwatch = Stopwatch()
+        try:
+            with stopwatch:
+                for result in pool.imap(resolve, enumerate(utterances)):
+                    intent_type = result["intent_type"]
+                    if intent_type:
+                        intent_counts[intent_type] = \
+                            intent_counts.get(intent_type, 0) + 1
+                    else:
+                        no_match += 1
+                    total_time += result["time"]
+                    max_time = max(max_time, result["time"])
+                    if callback:
+                        callback(result)
+        finally:
+            pool.terminate()
+
+        total = len(utterances)
+        return {"total": total,
+                "matched": total - no_match,
+                "no_match": no_match,
+                "no_match_rate": float(no_match) / total if total else 0.0,
+                "elapsed": stopwatch.time,
+                "throughput": total / stopwatch.time if stopwatch.time
+                else 0.0,
+                "mean_time": total_time / total if total else 0.0,
+                "max_time": max_time,
+                "intents": intent_counts}
+
     def get_intent(self, utterance, lang="en-us"):
         best_intent = None
 
@@ -16,11 +16,15 @@ import gc
 import os
 import sys
 import time
+import tracemalloc
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from glob import glob
 from itertools import chain
 
-from os.path import exists, join, basename, dirname, expanduser, isfile
-from threading import Timer, Thread, Event
+from os.path import exists, join, basename, dirname, expanduser, isfile, \
+    isdir
+from threading import Timer, Thread, Event, RLock
 
 import mycroft.lock
 from msm import MycroftSkillsManager, SkillRepo, MsmException
@@ -30,14 +34,21 @@ from mycroft.client.enclosure.api import EnclosureAPI
 from mycroft.configuration import Configuration
 from mycroft.messagebus.client.ws import WebsocketClient
 from mycroft.messagebus.message import Message
+from mycroft.metrics import Stopwatch
 from mycroft.skills.core import load_skill, create_skill_descriptor, \
-    MainModule, FallbackSkill
+    MainModule, FallbackSkill, handling_message
 from mycroft.skills.event_scheduler import EventScheduler
+from mycroft.skills.executor import get_handler_executor
 from mycroft.skills.intent_service import IntentService
+from mycroft.skills.manifest import load_manifest, COMMON_EVENTS
 from mycroft.skills.padatious_service import PadatiousService
+from mycroft.skills.profiler import SkillLoadProfile, ProfileStore, \
+    get_memory_usage, get_traced_memory
+from mycroft.skills.supervisor import SkillSupervisor
+from mycroft.skills.watcher import SkillWatcher, get_last_modified_date
 from mycroft.util import (
     connected, wait_while_speaking, reset_sigint_handler,
-    create_echo_function, create_daemon, wait_for_exit_signal
+    create_echo_function, create_daemon, wait_for_exit_signal, bind_signals
 )
 from mycroft.util.log import LOG
 
@@ -177,28 +188,6 @@ def check_connection():
         thread.start()
 
 
-def _get_last_modified_date(path):
-    """
-        Get last modified date excluding compiled python files, hidden
-        directories and the settings.json file.
-
-        Args:
-            path:   skill directory to check
-
-        Returns:
-            int: time of last change
-    """
-    all_files = []
-    for root_dir, dirs, files in os.walk(path):
-        dirs[:] = [d for d in dirs if not d.startswith('.')]
-        for f in files:
-            if (not f.endswith('.pyc') and f != 'settings.json' and
-                    not f.startswith('.')):
-                all_files.append(join(root_dir, f))
-    # check files of interest in the skill root directory
-    return max(os.path.getmtime(f) for f in all_files)
-
-
 class SkillManager(Thread):
     """ Load, update and manage instances of Skill on this system. """
 
@@ -209,7 +198,23 @@ class SkillManager(Thread):
 
         self.loaded_skills = {}
         self.ws = ws
+        self.watcher = None
+        self._changed_skills = set()
+        self._changed_event = Event()
+        self._lazy_lock = RLock()
         self.enclosure = EnclosureAPI(ws)
+        self.profile_store = ProfileStore()
+        self.idle_config = skills_config.get("idle_unload", {})
+        self._next_idle_check = time.time()
+
+        # Run skills in separate host processes
+        isolation = skills_config.get("isolation", {})
+        if isolation.get("enabled", False):
+            self.supervisor = SkillSupervisor(ws, isolation,
+                                              self._skill_rejected)
+            ws.on('mycroft.skills.loaded', self.handle_hosted_skill_loaded)
+        else:
+            self.supervisor = None
 
         # Schedule install/update of default skill
         self.msm = self.create_msm()
@@ -238,6 +243,9 @@ class SkillManager(Thread):
         ws.on('skillmanager.keep', self.deactivate_except)
         ws.on('skillmanager.activate', self.activate_skill)
         ws.on('skillmanager.reload', self.reload_skill)
+        ws.on('skillmanager.handlers', self.send_handler_stats)
+        ws.on('skillmanager.profile', self.send_profile)
+        ws.on('skillmanager.memory', self.send_memory_report)
 
     @staticmethod
     def create_msm():
@@ -350,6 +358,8 @@ class SkillManager(Thread):
             Returns True if the skill was loaded/reloaded
         """
         skill_path = skill_path.rstrip('/')
+        if not isdir(skill_path):
+            return False
         skill = self.loaded_skills.setdefault(skill_path, {})
         skill.update({
             "id": basename(skill_path),
@@ -361,13 +371,17 @@ class SkillManager(Thread):
             return False
 
         # getting the newest modified date of skill
-        modified = _get_last_modified_date(skill_path)
+        modified = get_last_modified_date(skill_path)
         last_mod = skill.get("last_modified", 0)
 
         # checking if skill is loaded and hasn't been modified on disk
         if skill.get("loaded") and modified <= last_mod:
             return False  # Nothing to do!
 
+        # check if skill has been deactivated
+        elif not skill.get('active', True):
+            return False
+
         # check if skill was modified
         elif skill.get("instance") and modified > last_mod:
             # check if skill has been blocked from reloading
@@ -397,18 +411,62 @@ class SkillManager(Thread):
                                  {"path": skill_path,
                                   "id": skill["id"]}))
 
+        # skill running in a host process
+        elif skill.get("host"):
+            LOG.debug("Reloading Skill: " + basename(skill_path))
+            self.supervisor.unload_skill(skill_path)
+            del skill["host"]
+
+        # skill registered from its manifest but never used
+        elif self._remove_lazy_skill(skill):
+            LOG.debug("Reloading Skill: " + basename(skill_path))
+            # The intents of the old manifest are still registered
+            self.ws.emit(Message("detach_skill",
+                                 {"skill_id": skill["id"] + ":"}))
+            self.ws.emit(Message("mycroft.skills.shutdown",
+                                 {"path": skill_path,
+                                  "id": skill["id"]}))
+
         skill["loaded"] = True
+        if self.supervisor and not skill.get("local"):
+            # The host reports the skill as loaded once it is running
+            skill["last_modified"] = modified
+            skill["host"] = self.supervisor.load_skill(skill_path)
+            return True
+
+        manifest = self._get_lazy_manifest(skill)
+        if manifest:
+            skill["last_modified"] = modified
+            self._register_lazy_skill(skill, manifest)
+            self.ws.emit(Message('mycroft.skills.loaded',
+                                 {'path': skill_path,
+                                  'id': skill['id'],
+                                  'name': manifest['name'],
+                                  'modified': modified,
+                                  'lazy': True}))
+            return True
+
         desc = create_skill_descriptor(skill_path)
-        skill["instance"] = load_skill(desc,
-                                       self.ws, skill["id"],
-                                       get_blacklisted_skills())
+        profile = SkillLoadProfile(skill["id"], skill_path)
+        stopwatch = Stopwatch()
+        with stopwatch:
+            skill["instance"] = load_skill(desc,
+                                           self.ws, skill["id"],
+                                           get_blacklisted_skills(),
+                                           profile=profile)
         skill["last_modified"] = modified
+        skill["load_time"] = stopwatch.time
+        if profile.started:
+            self.profile_store.add(profile.as_dict())
         if skill['instance'] is not None:
+            LOG.info("Loaded {} in {:.3f}s".format(skill['id'],
+                                                   stopwatch.time))
             self.ws.emit(Message('mycroft.skills.loaded',
                                  {'path': skill_path,
                                   'id': skill['id'],
                                   'name': skill['instance'].name,
-                                  'modified': modified}))
+                                  'modified': modified,
+                                  'load_time': stopwatch.time}))
             return True
         else:
             self.ws.emit(Message('mycroft.skills.loading_failure',
@@ -416,6 +474,211 @@ class SkillManager(Thread):
                                   'id': skill['id']}))
         return False
 
+    def _skill_rejected(self, skill_path):
+        """ Run a skill a host refused to run in this process instead. """
+        skill = self.loaded_skills.get(skill_path)
+        if skill:
+            LOG.info("Running {} in the skills service".format(skill["id"]))
+            skill.pop("host", None)
+            skill["local"] = True
+            skill["loaded"] = False
+            self.skill_changed(skill_path)
+
+    def handle_hosted_skill_loaded(self, message):
+        """ Record the load time of a skill loaded by a host process. """
+        skill = self.loaded_skills.get(message.data.get('path'))
+        if skill and message.data.get('host'):
+            skill["load_time"] = message.data.get('load_time', 0)
+
+    def _get_lazy_manifest(self, skill):
+        """ Get the manifest to register the skill from, if enabled. """
+        lazy_config = skills_config.get("lazy_loading", {})
+        if (not lazy_config.get("enabled", False) or
+                skill["id"] in lazy_config.get("exclude", []) or
+                skill["id"] in get_blacklisted_skills()):
+            return None
+        return load_manifest(skill["path"], skill["id"])
+
+    def _register_lazy_skill(self, skill, manifest, register=True):
+        """
+            Register the vocab and intents of a skill from its manifest
+            without loading it. The skill is loaded when one of its intents
+            or events first fires.
+
+            Args:
+                skill (dict):       entry of the skill in loaded_skills
+                manifest (dict):    manifest of the skill
+                register (bool):    send the registrations, False if they
+                                    are still registered
+        """
+        skill_path = skill["path"]
+
+        def activate(message):
+            self._activate_lazy_skill(skill_path, message)
+
+        for registration in manifest["registrations"] if register else []:
+            self.ws.emit(Message(registration["type"], registration["data"]))
+        for event in manifest["events"]:
+            self.ws.on(event, activate)
+        skill["lazy"] = {"handler": activate, "events": manifest["events"]}
+        LOG.info("Registered {} from its manifest".format(skill["id"]))
+
+    def _remove_lazy_skill(self, skill):
+        """
+            Remove the handlers loading a lazy skill.
+
+            Returns True if the skill was waiting to be loaded.
+        """
+        with self._lazy_lock:
+            lazy = skill.pop("lazy", None)
+            if lazy:
+                for event in lazy["events"]:
+                    self.ws.remove(event, lazy["handler"])
+            return lazy is not None
+
+    def _activate_lazy_skill(self, skill_path, message):
+        """
+            Load a skill registered from its manifest and pass it the
+            message that triggered the load.
+        """
+        with self._lazy_lock:
+            skill = self.loaded_skills.get(skill_path, {})
+            if not self._remove_lazy_skill(skill):
+                return  # Loaded by an earlier message
+            LOG.info("Activating " + skill["id"])
+            listeners = list(self.ws.emitter.listeners(message.type))
+            stopwatch = Stopwatch()
+            with stopwatch:
+                skill["instance"] = load_skill(
+                    create_skill_descriptor(skill_path), self.ws,
+                    skill["id"], get_blacklisted_skills(), registered=True)
+            skill["load_time"] = stopwatch.time
+
+        if skill["instance"] is None:
+            self.ws.emit(Message("detach_skill",
+                                 {"skill_id": skill["id"] + ":"}))
+            self.ws.emit(Message('mycroft.skills.loading_failure',
+                                 {'path': skill_path, 'id': skill['id']}))
+            return
+
+        # Only the handlers of the skill missed the message
+        for handler in self.ws.emitter.listeners(message.type):
+            if handler not in listeners:
+                handler(message)
+
+    def unload_idle_skills(self):
+        """ Unload the skills that weren't used for the idle time. """
+        idle_time = self.idle_config.get("idle_time", 3600)
+        exclude = self.idle_config.get("exclude", [])
+        now = time.time()
+        for skill in list(self.loaded_skills.values()):
+            instance = skill.get("instance")
+            if (instance and skill.get("active", True) and
+                    skill["id"] not in exclude and
+                    now - instance.last_used > idle_time):
+                self._unload_idle_skill(skill)
+
+    def _unload_idle_skill(self, skill):
+        """
+            Replace a loaded skill by the handlers loading it from its
+            manifest, its intents stay registered.
+
+            Returns:
+                int: bytes of memory reclaimed or None if the skill can't be
+                     loaded from a manifest or listens to events added after
+                     loading, like scheduled events
+        """
+        with self._lazy_lock:
+            instance = skill.get("instance")
+            manifest = load_manifest(skill["path"], skill["id"])
+            if instance is None or manifest is None:
+                return None
+            known_events = set(manifest["events"]) | set(COMMON_EVENTS)
+            if any(name not in known_events for name, _ in instance.events):
+                return None
+
+            memory = get_memory_usage()
+            instance._shutdown(detach=False)
+            instance_ref = weakref.ref(instance)
+            del skill["instance"], instance
+            gc.collect()
+            reclaimed = max(memory - get_memory_usage(), 0)
+            self._register_lazy_skill(skill, manifest, register=False)
+
+        if instance_ref() is not None:
+            LOG.warning("{} is still referenced after unloading, its memory "
+                        "is not reclaimed".format(skill["id"]))
+        skill["unloads"] = skill.get("unloads", 0) + 1
+        skill["reclaimed"] = skill.get("reclaimed", 0) + reclaimed
+        LOG.info("Unloaded idle skill {}, reclaimed {} kB".format(
+            skill["id"], reclaimed // 1024))
+        self.ws.emit(Message('mycroft.skills.unloaded',
+                             {'path': skill['path'],
+                              'id': skill['id'],
+                              'reclaimed': reclaimed}))
+        return reclaimed
+
+    def get_memory_report(self):
+        """
+            Get the memory accounting of the skills.
+
+            Returns:
+                dict: per skill its state, idle time, memory added while
+                      loading, memory allocated by its files (if tracemalloc
+                      is tracing) and memory reclaimed by idle unloading
+        """
+        profiles = {p['id']: p for p in self.profile_store.get_report()}
+        traced = get_traced_memory(list(self.loaded_skills))
+        now = time.time()
+        skills = []
+        for skill_path, skill in list(self.loaded_skills.items()):
+            instance = skill.get("instance")
+            if instance:
+                state = 'loaded'
+            elif skill.get("host"):
+                state = 'hosted'
+            elif skill.get("lazy"):
+                state = 'unloaded' if skill.get("unloads") else 'lazy'
+            else:
+                state = 'inactive'
+            profile = profiles.get(skill["id"], {})
+            skills.append({
+                'id': skill["id"],
+                'state': state,
+                'idle': now - instance.last_used if instance else None,
+                'load_rss_delta': profile.get('rss_delta'),
+                'traced_memory': traced.get(skill_path),
+                'unloads': skill.get("unloads", 0),
+                'reclaimed': skill.get("reclaimed", 0)
+            })
+        return {'skills': skills,
+                'reclaimed': sum(s['reclaimed'] for s in skills)}
+
+    def send_memory_report(self, message):
+        self.ws.emit(message.reply('skillmanager.memory.response',
+                                   self.get_memory_report()))
+
+    def _load_or_reload_skills(self, skill_paths):
+        """
+            Load or reload skills on a bounded pool of worker threads.
+
+            Returns True if any skill was loaded/reloaded
+        """
+        workers = skills_config.get("load_workers", 4)
+        if workers <= 1 or len(skill_paths) <= 1:
+            loaded = [self._load_or_reload_skill(p) for p in skill_paths]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                loaded = list(pool.map(self._load_or_reload_skill,
+                                       skill_paths))
+        return any(loaded)
+
+    def get_load_times(self):
+        """ Get the time each skill took to load, by skill id. """
+        return {skill['id']: skill['load_time']
+                for skill in self.loaded_skills.values()
+                if 'load_time' in skill}
+
     def load_priority(self):
         skills = {skill.name: skill for skill in self.msm.list()}
         for skill_name in PRIORITY_SKILLS:
@@ -429,6 +692,19 @@ class SkillManager(Thread):
                         continue
             self._load_or_reload_skill(skill.path)
 
+    def skill_changed(self, skill_path):
+        """ Queue a skill for a load or reload check. """
+        self._changed_skills.add(skill_path.rstrip('/'))
+        self._changed_event.set()
+
+    def _pop_changed_skills(self):
+        """ Get and clear the skills queued for a load or reload check. """
+        self._changed_event.clear()
+        skill_paths = list(self._changed_skills)
+        for skill_path in skill_paths:
+            self._changed_skills.discard(skill_path)
+        return skill_paths
+
     def run(self):
         """ Load skills and update periodically from disk and internet """
 
@@ -441,28 +717,52 @@ class SkillManager(Thread):
         # check if skill updates are enabled
         update = Configuration.get()["skills"]["auto_update"]
 
-        # Scan the file folder that contains Skills.  If a Skill is updated,
+        # Watch the folder that contains Skills.  If a Skill is updated,
         # unload the existing version from memory and reload from the disk.
+        self.watcher = SkillWatcher(self.msm.skills_dir, self.skill_changed)
+        self.watcher.start()
+        if self.supervisor:
+            self.supervisor.start()
         while not self._stop_event.is_set():
             # Update skills once an hour if update is enabled
             if time.time() >= self.next_download and update:
                 self.download_skills()
 
-            # Look for recently changed skill(s) needing a reload
-            # checking skills dir and getting all skills there
-            skill_paths = glob(join(self.msm.skills_dir, '*/'))
-            still_loading = False
-            for skill_path in skill_paths:
-                still_loading = (
-                        self._load_or_reload_skill(skill_path) or
-                        still_loading
-                )
+            if has_loaded:
+                # Only check the skill(s) reported as changed
+                skill_paths = self._pop_changed_skills()
+            else:
+                # checking skills dir and getting all skills there
+                skill_paths = glob(join(self.msm.skills_dir, '*/'))
+            # Priority skills were loaded in order by load_priority(), the
+            # remaining skills don't depend on each other
+            still_loading = self._load_or_reload_skills(skill_paths)
+            if still_loading:
+                self.profile_store.save()
             if not has_loaded and not still_loading and len(skill_paths) > 0:
                 has_loaded = True
-                self.ws.emit(Message('mycroft.skills.initialized'))
-
-            # Pause briefly before beginning next scan
-            time.sleep(2)
+                load_times = self.get_load_times()
+                LOG.info('Skill load times: ' + ', '.join(
+                    '{}: {:.3f}s'.format(name, load_times[name])
+                    for name in sorted(load_times, key=load_times.get,
+                                       reverse=True)))
+                self.ws.emit(Message('mycroft.skills.initialized',
+                                     {'load_times': load_times}))
+
+            if (has_loaded and self.idle_config.get("enabled", False) and
+                    time.time() >= self._next_idle_check):
+                self.unload_idle_skills()
+                self._next_idle_check = (
+                    time.time() + self.idle_config.get("check_interval", 300))
+
+            if has_loaded:
+                # Sleep until a skill changes or it's time to update
+                timeout = self.next_download - time.time() if update \
+                    else MINUTES
+                self._changed_event.wait(min(max(timeout, 1), MINUTES))
+            else:
+                # Pause briefly before beginning next scan
+                time.sleep(2)
 
     def send_skill_list(self, message=None):
         """
@@ -475,11 +775,31 @@ class SkillManager(Thread):
         except Exception as e:
             LOG.exception(e)
 
+    def send_profile(self, message):
+        """ Send the load profiles of the skills, slowest first. """
+        self.ws.emit(message.reply('skillmanager.profile.response',
+                                   {'skills':
+                                    self.profile_store.get_report()}))
+
+    def send_handler_stats(self, message):
+        """ Send the handler executor statistics of the skills. """
+        executor = get_handler_executor()
+        stats = executor.get_stats() if executor else {}
+        self.ws.emit(message.reply('skillmanager.handlers.response',
+                                   {'skills': stats}))
+
     def __deactivate_skill(self, skill):
         """ Deactivate a skill. """
         try:
             self.loaded_skills[skill]['active'] = False
-            self.loaded_skills[skill]['instance']._shutdown()
+            if self.loaded_skills[skill].pop('host', None):
+                self.supervisor.unload_skill(skill)
+            elif self._remove_lazy_skill(self.loaded_skills[skill]):
+                skill_id = self.loaded_skills[skill]['id']
+                self.ws.emit(Message("detach_skill",
+                                     {"skill_id": skill_id + ":"}))
+            else:
+                self.loaded_skills[skill]['instance']._shutdown()
         except Exception as e:
             LOG.error('Couldn\'t deactivate skill, {}'.format(repr(e)))
 
@@ -510,6 +830,7 @@ class SkillManager(Thread):
             if not self.loaded_skills[skill].get('active', True):
                 self.loaded_skills[skill]['loaded'] = False
                 self.loaded_skills[skill]['active'] = True
+                self.skill_changed(skill)
         except Exception as e:
             LOG.error('Couldn\'t activate skill, {}'.format(repr(e)))
 
@@ -519,12 +840,18 @@ class SkillManager(Thread):
             skill = message.data['skill']
             self.loaded_skills[skill]['loaded'] = False
             self.loaded_skills[skill]['active'] = True
+            self.skill_changed(skill)
         except Exception as e:
             LOG.error('Couldn\'t reload skill, {}'.format(repr(e)))
 
     def stop(self):
         """ Tell the manager to shutdown """
         self._stop_event.set()
+        self._changed_event.set()
+        if self.watcher:
+            self.watcher.stop()
+        if self.supervisor:
+            self.supervisor.shutdown()
 
         # Do a clean shutdown of all skills
         for name, skill_info in self.loaded_skills.items():
@@ -548,6 +875,8 @@ class SkillManager(Thread):
         # loop trough skills list and call converse for skill with skill_id
         for skill in self.loaded_skills:
             if self.loaded_skills[skill]["id"] == skill_id:
+                if self.loaded_skills[skill].get("host"):
+                    return  # Answered by the host process
                 try:
                     instance = self.loaded_skills[skill]["instance"]
                 except BaseException:
@@ -556,7 +885,8 @@ class SkillManager(Thread):
                         "skill_id": 0, "result": False}))
                     return
                 try:
-                    result = instance.converse(utterances, lang)
+                    with handling_message(message):
+                        result = instance.converse(utterances, lang)
                     self.ws.emit(message.reply("skill.converse.response", {
                         "skill_id": skill_id, "result": result}))
                     return
@@ -575,6 +905,10 @@ def main():
     # Connect this Skill management process to the websocket
     ws = WebsocketClient()
     Configuration.init(ws)
+    bind_signals(ws)
+    if skills_config.get("profile_tracemalloc", False):
+        # Lets the skill profiles report the memory allocated by each skill
+        tracemalloc.start()
 
     ws.on('message', create_echo_function('SKILLS'))
     # Startup will be called after websocket is fully live
@@ -594,6 +928,10 @@ def shutdown():
         skill_manager.stop()
         skill_manager.join()
 
+    executor = get_handler_executor()
+    if executor:
+        executor.shutdown()
+
 
 if __name__ == "__main__":
     main()
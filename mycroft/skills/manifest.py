@@ -0,0 +1,187 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+    Skill registration manifests.
+
+    While a skill loads, the vocabulary, regex, intents and padatious files
+    it registers and the messagebus events it listens to are recorded. The
+    manifest is stored keyed by a hash of the skill's files so on a later
+    boot the skill can be registered without importing it, see the
+    lazy_loading setting of the SkillManager.
+"""
+import hashlib
+import json
+import os
+from os.path import join, expanduser, isfile, relpath
+
+from mycroft.configuration import Configuration
+from mycroft.util.log import LOG
+from mycroft.util.signal import ensure_directory_exists
+
+# Messages registering a skill's vocabulary and intents
+REGISTRATION_MESSAGES = ['register_vocab', 'register_intent',
+                         'padatious:register_intent',
+                         'padatious:register_entity']
+
+# Events every skill listens to, these don't require the skill to load
+COMMON_EVENTS = ['mycroft.stop', 'converse.deactivate',
+                 'mycroft.skill.enable_intent',
+                 'mycroft.skill.disable_intent',
+                 'mycroft.skills.settings.update']
+
+# Files larger than this are hashed by size and modification time
+MAX_HASHED_FILE_SIZE = 1024 * 1024
+
+
+def get_skill_hash(path):
+    """
+        Hash the files of a skill, excluding compiled python files, hidden
+        files and the settings.json file.
+
+        Args:
+            path:   skill directory
+
+        Returns:
+            str: md5 hex digest
+    """
+    md5 = hashlib.md5()
+    for root_dir, dirs, files in os.walk(path):
+        dirs[:] = sorted(d for d in dirs
+                         if not d.startswith('.') and d != '__pycache__')
+        for f in sorted(files):
+            if (f.endswith('.pyc') or f == 'settings.json' or
+                    f.startswith('.')):
+                continue
+            file_path = join(root_dir, f)
+            md5.update(relpath(file_path, path).encode('utf-8'))
+            size = os.path.getsize(file_path)
+            if size > MAX_HASHED_FILE_SIZE:
+                md5.update('{}:{}'.format(
+                    size, os.path.getmtime(file_path)).encode('utf-8'))
+            else:
+                with open(file_path, 'rb') as fp:
+                    md5.update(fp.read())
+    return md5.hexdigest()
+
+
+def get_manifest_path(skill_name):
+    data_dir = expanduser(Configuration.get()['data_dir'])
+    return join(ensure_directory_exists(data_dir, 'skill_manifests'),
+                skill_name + '.json')
+
+
+def load_manifest(path, skill_id):
+    """
+        Load the manifest of a skill if it is still valid.
+
+        Args:
+            path:       skill directory
+            skill_id:   id the skill will be loaded with
+
+        Returns:
+            dict: the manifest or None if missing, outdated or the skill
+                  can't be loaded lazily
+    """
+    manifest_path = get_manifest_path(os.path.basename(path))
+    if not isfile(manifest_path):
+        return None
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except Exception as e:
+        LOG.warning('Could not read {}: {}'.format(manifest_path, repr(e)))
+        return None
+    if (not manifest.get('lazy') or
+            manifest.get('skill_id') != str(skill_id) or
+            manifest.get('hash') != get_skill_hash(path)):
+        return None
+    return manifest
+
+
+def save_manifest(path, manifest):
+    try:
+        with open(get_manifest_path(os.path.basename(path)), 'w') as f:
+            json.dump(manifest, f)
+    except Exception as e:
+        LOG.warning('Could not store skill manifest: ' + repr(e))
+
+
+class ManifestRecorder(object):
+    """
+        Emitter proxy recording what a skill registers while it loads.
+
+        Args:
+            emitter:        messagebus emitter to forward to
+            registered:     the registration messages were already sent,
+                            drop them instead of sending them again
+    """
+
+    def __init__(self, emitter, registered=False):
+        self.emitter = emitter
+        self.registered = registered
+        self.recording = True
+        self.registrations = []
+        self.events = []
+        self.emitted = []
+        self.sent = 0
+
+    def stop(self):
+        """ Stop recording, messages are only forwarded from now on. """
+        self.recording = False
+
+    def emit(self, message):
+        if not self.recording:
+            pass
+        elif message.type in REGISTRATION_MESSAGES:
+            self.registrations.append({'type': message.type,
+                                       'data': message.data})
+            if self.registered:
+                return
+        else:
+            self.emitted.append(message.type)
+        if self.recording:
+            self.sent += 1
+        self.emitter.emit(message)
+
+    def on(self, event, func):
+        if self.recording:
+            self._add_event(event)
+        self.emitter.on(event, func)
+
+    def once(self, event, func):
+        if self.recording:
+            self._add_event(event)
+        self.emitter.once(event, func)
+
+    def _add_event(self, event):
+        if event not in COMMON_EVENTS and event not in self.events:
+            self.events.append(event)
+
+    def __getattr__(self, attr):
+        return getattr(self.emitter, attr)
+
+    def get_manifest(self, path, skill, lazy=True):
+        """
+            Create the manifest of a loaded skill.
+
+            Skills emitting anything but registrations while loading
+            (scheduling events, speaking, ...) can't be loaded lazily.
+        """
+        return {'hash': get_skill_hash(path),
+                'name': skill.name,
+                'skill_id': str(skill.skill_id),
+                'lazy': lazy and len(self.emitted) == 0,
+                'registrations': self.registrations,
+                'events': self.events}
@@ -0,0 +1,284 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+    Skill startup profiler.
+
+    Records how long each loading step of a skill takes, how many messages
+    it sends and how much memory and how many threads it adds. Profiles are
+    stored between boots so changes show up in the load report.
+
+    Print the report of the running skills service, or of the last boot if
+    it isn't running, with
+
+        python -m mycroft.skills.profiler
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from threading import Lock
+
+from os.path import join, expanduser, isfile
+
+import psutil
+
+from mycroft.configuration import Configuration
+from mycroft.util.log import LOG
+
+# Loading steps in the order they are run
+PHASES = ['import', 'create', 'dialog', 'vocab', 'regex', 'initialize',
+          'register']
+
+# Methods of MycroftSkill loading the data files of a skill
+DATA_FILE_METHODS = {'dialog': 'init_dialog', 'vocab': 'load_vocab_files',
+                     'regex': 'load_regex_files'}
+
+
+def get_rss():
+    try:
+        return psutil.Process().memory_info().rss
+    except psutil.Error:
+        return 0
+
+
+def get_memory_usage():
+    """
+        Get the memory used by the process, the memory allocated by python
+        objects if tracemalloc is tracing since freed memory often isn't
+        returned to the system.
+
+        Returns:
+            int: bytes in use
+    """
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    return get_rss()
+
+
+def get_traced_memory(paths):
+    """
+        Get the memory allocated by the files in each directory.
+
+        Args:
+            paths (list): directories, e.g. the skill directories
+
+        Returns:
+            dict: path: bytes allocated by code in it, empty if tracemalloc
+                  isn't tracing
+    """
+    if not tracemalloc.is_tracing():
+        return {}
+    usage = {path: 0 for path in paths}
+    for stat in tracemalloc.take_snapshot().statistics('filename'):
+        filename = stat.traceback[0].filename
+        for path in paths:
+            if filename.startswith(path + os.sep):
+                usage[path] += stat.size
+    return usage
+
+
+class SkillLoadProfile(object):
+    """
+        Measurements of loading a single skill.
+
+        Memory and thread deltas are taken for the whole process, they
+        include other skills loading at the same time. If tracemalloc is
+        tracing, the memory allocated by the skill's own files is reported
+        as well.
+
+        Args:
+            skill_id:   id of the skill
+            path (str): skill directory
+    """
+
+    def __init__(self, skill_id, path):
+        self.skill_id = skill_id
+        self.path = path
+        self.phases = {}
+        self.messages = 0
+        self.started = None
+        self.total = 0.0
+        self._rss = 0
+        self._threads = 0
+        self.rss_delta = 0
+        self.thread_delta = 0
+        self.traced_memory = None
+
+    def start(self):
+        self._rss = get_rss()
+        self._threads = threading.active_count()
+        self.started = time.time()
+
+    def stop(self):
+        self.total = time.time() - self.started
+        self.rss_delta = get_rss() - self._rss
+        self.thread_delta = threading.active_count() - self._threads
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(True, join(self.path, '*'))])
+            self.traced_memory = sum(stat.size for stat in
+                                     snapshot.statistics('filename'))
+
+    @contextmanager
+    def phase(self, name):
+        """ Time a loading step, repeated steps are added up. """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.phases[name] = (self.phases.get(name, 0.0) +
+                                 time.time() - start)
+
+    @contextmanager
+    def data_file_phases(self, skill):
+        """ Time the dialog, vocab and regex loading methods of a skill. """
+        for name, method in DATA_FILE_METHODS.items():
+            setattr(skill, method, self._timed(name, getattr(skill, method)))
+        try:
+            yield
+        finally:
+            for method in DATA_FILE_METHODS.values():
+                delattr(skill, method)
+
+    def _timed(self, name, func):
+        def timed(*args, **kwargs):
+            with self.phase(name):
+                return func(*args, **kwargs)
+        return timed
+
+    def as_dict(self):
+        return {'id': str(self.skill_id),
+                'time': self.started,
+                'total': self.total,
+                'phases': dict(self.phases),
+                'messages': self.messages,
+                'rss_delta': self.rss_delta,
+                'thread_delta': self.thread_delta,
+                'traced_memory': self.traced_memory}
+
+
+class ProfileStore(object):
+    """
+        Skill profiles of the last boots.
+
+        Args:
+            path (str):         json file storing the profiles, defaults to
+                                skill_profiles.json in the data directory
+            history_size (int): profiles kept for every skill
+    """
+
+    def __init__(self, path=None, history_size=5):
+        if path is None:
+            data_dir = expanduser(Configuration.get()['data_dir'])
+            path = join(data_dir, 'skill_profiles.json')
+        self.path = path
+        self.history_size = history_size
+        self.profiles = {}
+        self._lock = Lock()
+        self.load()
+
+    def load(self):
+        if isfile(self.path):
+            try:
+                with open(self.path) as f:
+                    self.profiles = json.load(f)
+            except Exception as e:
+                LOG.warning('Could not read skill profiles: ' + repr(e))
+
+    def save(self):
+        with self._lock:
+            try:
+                with open(self.path, 'w') as f:
+                    json.dump(self.profiles, f)
+            except Exception as e:
+                LOG.warning('Could not store skill profiles: ' + repr(e))
+
+    def add(self, profile):
+        """ Add the profile of a skill load, as created by as_dict(). """
+        with self._lock:
+            history = self.profiles.setdefault(profile['id'], [])
+            history.append(profile)
+            del history[:-self.history_size]
+
+    def get_report(self):
+        """
+            Get the last profile of every skill and the change in load time
+            since the profile before, slowest skills first.
+        """
+        with self._lock:
+            report = []
+            for history in self.profiles.values():
+                profile = dict(history[-1])
+                if len(history) > 1:
+                    profile['change'] = profile['total'] - history[-2]['total']
+                report.append(profile)
+        return sorted(report, key=lambda p: p['total'], reverse=True)
+
+
+def format_report(report):
+    """
+        Format a load report as a table.
+
+        Args:
+            report (list): profiles as returned by ProfileStore.get_report()
+
+        Returns:
+            str: the table
+    """
+    header = (['skill', 'total', 'change'] + PHASES +
+              ['msgs', 'rss kB', 'traced kB', 'threads'])
+    rows = [header]
+    for profile in report:
+        change = profile.get('change')
+        traced = profile.get('traced_memory')
+        rows.append(
+            [profile['id'], '{:.3f}'.format(profile['total']),
+             '{:+.3f}'.format(change) if change is not None else '-'] +
+            ['{:.3f}'.format(profile['phases'][p])
+             if p in profile['phases'] else '-' for p in PHASES] +
+            [str(profile['messages']),
+             str(profile['rss_delta'] // 1024),
+             str(traced // 1024) if traced is not None else '-',
+             str(profile['thread_delta'])])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return '\n'.join(
+        '  '.join(cell.ljust(w) if i == 0 else cell.rjust(w)
+                  for i, (cell, w) in enumerate(zip(row, widths)))
+        for row in rows)
+
+
+def main():
+    from mycroft.messagebus.client.ws import WebsocketClient
+    from mycroft.messagebus.message import Message
+    from mycroft.util import create_daemon
+
+    ws = WebsocketClient()
+    create_daemon(ws.run_forever)
+    response = None
+    if ws.connected_event.wait(3):
+        response = ws.wait_for_response(Message('skillmanager.profile'))
+    ws.close()
+    if response:
+        report = response.data['skills']
+    else:
+        print('Skills service not running, showing the last boot\n')
+        report = ProfileStore().get_report()
+    print(format_report(report))
+
+
+if __name__ == '__main__':
+    main()
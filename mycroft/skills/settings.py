@@ -56,11 +56,18 @@
         s['meaning of life'] = 42
         s['flower pot sayings'] = 'Not again...'
         s.store()  # This happens automagically in a MycroftSkill
+
+    Changes are tracked so store() only writes when the settings were
+    modified, reading a list or dict value counts as a change since it may
+    be modified in place. The settings are synced with the backend when
+    they are created, after that the settings of all skills are synced by
+    a single SettingsSyncScheduler.
 """
 
 import json
 import hashlib
-from threading import Timer
+from threading import Thread, Event, Lock, current_thread
+from weakref import WeakValueDictionary
 from os.path import isfile, join, expanduser
 
 from mycroft.api import DeviceApi, is_paired
@@ -68,6 +75,95 @@ from mycroft.util.log import LOG
 from mycroft.configuration import ConfigurationManager
 
 
+# Seconds between syncs of the skill settings with the backend
+SYNC_INTERVAL = 60
+
+
+class SettingsSyncScheduler(Thread):
+    """
+        Sync the settings of all skills with the backend in a single pass,
+        instead of a timer thread per skill.
+
+        Args:
+            interval (float): seconds between passes
+    """
+
+    def __init__(self, interval=SYNC_INTERVAL):
+        super(SettingsSyncScheduler, self).__init__()
+        self.daemon = True
+        self.interval = interval
+        # SkillSettings are dicts, which can't be hashed, keyed by id
+        self._settings = WeakValueDictionary()
+        self._lock = Lock()
+        self._wakeup = Event()
+        self._requests = None
+
+    def register(self, settings):
+        """ Sync the settings in the following passes. """
+        with self._lock:
+            self._settings[id(settings)] = settings
+            if not self.is_alive():
+                self.start()
+
+    def unregister(self, settings):
+        with self._lock:
+            if self._settings.get(id(settings)) is settings:
+                del self._settings[id(settings)]
+
+    def sync_now(self):
+        """ Start a pass right away, requests during a pass are merged. """
+        self._wakeup.set()
+
+    def request(self, path, fetch):
+        """
+            Get the result of a backend request, made once per pass for all
+            skills using the same path.
+
+            Args:
+                path (str): api path, identifies the request
+                fetch:      function making the request
+        """
+        if self._requests is None or current_thread() is not self:
+            return fetch()
+        if path not in self._requests:
+            self._requests[path] = fetch()
+        return self._requests[path]
+
+    def sync_all(self):
+        """ Sync the settings of every registered skill. """
+        with self._lock:
+            all_settings = list(self._settings.values())
+        self._requests = {}
+        try:
+            paired = is_paired()
+            for settings in all_settings:
+                settings._poll_skill_settings(paired)
+        finally:
+            self._requests = None
+
+    def run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.sync_all()
+            except Exception:
+                LOG.exception('Failed to sync skill settings')
+
+
+_scheduler = None
+_scheduler_lock = Lock()
+
+
+def get_sync_scheduler():
+    """ Get the process wide SettingsSyncScheduler. """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = SettingsSyncScheduler()
+        return _scheduler
+
+
 class SkillSettings(dict):
     """ A dictionary that can easily be save to a file, serialized as json. It
         also syncs to the backend for skill settings
@@ -92,29 +188,33 @@ class SkillSettings(dict):
         self._settings_path = join(directory, 'settings.json')
         self._meta_path = join(directory, 'settingsmeta.json')
         self.is_alive = True
-        self.loaded_hash = hash(json.dumps(self, sort_keys=True))
+        self._dirty = False
         self._complete_intialization = False
         self._device_identity = None
         self._api_path = None
         self._user_identity = None
         self.changed_callback = None
-        self._poll_timer = None
         self._is_alive = True
+        self._is_synced = False
 
         # if settingsmeta exist
         if isfile(self._meta_path):
+            self._is_synced = True
+            # The first sync is done right away, so the remote values are
+            # there when the skill is initialized
             self._poll_skill_settings()
+            get_sync_scheduler().register(self)
 
     def run_poll(self, _=None):
         """Immediately poll the web for new skill settings"""
-        if self._poll_timer:
-            self._poll_timer.cancel()
-            self._poll_skill_settings()
+        if self._is_synced:
+            get_sync_scheduler().sync_now()
 
     def stop_polling(self):
         self._is_alive = False
-        if self._poll_timer:
-            self._poll_timer.cancel()
+        if self._is_synced:
+            self._is_synced = False
+            get_sync_scheduler().unregister(self)
 
     def set_changed_callback(self, callback):
         """
@@ -177,17 +277,52 @@ class SkillSettings(dict):
 
     @property
     def _is_stored(self):
-        return hash(json.dumps(self, sort_keys=True)) == self.loaded_hash
+        return not self._dirty
+
+    def _track(self, value):
+        """ Mark as changed if the value can be modified in place. """
+        if isinstance(value, (list, dict, set)):
+            self._dirty = True
+        return value
 
     def __getitem__(self, key):
         """ Get key """
-        return super(SkillSettings, self).__getitem__(key)
+        return self._track(super(SkillSettings, self).__getitem__(key))
+
+    def get(self, key, default=None):
+        return self._track(super(SkillSettings, self).get(key, default))
 
     def __setitem__(self, key, value):
         """ Add/Update key. """
         if self.allow_overwrite or key not in self:
+            self._dirty = True
             return super(SkillSettings, self).__setitem__(key, value)
 
+    def __delitem__(self, key):
+        self._dirty = True
+        super(SkillSettings, self).__delitem__(key)
+
+    def pop(self, *args):
+        self._dirty = True
+        return super(SkillSettings, self).pop(*args)
+
+    def popitem(self):
+        self._dirty = True
+        return super(SkillSettings, self).popitem()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        self._dirty = True
+        super(SkillSettings, self).clear()
+
     def _load_settings_meta(self):
         """ Loads settings metadata from skills path. """
         if isfile(self._meta_path):
@@ -380,14 +515,17 @@ class SkillSettings(dict):
             settings_meta = self._load_settings_meta()
             self._upload_meta(settings_meta, hashed_meta)
 
-    def _poll_skill_settings(self):
+    def _poll_skill_settings(self, paired=None):
         """ If identifier exists for this skill poll to backend to
             request settings and store it if it changes
             TODO: implement as websocket
+
+            Args:
+                paired (bool): pairing state, checked if not given
         """
         original = hash(str(self))
         try:
-            if not is_paired():
+            if not (is_paired() if paired is None else paired):
                 pass
             elif not self._complete_intialization:
                 self.initialize_remote_settings()
@@ -403,25 +541,17 @@ class SkillSettings(dict):
             if self.changed_callback and hash(str(self)) != original:
                 self.changed_callback()
 
-        if self._poll_timer:
-            self._poll_timer.cancel()
-
-        if not self._is_alive:
-            return
-
-        # continues to poll settings every minute
-        self._poll_timer = Timer(60, self._poll_skill_settings)
-        self._poll_timer.daemon = True
-        self._poll_timer.start()
-
     def load_skill_settings_from_file(self):
         """ If settings.json exist, open and read stored values into self """
         if isfile(self._settings_path):
             with open(self._settings_path) as f:
                 try:
                     json_data = json.load(f)
+                    dirty = self._dirty
                     for key in json_data:
                         self[key] = json_data[key]
+                    # Unchanged unless there were changes not stored yet
+                    self._dirty = dirty
                 except Exception as e:
                     # TODO: Show error on webUI.  Dev will have to fix
                     # metadata to be able to edit later.
@@ -453,10 +583,10 @@ class SkillSettings(dict):
             Returns:
                 dict: dictionary with settings collected from the server.
         """
-        settings = self.api.request({
-            "method": "GET",
-            "path": self._api_path
-        })
+        settings = get_sync_scheduler().request(
+            self._api_path,
+            lambda: self.api.request({"method": "GET",
+                                      "path": self._api_path}))
         settings = [skills for skills in settings if skills is not None]
         return settings
 
@@ -529,10 +659,12 @@ class SkillSettings(dict):
                         if (field["name"] in self and
                                 'value' in sections[i]['fields'][j]):
                             remote_val = sections[i]['fields'][j]["value"]
-                            self_val = self.get(field['name'])
+                            # Reading a list or dict with self.get() would
+                            # mark the settings as changed again
+                            self_val = dict.get(self, field['name'])
                             if str(remote_val) != str(self_val):
                                 changed = True
-        if self.get('not_owner'):
+        if dict.get(self, 'not_owner'):
             changed = False
         return changed
 
@@ -542,11 +674,12 @@ class SkillSettings(dict):
             Args:
                 force:  Force write despite no change
         """
+        if not force and self._is_stored:
+            return
 
-        if force or not self._is_stored:
-            with open(self._settings_path, 'w') as f:
-                json.dump(self, f)
-            self.loaded_hash = hash(json.dumps(self, sort_keys=True))
+        with open(self._settings_path, 'w') as f:
+            json.dump(self, f)
+        self._dirty = False
 
         if self._should_upload_from_change:
             settings_meta = self._load_settings_meta()
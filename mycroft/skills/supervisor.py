@@ -0,0 +1,264 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+    Run skills isolated in a pool of host processes.
+
+    The SkillSupervisor assigns skills to host processes (see
+    mycroft.skills.host), either one host per skill or a fixed number of
+    hosts sharing the skills. Hosts that crash or grow beyond the memory
+    limit are restarted with their skills, the memory and cpu use of every
+    host can be requested with the skillmanager.hosts message.
+"""
+import signal
+import subprocess
+import sys
+import time
+from collections import deque
+from threading import Thread, Event, RLock
+
+from os.path import basename
+
+import psutil
+
+from mycroft.messagebus.message import Message
+from mycroft.util.log import LOG
+
+
+class HostProcess(object):
+    """ A skill host process and the skills assigned to it. """
+
+    def __init__(self, host_id):
+        self.host_id = host_id
+        self.skills = set()
+        self.process = None
+        self.ps = None
+        self.ready = False
+        self.failed = False
+        self.restarts = deque()
+        self.rss = 0
+        self.cpu_user = 0.0
+        self.cpu_system = 0.0
+        self.cpu_percent = 0.0
+
+    @property
+    def is_running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def get_stats(self):
+        return {'host': self.host_id,
+                'pid': self.process.pid if self.process else None,
+                'running': self.is_running,
+                'skills': sorted(basename(s) for s in self.skills),
+                'rss': self.rss,
+                'cpu_user': self.cpu_user,
+                'cpu_system': self.cpu_system,
+                'cpu_percent': self.cpu_percent,
+                'restarts': len(self.restarts),
+                'failed': self.failed}
+
+
+class SkillSupervisor(Thread):
+    """
+        Start, monitor and restart the skill host processes.
+
+        Args:
+            ws:             messagebus connection of the skills service
+            config (dict):  the skills isolation configuration
+            on_rejected:    function called with the path of a skill a host
+                            refused to run, it must run in the skills service
+    """
+
+    def __init__(self, ws, config, on_rejected=None):
+        super(SkillSupervisor, self).__init__()
+        self.daemon = True
+        self.ws = ws
+        self.on_rejected = on_rejected
+        self.pool_size = config.get('pool_size', 0)
+        self.rss_limit = config.get('rss_limit_mb', 0) * 1024 * 1024
+        self.max_restarts = config.get('max_restarts', 5)
+        self.restart_window = config.get('restart_window', 300)
+        self.check_interval = config.get('check_interval', 5)
+        self.stop_timeout = config.get('stop_timeout', 5)
+        self.hosts = {}
+        self._lock = RLock()
+        self._stop_event = Event()
+
+        ws.on('skill_host.ready', self.handle_ready)
+        ws.on('skill_host.rejected', self.handle_rejected)
+        ws.on('skillmanager.hosts', self.handle_hosts_request)
+
+    def _get_host(self, skill_path):
+        for host in self.hosts.values():
+            if skill_path in host.skills:
+                return host
+        return None
+
+    def _pick_host(self, skill_path):
+        """ Get the host a new skill should run in. """
+        if self.pool_size <= 0:
+            host_id = basename(skill_path)
+        else:
+            host_ids = ['host-{}'.format(i) for i in range(self.pool_size)]
+            host_id = min(host_ids, key=lambda i: len(
+                self.hosts[i].skills) if i in self.hosts else 0)
+        return self.hosts.setdefault(host_id, HostProcess(host_id))
+
+    def load_skill(self, skill_path):
+        """
+            Run a skill in a host process.
+
+            Returns:
+                str: id of the host the skill was assigned to
+        """
+        with self._lock:
+            host = self._get_host(skill_path) or self._pick_host(skill_path)
+            host.skills.add(skill_path)
+            if host.failed:
+                LOG.error('{} not started, host {} failed too often'.format(
+                    basename(skill_path), host.host_id))
+            elif not host.is_running:
+                self._start(host)
+            elif host.ready:
+                self._emit_host(host, 'skill_host.load', skill_path)
+            return host.host_id
+
+    def unload_skill(self, skill_path):
+        """ Stop running a skill, hosts without skills are stopped. """
+        with self._lock:
+            host = self._get_host(skill_path)
+            if host is None:
+                return
+            host.skills.discard(skill_path)
+            if not host.skills:
+                self._stop(host)
+                host.failed = False
+            elif host.ready:
+                self._emit_host(host, 'skill_host.unload', skill_path)
+
+    def _emit_host(self, host, msg_type, skill_path):
+        self.ws.emit(Message(msg_type, {'host': host.host_id,
+                                        'path': skill_path}))
+
+    def _start(self, host):
+        LOG.info('Starting skill host ' + host.host_id)
+        host.ready = False
+        host.process = subprocess.Popen([sys.executable, '-m',
+                                         'mycroft.skills.host', host.host_id])
+        try:
+            host.ps = psutil.Process(host.process.pid)
+        except psutil.Error:
+            host.ps = None
+
+    def _stop(self, host):
+        """ Stop a host, killing it if it doesn't exit in time. """
+        host.ready = False
+        if not host.is_running:
+            return
+        LOG.info('Stopping skill host ' + host.host_id)
+        try:
+            # Skills are shut down on KeyboardInterrupt
+            host.process.send_signal(signal.SIGINT)
+            host.process.wait(self.stop_timeout)
+        except subprocess.TimeoutExpired:
+            LOG.warning('Killing skill host ' + host.host_id)
+            host.process.kill()
+            host.process.wait()
+        except OSError:
+            pass
+
+    def _restart(self, host, reason):
+        """ Restart a host unless it restarted too often lately. """
+        now = time.monotonic()
+        while host.restarts and now - host.restarts[0] > self.restart_window:
+            host.restarts.popleft()
+        self._stop(host)
+        # The skills couldn't clean up after themselves
+        for skill_path in host.skills:
+            self.ws.emit(Message('detach_skill',
+                                 {'skill_id': basename(skill_path) + ':'}))
+        if len(host.restarts) >= self.max_restarts:
+            LOG.error('Skill host {} {}, restarted {} times in {}s, giving '
+                      'up'.format(host.host_id, reason, len(host.restarts),
+                                  self.restart_window))
+            host.failed = True
+            self.ws.emit(Message('skill_host.failed',
+                                 {'host': host.host_id,
+                                  'skills': sorted(host.skills)}))
+            return
+        LOG.warning('Skill host {} {}, restarting'.format(host.host_id,
+                                                          reason))
+        host.restarts.append(now)
+        self._start(host)
+
+    def handle_ready(self, message):
+        """ Send a started host the skills assigned to it. """
+        with self._lock:
+            host = self.hosts.get(message.data.get('host'))
+            if host is None or not host.is_running:
+                return
+            host.ready = True
+            for skill_path in sorted(host.skills):
+                self._emit_host(host, 'skill_host.load', skill_path)
+
+    def handle_rejected(self, message):
+        skill_path = message.data['path']
+        self.unload_skill(skill_path)
+        if self.on_rejected:
+            self.on_rejected(skill_path)
+
+    def check_hosts(self):
+        """ Restart crashed hosts and update the resource accounting. """
+        with self._lock:
+            for host in list(self.hosts.values()):
+                if not host.skills or host.failed:
+                    continue
+                if not host.is_running:
+                    code = host.process.returncode if host.process else None
+                    self._restart(host, 'exited with {}'.format(code))
+                    continue
+                if host.ps is None:
+                    continue
+                try:
+                    host.rss = host.ps.memory_info().rss
+                    cpu_times = host.ps.cpu_times()
+                    host.cpu_user = cpu_times.user
+                    host.cpu_system = cpu_times.system
+                    host.cpu_percent = host.ps.cpu_percent(None)
+                except psutil.Error:
+                    continue
+                if self.rss_limit and host.rss > self.rss_limit:
+                    self._restart(host, 'uses {} MB'.format(
+                        host.rss // (1024 * 1024)))
+
+    def get_stats(self):
+        with self._lock:
+            return [host.get_stats() for host in self.hosts.values()]
+
+    def handle_hosts_request(self, message):
+        self.ws.emit(message.reply('skillmanager.hosts.response',
+                                   {'hosts': self.get_stats()}))
+
+    def run(self):
+        while not self._stop_event.wait(self.check_interval):
+            try:
+                self.check_hosts()
+            except Exception:
+                LOG.exception('Error checking skill hosts')
+
+    def shutdown(self):
+        self._stop_event.set()
+        with self._lock:
+            for host in self.hosts.values():
+                self._stop(host)
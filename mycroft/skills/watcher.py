@@ -0,0 +1,201 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+    Watch the skills directory and report which skill changed on disk.
+
+    File system events (inotify through watchdog) are used when available,
+    otherwise the skill folders are polled for their last modified date.
+    Compiled python files, settings.json and hidden files are ignored and
+    bursts of writes to a skill are reported once.
+"""
+import os
+import time
+from glob import glob
+from threading import Thread, Event, Lock
+
+from os.path import join, relpath, isdir
+
+from mycroft.util.log import LOG
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+
+def is_ignored(path):
+    """
+        Check if a changed file should not trigger a skill reload.
+
+        Args:
+            path:   path of the file relative to the skills directory
+
+        Returns:
+            bool: True for compiled python files, settings.json and hidden
+                  files or directories
+    """
+    parts = path.split(os.sep)
+    return (any(p.startswith('.') or p == '__pycache__' for p in parts) or
+            parts[-1].endswith('.pyc') or parts[-1] == 'settings.json')
+
+
+def get_last_modified_date(path):
+    """
+        Get last modified date excluding compiled python files, hidden
+        directories and the settings.json file.
+
+        Args:
+            path:   skill directory to check
+
+        Returns:
+            int: time of last change
+    """
+    all_files = []
+    for root_dir, dirs, files in os.walk(path):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for f in files:
+            if (not f.endswith('.pyc') and f != 'settings.json' and
+                    not f.startswith('.')):
+                all_files.append(join(root_dir, f))
+    # check files of interest in the skill root directory
+    return max(os.path.getmtime(f) for f in all_files)
+
+
+class _SkillEventHandler(FileSystemEventHandler):
+    """ Forward file system events to the SkillWatcher. """
+
+    def __init__(self, watcher):
+        super(_SkillEventHandler, self).__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.is_directory and event.event_type == 'modified':
+            return  # Reported for any change of the files it contains
+        self.watcher.file_changed(event.src_path)
+        dest_path = getattr(event, 'dest_path', None)
+        if dest_path:
+            self.watcher.file_changed(dest_path)
+
+
+class SkillWatcher(Thread):
+    """
+        Report changed skills in a skills directory.
+
+        Args:
+            skills_dir (str):   directory containing the skill folders
+            callback:           function called with the path of a changed
+                                skill
+            debounce (float):   seconds without changes before a skill is
+                                reported
+            poll_interval (float): seconds between scans when file system
+                                   events aren't available
+    """
+
+    def __init__(self, skills_dir, callback, debounce=1.0, poll_interval=2):
+        super(SkillWatcher, self).__init__()
+        self.daemon = True
+        self.skills_dir = skills_dir.rstrip('/')
+        self.callback = callback
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.observer = None
+        self._pending = {}
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._last_modified = {}
+
+    @property
+    def is_watching(self):
+        """ True if file system events are used instead of polling """
+        return self.observer is not None
+
+    def start(self):
+        if Observer is not None:
+            try:
+                self.observer = Observer()
+                self.observer.schedule(_SkillEventHandler(self),
+                                       self.skills_dir, recursive=True)
+                self.observer.start()
+            except Exception as e:
+                LOG.warning('Could not watch {}, polling for skill changes '
+                            'instead ({})'.format(self.skills_dir, repr(e)))
+                self.observer = None
+        else:
+            LOG.info('watchdog not installed, polling for skill changes')
+        if not self.is_watching:
+            # Remember current state so only later changes get reported
+            self._scan()
+        super(SkillWatcher, self).start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self.observer:
+            self.observer.stop()
+
+    def file_changed(self, path):
+        """
+            Register a change to a file, the skill it belongs to will be
+            reported once the debounce time passed without further changes.
+        """
+        path = relpath(path, self.skills_dir)
+        if path.startswith('..') or path == '.' or is_ignored(path):
+            return
+        skill_path = join(self.skills_dir, path.split(os.sep)[0])
+        with self._lock:
+            self._pending[skill_path] = time.monotonic()
+
+    def _scan(self):
+        """ Check all skills for changes to their last modified date. """
+        changed = []
+        for skill_path in glob(join(self.skills_dir, '*/')):
+            skill_path = skill_path.rstrip('/')
+            try:
+                modified = get_last_modified_date(skill_path)
+            except ValueError:  # No files in skill
+                continue
+            if modified != self._last_modified.get(skill_path):
+                changed.append(skill_path)
+                self._last_modified[skill_path] = modified
+        return changed
+
+    def _pop_settled(self):
+        """ Get skills without changes during the debounce time. """
+        now = time.monotonic()
+        with self._lock:
+            settled = [s for s, t in self._pending.items()
+                       if now - t >= self.debounce]
+            for skill_path in settled:
+                self._pending.pop(skill_path)
+        return settled
+
+    def run(self):
+        while not self._stop_event.is_set():
+            if self.is_watching:
+                self._stop_event.wait(min(self.debounce, 0.5))
+                changed = self._pop_settled()
+            else:
+                self._stop_event.wait(self.poll_interval)
+                changed = self._scan()
+            for skill_path in changed:
+                if self._stop_event.is_set():
+                    break
+                if isdir(skill_path):
+                    try:
+                        self.callback(skill_path)
+                    except Exception:
+                        LOG.exception('Error handling change of ' +
+                                      skill_path)
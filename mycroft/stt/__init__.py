@@ -12,11 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import audioop
 import re
 import json
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Empty
+from threading import Lock
+from time import monotonic
+
 from requests import post
-from speech_recognition import Recognizer
+from speech_recognition import Recognizer, RequestError
 
 from mycroft.api import STTApi
 from mycroft.configuration import Configuration
@@ -30,7 +36,9 @@ class STT(object):
         config_core = Configuration.get()
         self.lang = str(self.init_language(config_core))
         config_stt = config_core.get("stt", {})
-        self.config = config_stt.get(config_stt.get("module"), {})
+        # Engines used by the composite engine aren't the configured module
+        module = STTFactory.get_module(type(self)) or config_stt.get("module")
+        self.config = config_stt.get(module, {})
         self.credential = self.config.get("credential", {})
         self.recognizer = Recognizer()
 
@@ -47,6 +55,54 @@ class STT(object):
         pass
 
 
+class StreamingSTT(STT):
+    """
+        STT engine transcribing audio while it is recorded.
+
+        The listener calls stream_start() when a phrase starts, passes the
+        audio to stream_data() as it is recorded and gets the transcription
+        from stream_stop(). Engines deriving from STT get the complete
+        phrase passed to execute() instead.
+    """
+    __metaclass__ = ABCMeta
+
+    def execute(self, audio, language=None):
+        self.stream_start(audio.sample_rate, audio.sample_width, language)
+        self.stream_data(audio.get_raw_data())
+        return self.stream_stop()
+
+    @abstractmethod
+    def stream_start(self, sample_rate, sample_width, language=None):
+        """
+            Start transcribing a phrase.
+
+            Args:
+                sample_rate (int):  sample rate of the audio
+                sample_width (int): bytes per sample
+                language (str):     language of the phrase, the configured
+                                    language if None
+        """
+        pass
+
+    @abstractmethod
+    def stream_data(self, data):
+        """
+            Transcribe the next part of the phrase.
+
+            Args:
+                data (bytes): mono audio in the format given to stream_start
+
+            Returns:
+                str: transcription of the phrase so far, None if unknown
+        """
+        pass
+
+    @abstractmethod
+    def stream_stop(self):
+        """ Finish the phrase and get its transcription. """
+        pass
+
+
 class TokenSTT(STT):
     __metaclass__ = ABCMeta
 
@@ -189,22 +245,45 @@ class KaldiSTT(STT):
             return None
 
 
-class PocketSphinxSTT(BasicSTT):
+class PocketSphinxSTT(StreamingSTT):
     def __init__(self, lang="en-us", config=None):
         super(PocketSphinxSTT, self).__init__()
         from mycroft.stt.pocketsphinx_stt import PS_Recognizer
         self.recognizer = PS_Recognizer(self.lang)
+        self.sample_rate = 16000
+        self.sample_width = 2
+        self._rate_state = None
 
-    def execute(self, audio, language=None):
-        language = language or self.lang
+    def set_language(self, language):
         if language != self.lang:
             LOG.info("Changing decoder language")
             from mycroft.stt.pocketsphinx_stt import PS_Recognizer
             self.lang = language
             self.recognizer = PS_Recognizer(self.lang)
 
+    def execute(self, audio, language=None):
+        self.set_language(language or self.lang)
         return self.recognizer.recognize(audio)
 
+    def stream_start(self, sample_rate, sample_width, language=None):
+        self.set_language(language or self.lang)
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self._rate_state = None
+        self.recognizer.start_utterance()
+
+    def stream_data(self, data):
+        # The decoder needs 16 kHz 16 bit audio
+        if self.sample_width != 2:
+            data = audioop.lin2lin(data, self.sample_width, 2)
+        if self.sample_rate != 16000:
+            data, self._rate_state = audioop.ratecv(
+                data, 2, 1, self.sample_rate, 16000, self._rate_state)
+        return self.recognizer.process(data)
+
+    def stream_stop(self):
+        return self.recognizer.end_utterance()
+
 
 class BingSTT(TokenSTT):
     def __init__(self):
@@ -225,6 +304,127 @@ class HoundifySTT(KeySTT):
         return self.recognizer.recognize_houndify(audio, self.id, self.key)
 
 
+class CompositeSTT(STT):
+    """
+        Transcribe with several engines at the same time.
+
+        The engines are listed in order of preference as "engines" in the
+        "composite" section of the stt configuration. A transcription is
+        used as soon as no preferred engine is still working on the audio.
+        Otherwise the preferred engines get "patience" more seconds to
+        finish, and after "deadline" seconds the best transcription so far
+        is used. Engines still running are abandoned, their results are
+        dropped.
+
+        An engine still busy with an abandoned phrase skips the next ones
+        until it is done, since the engines aren't made for concurrent use.
+    """
+
+    def __init__(self):
+        super(CompositeSTT, self).__init__()
+        self.deadline = self.config.get("deadline", 5.0)
+        self.patience = self.config.get("patience", 1.0)
+        self.engines = []
+        for name in self.config.get("engines", ["pocketsphinx"]):
+            try:
+                self.engines.append((name, STTFactory.create(name)))
+            except Exception:
+                LOG.exception("Could not create STT engine " + name)
+        if not self.engines:
+            raise ValueError("No STT engine could be created")
+        self._busy = {name: Lock() for name, _ in self.engines}
+        self._stats_lock = Lock()
+        self.stats = {name: {"calls": 0, "errors": 0, "wins": 0,
+                             "abandoned": 0, "busy": 0,
+                             "latency_total": 0.0, "latency_max": 0.0}
+                      for name, _ in self.engines}
+        self.pool = ThreadPoolExecutor(max_workers=len(self.engines))
+
+    def _count(self, name, key):
+        with self._stats_lock:
+            self.stats[name][key] += 1
+
+    def _run(self, rank, audio, language, start, results):
+        name, engine = self.engines[rank]
+        text = error = None
+        try:
+            text = engine.execute(audio, language)
+            if not text or not text.strip():
+                error = RequestError(name + " returned no transcription")
+        except Exception as e:
+            error = e
+        finally:
+            self._busy[name].release()
+            latency = monotonic() - start
+            with self._stats_lock:
+                stats = self.stats[name]
+                stats["calls"] += 1
+                if error is not None:
+                    stats["errors"] += 1
+                stats["latency_total"] += latency
+                stats["latency_max"] = max(stats["latency_max"], latency)
+            results.put((rank, text, error))
+
+    def execute(self, audio, language=None):
+        language = language or self.lang
+        start = monotonic()
+        results = Queue()
+        running = set()
+        for rank, (name, _) in enumerate(self.engines):
+            if not self._busy[name].acquire(False):
+                self._count(name, "busy")
+                continue
+            running.add(rank)
+            self.pool.submit(self._run, rank, audio, language, start, results)
+
+        best = None
+        best_time = None
+        errors = {}
+        while running:
+            now = monotonic()
+            timeout = start + self.deadline - now
+            if best is not None:
+                timeout = min(timeout, best_time + self.patience - now)
+            try:
+                rank, text, error = results.get(timeout=max(timeout, 0))
+            except Empty:
+                break
+            running.discard(rank)
+            if error is not None:
+                errors[rank] = error
+            elif best is None or rank < best[0]:
+                best = (rank, text)
+                best_time = monotonic()
+            if best is not None and not [r for r in running if r < best[0]]:
+                break
+
+        for rank in running:
+            self._count(self.engines[rank][0], "abandoned")
+        if best is not None:
+            self._count(self.engines[best[0]][0], "wins")
+            return best[1]
+        if errors:
+            raise errors[min(errors)]
+        raise RequestError("No transcription within {}s".format(
+            self.deadline))
+
+    def get_stats(self):
+        """
+            Get the statistics of every engine.
+
+            Returns:
+                dict: engine name: counts, mean and max latency in seconds
+                      and error rate
+        """
+        with self._stats_lock:
+            stats = {name: dict(s) for name, s in self.stats.items()}
+        for s in stats.values():
+            calls = s["calls"]
+            s["latency_mean"] = s["latency_total"] / calls if calls else 0.0
+            s["error_rate"] = float(s["errors"]) / calls if calls else 0.0
+        return stats
+
+
 class STTFactory(object):
     CLASSES = {
         "mycroft": MycroftSTT,
@@ -237,12 +437,22 @@ class STTFactory(object):
         "houndify": HoundifySTT,
         "bing": BingSTT,
         "deepspeech_server": DeepSpeechServerSTT,
-        "mycroft_deepspeech": MycroftDeepSpeechSTT
+        "mycroft_deepspeech": MycroftDeepSpeechSTT,
+        "composite": CompositeSTT
     }
 
     @staticmethod
-    def create():
-        config = Configuration.get().get("stt", {})
-        module = config.get("module", "mycroft")
+    def get_module(clazz):
+        """ Get the module name of an engine class, None if unknown. """
+        for module, engine_class in STTFactory.CLASSES.items():
+            if engine_class is clazz:
+                return module
+        return None
+
+    @staticmethod
+    def create(module=None):
+        if module is None:
+            config = Configuration.get().get("stt", {})
+            module = config.get("module", "mycroft")
         clazz = STTFactory.CLASSES.get(module)
         return clazz()
@@ -120,3 +120,29 @@ class PS_Recognizer(object):
         if hypothesis is not None:
             return hypothesis.hypstr
         raise UnknownValueError()  # no transcriptions available
+
+    def start_utterance(self):
+        """ Start decoding audio passed in parts with process(). """
+        self.decoder.start_utt()
+
+    def process(self, raw_data):
+        """
+            Decode the next part of the utterance.
+
+            Args:
+                raw_data (bytes): 16 kHz 16 bit mono audio
+
+            Returns:
+                str: the hypothesis so far, None if there is none yet
+        """
+        self.decoder.process_raw(raw_data, False, False)
+        hypothesis = self.decoder.hyp()
+        return hypothesis.hypstr if hypothesis is not None else None
+
+    def end_utterance(self):
+        """ Finish the utterance and get its transcription. """
+        self.decoder.end_utt()
+        hypothesis = self.decoder.hyp()
+        if hypothesis is not None:
+            return hypothesis.hypstr
+        raise UnknownValueError()
@@ -14,6 +14,7 @@
 #
 import tempfile
 import time
+from threading import Condition
 
 import os
 import os.path
@@ -84,6 +85,184 @@ def create_file(filename):
         f.write('')
 
 
+class SignalRegistry(object):
+    """
+        Named signals shared by the mycroft processes.
+
+        Signals are files in the IPC directory. A process connected to the
+        messagebus (see bind()) also keeps the signals in memory, changes
+        are announced on the messagebus so checking a signal doesn't touch
+        the file system and waiting for a signal doesn't poll. The files
+        are still written for processes that aren't connected.
+
+        A single-use signal is consumed by the process removing its file,
+        removal only succeeds once, so several processes checking the same
+        signal can't all consume it before the removal is announced.
+    """
+
+    # Seconds between checks of the file of a signal waited for, which
+    # stays the source of truth
+    FILE_CHECK_INTERVAL = 1.0
+
+    def __init__(self):
+        self.ws = None
+        self._directory = None
+        self._signals = {}
+        # Creation time of the last removed instance of each signal
+        self._removed = {}
+        self._cond = Condition()
+
+    @property
+    def directory(self):
+        if self._directory is None:
+            self._directory = os.path.join(get_ipc_directory(), "signal")
+        return self._directory
+
+    def _path(self, signal_name):
+        return os.path.join(self.directory, signal_name)
+
+    def bind(self, ws):
+        """ Keep the signals in memory, synced over the messagebus. """
+        with self._cond:
+            self.ws = ws
+            ws.on('mycroft.signal.created', self._handle_created)
+            ws.on('mycroft.signal.removed', self._handle_removed)
+            # Signals created before this process was connected
+            try:
+                for signal_name in os.listdir(self.directory):
+                    self._signals[signal_name] = os.path.getctime(
+                        self._path(signal_name))
+            except OSError:
+                pass
+
+    def _emit(self, msg_type, signal_name, created):
+        from mycroft.messagebus.message import Message
+        self.ws.emit(Message(msg_type, {'name': signal_name,
+                                        'time': created}))
+
+    def _handle_created(self, message):
+        signal_name = message.data['name']
+        created = message.data['time']
+        with self._cond:
+            if created > self._removed.get(signal_name, 0):
+                self._signals[signal_name] = created
+                self._cond.notify_all()
+
+    def _handle_removed(self, message):
+        signal_name = message.data['name']
+        created = message.data['time']
+        with self._cond:
+            self._removed[signal_name] = max(
+                created, self._removed.get(signal_name, 0))
+            if self._signals.get(signal_name, created) <= created:
+                self._signals.pop(signal_name, None)
+                self._cond.notify_all()
+
+    def create(self, signal_name):
+        try:
+            path = self._path(signal_name)
+            create_file(path)
+            created = os.path.getctime(path)
+        except (IOError, OSError):
+            return False
+        if self.ws:
+            with self._cond:
+                self._signals[signal_name] = created
+                self._cond.notify_all()
+            self._emit('mycroft.signal.created', signal_name, created)
+        return True
+
+    def remove(self, signal_name, created):
+        """
+            Remove a signal that was consumed or expired.
+
+            Returns:
+                bool: True if this process removed the signal file, False
+                      if another process did first
+        """
+        try:
+            os.remove(self._path(signal_name))
+            removed = True
+        except OSError:
+            removed = False
+        if self.ws:
+            with self._cond:
+                if self._signals.get(signal_name) == created:
+                    del self._signals[signal_name]
+                self._removed[signal_name] = max(
+                    created, self._removed.get(signal_name, 0))
+                self._cond.notify_all()
+            if removed:
+                self._emit('mycroft.signal.removed', signal_name, created)
+        return removed
+
+    def check(self, signal_name, sec_lifetime=0):
+        if self.ws:
+            created = self._signals.get(signal_name)
+        else:
+            try:
+                created = os.path.getctime(self._path(signal_name))
+            except OSError:
+                created = None
+        if created is None:
+            # No such signal exists
+            return False
+
+        if sec_lifetime == 0:
+            # consume this single-use signal, unless another process did
+            return self.remove(signal_name, created)
+        elif sec_lifetime == -1:
+            return True
+        elif int(created + sec_lifetime) < int(time.time()):
+            # remove once expired
+            self.remove(signal_name, created)
+            return False
+        return True
+
+    def wait_while(self, signal_name, timeout=None):
+        """
+            Block as long as a signal exists.
+
+            Args:
+                signal_name (str):  The signal's name
+                timeout (float):    Seconds to wait at most, None for no
+                                    limit
+
+            Returns:
+                bool: True if the signal is gone
+        """
+        end = time.time() + timeout if timeout is not None else None
+        while True:
+            remaining = end - time.time() if end is not None else None
+            if remaining is not None and remaining <= 0:
+                return not self.check(signal_name, -1)
+            if not self.ws:
+                # Not connected, poll the file
+                if not self.check(signal_name, -1):
+                    return True
+                time.sleep(min(0.1, remaining or 0.1))
+                continue
+            with self._cond:
+                if signal_name not in self._signals:
+                    return True
+                self._cond.wait(min(self.FILE_CHECK_INTERVAL,
+                                    remaining or self.FILE_CHECK_INTERVAL))
+                if signal_name in self._signals and \
+                        not os.path.isfile(self._path(signal_name)):
+                    # Removed by a process that isn't connected, or the
+                    # message was lost
+                    del self._signals[signal_name]
+                    return True
+
+
+_registry = SignalRegistry()
+
+
+def bind_signals(ws):
+    """ Keep the signals of this process in memory, see SignalRegistry. """
+    _registry.bind(ws)
+
+
 def create_signal(signal_name):
     """Create a named signal
 
@@ -91,12 +270,7 @@ def create_signal(signal_name):
         signal_name (str): The signal's name.  Must only contain characters
             valid in filenames.
     """
-    try:
-        path = os.path.join(get_ipc_directory(), "signal", signal_name)
-        create_file(path)
-        return os.path.isfile(path)
-    except IOError:
-        return False
+    return _registry.create(signal_name)
 
 
 def check_for_signal(signal_name, sec_lifetime=0):
@@ -112,18 +286,17 @@ def check_for_signal(signal_name, sec_lifetime=0):
     Returns:
         bool: True if the signal is defined, False otherwise
     """
-    path = os.path.join(get_ipc_directory(), "signal", signal_name)
-    if os.path.isfile(path):
-        if sec_lifetime == 0:
-            # consume this single-use signal
-            os.remove(path)
-        elif sec_lifetime == -1:
-            return True
-        elif int(os.path.getctime(path) + sec_lifetime) < int(time.time()):
-            # remove once expired
-            os.remove(path)
-            return False
-        return True
+    return _registry.check(signal_name, sec_lifetime)
 
-    # No such signal exists
-    return False
+
+def wait_while_signal(signal_name, timeout=None):
+    """Block as long as a named signal exists
+
+    Args:
+        signal_name (str): The signal's name.
+        timeout (float, optional): Seconds to wait at most
+
+    Returns:
+        bool: True if the signal is gone, False on timeout
+    """
+    return _registry.wait_while(signal_name, timeout)
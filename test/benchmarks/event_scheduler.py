@@ -0,0 +1,108 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+    Benchmark of the EventScheduler.
+
+    Measures how late events are sent and the cpu time used while many
+    timers are pending, run with
+
+        python -m test.benchmarks.event_scheduler [--timers 10000]
+"""
+import argparse
+import tempfile
+import time
+from threading import Event
+
+from os.path import join
+
+from mycroft.skills.event_scheduler import EventScheduler
+
+
+class RecordingEmitter(object):
+    """ Records when every event is sent. """
+
+    def __init__(self, expected):
+        self.expected = expected
+        self.sent = {}
+        self.done = Event()
+
+    def on(self, event, handler):
+        pass
+
+    def remove_all_listeners(self, event):
+        pass
+
+    def emit(self, message):
+        self.sent[message.type] = time.time()
+        if len(self.sent) >= self.expected:
+            self.done.set()
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(int(len(values) * p / 100), len(values) - 1)]
+
+
+def run(timers, duration, idle):
+    tmp_dir = tempfile.mkdtemp()
+
+    # Idle: timers pending far in the future
+    emitter = RecordingEmitter(timers)
+    scheduler = EventScheduler(emitter, join(tmp_dir, 'idle.json'))
+    for i in range(timers):
+        scheduler.schedule_event('idle-{}'.format(i), time.time() + 3600)
+    cpu = time.process_time()
+    time.sleep(idle)
+    idle_cpu = time.process_time() - cpu
+    scheduler.shutdown()
+
+    # Firing: timers spread over the duration
+    emitter = RecordingEmitter(timers)
+    scheduler = EventScheduler(emitter, join(tmp_dir, 'firing.json'))
+    start = time.time() + 1
+    scheduled = {}
+    for i in range(timers):
+        name = 'timer-{}'.format(i)
+        scheduled[name] = start + duration * i / timers
+        scheduler.schedule_event(name, scheduled[name])
+    cpu = time.process_time()
+    emitter.done.wait(duration + 30)
+    firing_cpu = time.process_time() - cpu
+    scheduler.shutdown()
+
+    jitter = [(emitter.sent[name] - scheduled[name]) * 1000
+              for name in emitter.sent]
+    print('timers:        {}'.format(timers))
+    print('sent:          {}'.format(len(emitter.sent)))
+    print('jitter p50:    {:.2f} ms'.format(percentile(jitter, 50)))
+    print('jitter p99:    {:.2f} ms'.format(percentile(jitter, 99)))
+    print('jitter max:    {:.2f} ms'.format(max(jitter)))
+    print('cpu idle:      {:.3f} s in {} s'.format(idle_cpu, idle))
+    print('cpu firing:    {:.3f} s in {} s'.format(firing_cpu, duration))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--timers', type=int, default=10000)
+    parser.add_argument('--duration', type=float, default=10,
+                        help='seconds the timers are spread over')
+    parser.add_argument('--idle', type=float, default=5,
+                        help='seconds to measure with nothing due')
+    args = parser.parse_args()
+    run(args.timers, args.duration, args.idle)
+
+
+if __name__ == '__main__':
+    main()
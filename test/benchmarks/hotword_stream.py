@@ -0,0 +1,141 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+    Benchmark of the pocketsphinx wake word spotting.
+
+    Compares the cpu time per second of audio spent spotting the hot words
+    in wav files, decoding the window of audio with every engine at every
+    check as before and decoding every chunk once with one streaming
+    decoder for all the phrases, run with
+
+        python -m test.benchmarks.hotword_stream [--repeat 20] [wav ...]
+
+    The wav files must be 16 kHz mono 16 bit audio, the test recordings
+    are used by default. The hot words are the pocketsphinx hot words of
+    the configuration.
+"""
+import argparse
+import glob
+import time
+import wave
+from os.path import dirname, join
+
+from mycroft.client.speech.audio_buffer import RingBuffer
+from mycroft.client.speech.hotword_factory import PocketsphinxHotWord
+from mycroft.configuration import Configuration
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+CHUNK = 1024
+SEC_PER_BUFFER = float(CHUNK) / SAMPLE_RATE
+SAVED_WW_SEC = 3
+TEST_WW_SEC = 1.2
+SEC_BETWEEN_WW_CHECKS = 0.2
+DATA_DIR = join(dirname(dirname(__file__)), 'unittests', 'client', 'data')
+
+
+def sec_to_bytes(sec):
+    return int(sec * SAMPLE_RATE) * SAMPLE_WIDTH
+
+
+def read_chunks(file_names):
+    chunks = []
+    for file_name in file_names:
+        with wave.open(file_name, 'rb') as wav:
+            if (wav.getframerate(), wav.getnchannels(),
+                    wav.getsampwidth()) != (SAMPLE_RATE, 1, SAMPLE_WIDTH):
+                raise ValueError(file_name + ' is not 16 kHz mono 16 bit')
+            data = wav.readframes(wav.getnframes())
+        # A second of silence between the files
+        data += b'\0' * sec_to_bytes(1)
+        size = CHUNK * SAMPLE_WIDTH
+        chunks += [data[i:i + size] for i in range(0, len(data), size)]
+    return chunks
+
+
+def create_engines(hot_words, stream):
+    engines = []
+    for word, config in hot_words.items():
+        engines.append(PocketsphinxHotWord(word, dict(config, stream=stream)))
+    engines[0].add_hot_words(engines[1:])
+    return engines
+
+
+def spot(engines, chunks, silence):
+    """ Feed the chunks as the ResponsiveRecognizer does. """
+    test_size = sec_to_bytes(TEST_WW_SEC)
+    buffers_per_check = SEC_BETWEEN_WW_CHECKS / SEC_PER_BUFFER
+    buffers_since_check = 0.0
+    byte_data = RingBuffer(sec_to_bytes(SAVED_WW_SEC))
+    byte_data.append(silence)
+    found = []
+    for chunk in chunks:
+        byte_data.append(chunk)
+        for engine in engines:
+            engine.update(chunk)
+        buffers_since_check += 1.0
+        if buffers_since_check > buffers_per_check:
+            buffers_since_check -= buffers_per_check
+            audio_data = b''.join((byte_data.view(test_size), silence))
+            for engine in engines:
+                if engine.found_wake_word(audio_data):
+                    found.append(engine.key_phrase)
+                    # Many serial detections otherwise
+                    byte_data.clear()
+                    byte_data.append(silence)
+                    break
+    return found
+
+
+def measure(engines, chunks, silence, repeat):
+    found = []
+    start = time.process_time()
+    for _ in range(repeat):
+        found += spot(engines, chunks, silence)
+    return time.process_time() - start, found
+
+
+def run(file_names, repeat):
+    chunks = read_chunks(file_names)
+    silence = b'\0' * int(0.01 * SAMPLE_RATE * SAMPLE_WIDTH)
+    audio_sec = repeat * len(chunks) * SEC_PER_BUFFER
+    hot_words = {
+        word: config
+        for word, config in Configuration.get().get('hotwords', {}).items()
+        if config.get('module') == 'pocketsphinx'
+    }
+    print('{} hot words: {}'.format(len(hot_words), ', '.join(hot_words)))
+
+    print('mode       cpu ms per second of audio  detections')
+    for name, stream in (('window', False), ('stream', True)):
+        engines = create_engines(hot_words, stream)
+        cpu, found = measure(engines, chunks, silence, repeat)
+        print('{:<11}{:>26.3f}  {}'.format(
+            name, 1000 * cpu / audio_sec, len(found)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('files', nargs='*',
+                        default=sorted(glob.glob(join(DATA_DIR, '*.wav'))),
+                        help='wav files to spot the hot words in')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='times to process the files')
+    args = parser.parse_args()
+    run(args.files, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+    Benchmark of the audio buffering of the ResponsiveRecognizer.
+
+    Compares the cpu time per second of audio spent keeping the wake word
+    window and recording phrases, with concatenated bytes as before and
+    with the preallocated buffers, run with
+
+        python -m test.benchmarks.wake_word_buffer [--seconds 600]
+"""
+import argparse
+import os
+import time
+
+from mycroft.client.speech.audio_buffer import RingBuffer
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+CHUNK = 1024
+SEC_PER_BUFFER = float(CHUNK) / SAMPLE_RATE
+SAVED_WW_SEC = 3
+TEST_WW_SEC = 1.2
+SEC_BETWEEN_WW_CHECKS = 0.2
+RECORDING_SEC = 10
+
+
+def sec_to_bytes(sec):
+    return int(sec * SAMPLE_RATE) * SAMPLE_WIDTH
+
+
+def window_concat(chunks, silence):
+    max_size = sec_to_bytes(SAVED_WW_SEC)
+    test_size = sec_to_bytes(TEST_WW_SEC)
+    buffers_per_check = SEC_BETWEEN_WW_CHECKS / SEC_PER_BUFFER
+    buffers_since_check = 0.0
+    byte_data = silence
+    for chunk in chunks:
+        if len(byte_data) < max_size:
+            byte_data += chunk
+        else:
+            byte_data = byte_data[len(chunk):] + chunk
+        buffers_since_check += 1.0
+        if buffers_since_check > buffers_per_check:
+            buffers_since_check -= buffers_per_check
+            chopped = byte_data[-test_size:] \
+                if test_size < len(byte_data) else byte_data
+            audio_data = chopped + silence
+
+
+def window_ring(chunks, silence):
+    test_size = sec_to_bytes(TEST_WW_SEC)
+    buffers_per_check = SEC_BETWEEN_WW_CHECKS / SEC_PER_BUFFER
+    buffers_since_check = 0.0
+    byte_data = RingBuffer(sec_to_bytes(SAVED_WW_SEC))
+    byte_data.append(silence)
+    for chunk in chunks:
+        byte_data.append(chunk)
+        buffers_since_check += 1.0
+        if buffers_since_check > buffers_per_check:
+            buffers_since_check -= buffers_per_check
+            audio_data = b''.join((byte_data.view(test_size), silence))
+
+
+def phrase_concat(chunks):
+    byte_data = b'\0' * SAMPLE_WIDTH
+    for chunk in chunks:
+        byte_data += chunk
+    return byte_data
+
+
+def phrase_preallocated(chunks, phrase_buffer):
+    byte_data = memoryview(phrase_buffer)
+    size = SAMPLE_WIDTH
+    byte_data[:size] = b'\0' * SAMPLE_WIDTH
+    for chunk in chunks:
+        byte_data[size:size + len(chunk)] = chunk
+        size += len(chunk)
+    phrase = byte_data[:size].tobytes()
+    byte_data.release()
+    return phrase
+
+
+def measure(func, *args):
+    start = time.process_time()
+    func(*args)
+    return time.process_time() - start
+
+
+def run(seconds):
+    num_chunks = int(seconds / SEC_PER_BUFFER)
+    chunks = [os.urandom(CHUNK * SAMPLE_WIDTH) for _ in range(64)]
+    chunks = [chunks[i % len(chunks)] for i in range(num_chunks)]
+    silence = b'\0' * int(0.01 * SAMPLE_RATE * SAMPLE_WIDTH)
+
+    phrase_chunks = chunks[:int(RECORDING_SEC / SEC_PER_BUFFER)]
+    phrases = max(int(seconds / RECORDING_SEC), 1)
+    phrase_buffer = bytearray(sec_to_bytes(RECORDING_SEC + 1))
+
+    results = [
+        ('wake word window', measure(window_concat, chunks, silence),
+         measure(window_ring, chunks, silence), seconds),
+        ('phrase recording',
+         measure(lambda: [phrase_concat(phrase_chunks)
+                          for _ in range(phrases)]),
+         measure(lambda: [phrase_preallocated(phrase_chunks, phrase_buffer)
+                          for _ in range(phrases)]),
+         phrases * RECORDING_SEC)
+    ]
+    print('cpu ms per second of audio  before     after')
+    for name, before, after, audio_sec in results:
+        print('{:<26}{:>9.3f}{:>10.3f}'.format(
+            name, 1000 * before / audio_sec, 1000 * after / audio_sec))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=600,
+                        help='seconds of audio to process')
+    args = parser.parse_args()
+    run(args.seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import unittest
+
+from mycroft.client.speech.audio_buffer import RingBuffer
+
+
+class TestRingBuffer(unittest.TestCase):
+    def test_fill(self):
+        buf = RingBuffer(8)
+        self.assertEqual(buf.get(), b'')
+        buf.append(b'abc')
+        buf.append(b'de')
+        self.assertEqual(len(buf), 5)
+        self.assertEqual(buf.get(), b'abcde')
+        self.assertEqual(buf.get(2), b'de')
+        self.assertEqual(buf.get(20), b'abcde')
+
+    def test_rolling(self):
+        buf = RingBuffer(8)
+        data = b''
+        for i in range(20):
+            chunk = bytes([65 + i]) * 3
+            buf.append(chunk)
+            data = (data + chunk)[-8:]
+            self.assertEqual(buf.get(), data)
+            self.assertEqual(bytes(buf.view(5)), data[-5:])
+        self.assertEqual(len(buf), 8)
+
+    def test_large_chunk(self):
+        buf = RingBuffer(4)
+        buf.append(b'ab')
+        buf.append(b'cdefgh')
+        self.assertEqual(buf.get(), b'efgh')
+
+    def test_clear(self):
+        buf = RingBuffer(4)
+        buf.append(b'abcdef')
+        buf.clear()
+        self.assertEqual(len(buf), 0)
+        buf.append(b'xy')
+        self.assertEqual(buf.get(), b'xy')
@@ -12,14 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import time
 import unittest
+from threading import Event
 
+import mock
 import speech_recognition
 from os.path import dirname, join
 from speech_recognition import WavFile, AudioData
 
-from mycroft.client.speech.listener import AudioConsumer, RecognizerLoop
-from mycroft.stt import MycroftSTT
+from mycroft.client.speech.listener import AudioConsumer, RecognizerLoop, \
+    RecognizerLoopState, AudioQueue
+from mycroft.stt import MycroftSTT, STT
 from queue import Queue
 
 
@@ -38,6 +42,20 @@ class MockRecognizer(object):
         self.transcriptions = transcriptions
 
 
+class DelayedSTT(STT):
+    """ Transcribes phrase n after delays[n] seconds. """
+    delays = {}
+
+    def execute(self, audio, language=None):
+        phrase = audio.frame_data[0]
+        time.sleep(self.delays.get(phrase, 0))
+        return 'phrase {}'.format(phrase)
+
+
+def create_phrase(n):
+    return AudioData(bytes([n]) * 32000, 16000, 2)
+
+
 class AudioConsumerTest(unittest.TestCase):
     """
     AudioConsumerTest
@@ -197,3 +215,53 @@ class AudioConsumerTest(unittest.TestCase):
         self.assertIsNotNone(utterances)
         self.assertTrue(len(utterances) == 1)
         self.assertEquals("record", utterances[0])
+
+
+class AudioConsumerPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.state = RecognizerLoopState()
+        self.queue = AudioQueue(2)
+        self.emitter = mock.Mock()
+        self.utterances = []
+        self.done = Event()
+
+        def emit(msg_type, data=None):
+            if msg_type == 'recognizer_loop:utterance':
+                self.utterances += data['utterances']
+                if len(self.utterances) == 2:
+                    self.done.set()
+        self.emitter.emit.side_effect = emit
+        recognizer = mock.Mock(key_phrase='hey mycroft')
+        self.consumer = AudioConsumer(
+            self.state, self.queue, self.emitter, DelayedSTT(),
+            recognizer, recognizer, workers=2, max_age=0.5)
+
+    def test_order(self):
+        DelayedSTT.delays = {0: 0.3}
+        self.queue.put(create_phrase(0))
+        self.queue.put(create_phrase(1))
+        self.consumer.read()
+        self.consumer.read()
+        self.assertTrue(self.done.wait(2))
+        # The second phrase is transcribed first but emitted after the first
+        self.assertEqual(self.utterances, ['phrase 0', 'phrase 1'])
+        stats = self.consumer.get_stats()
+        self.assertEqual(stats['processed'], 2)
+        self.assertGreaterEqual(stats['stt_time_max'], 0.3)
+
+    def test_drop(self):
+        for n in range(3):
+            self.queue.put(create_phrase(n))
+        self.assertEqual(self.queue.dropped, 1)
+        self.assertEqual(self.queue.get().frame_data[0], 1)
+
+        time.sleep(0.6)
+        self.consumer.read()
+        stats = self.consumer.get_stats()
+        self.assertEqual(stats['stale'], 1)
+        self.assertEqual(stats['dropped'], 1)
+        self.assertFalse(self.emitter.emit.called)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,7 +14,10 @@
 #
 import unittest
 
-from mycroft.client.speech.hotword_factory import HotWordFactory
+import mock
+
+from mycroft.client.speech.hotword_factory import HotWordFactory, \
+    PreciseHotword, SharedHotWord
 
 
 class PocketSphinxTest(unittest.TestCase):
@@ -55,3 +58,102 @@ class PocketSphinxTest(unittest.TestCase):
         config = config['hey victoria']
         self.assertEquals(config['phonemes'], p.phonemes)
         self.assertEquals(p.key_phrase, 'hey victoria')
+
+
+class PocketSphinxStreamTest(unittest.TestCase):
+    config = {
+        'hey mycroft': {
+            'module': 'pocketsphinx',
+            'phonemes': 'HH EY . M AY K R AO F T',
+            'threshold': 1e-90,
+            'stream': True
+        },
+        'hey victoria': {
+            'module': 'pocketsphinx',
+            'phonemes': 'HH EY . V IH K T AO R IY AH',
+            'threshold': 1e-20,
+            'stream': True
+        }
+    }
+
+    def setUp(self):
+        patcher = mock.patch('pocketsphinx.Decoder')
+        self.decoder_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.decoder_class.side_effect = lambda config: mock.Mock(
+            config=config, **{'hyp.return_value': None})
+
+    def create(self, word):
+        return HotWordFactory.create_hotword(word, self.config)
+
+    def test_update(self):
+        p = self.create('hey mycroft')
+        self.assertTrue(p.is_streaming())
+        self.assertFalse(SharedHotWord.can_share(p))
+        p.update(b'\0\0')
+        p.update(b'\1\0')
+        decoder = p.decoder
+        decoder.start_utt.assert_called_once_with()
+        self.assertEqual([c[0][0] for c in decoder.process_raw.call_args_list],
+                         [b'\0\0', b'\1\0'])
+        # The window of audio isn't decoded again
+        self.assertFalse(p.found_wake_word(b'\0\0' * 100))
+        self.assertEqual(decoder.process_raw.call_count, 2)
+
+        decoder.hyp.return_value = mock.Mock(hypstr='HEY MYCROFT')
+        p.update(b'\2\0')
+        decoder.end_utt.assert_called_once_with()
+        self.assertTrue(p.found_wake_word(b''))
+        # Spotted once
+        self.assertFalse(p.found_wake_word(b''))
+
+    def test_add_hot_words(self):
+        p = self.create('hey mycroft')
+        victoria = self.create('hey victoria')
+        p.add_hot_words([victoria])
+        self.assertIs(victoria.spotter, p)
+        config = p.decoder.config
+        kws = [c[0][1] for c in config.set_string.call_args_list
+               if c[0][0] == '-kws'][0]
+        with open(kws) as f:
+            self.assertEqual(f.read().splitlines(),
+                             ['hey mycroft /1e-90/', 'hey victoria /1e-20/'])
+        dict_name = [c[0][1] for c in config.set_string.call_args_list
+                     if c[0][0] == '-dict'][-1]
+        with open(dict_name) as f:
+            self.assertEqual([line.split()[0] for line in f],
+                             ['hey', 'mycroft', 'victoria'])
+
+        # The audio is decoded once for both phrases
+        p.decoder.hyp.return_value = mock.Mock(hypstr='hey victoria')
+        victoria.update(b'\0\0')
+        p.update(b'\0\0')
+        self.assertEqual(p.decoder.process_raw.call_count, 1)
+        self.assertFalse(victoria.decoder.process_raw.called)
+        self.assertFalse(p.found_wake_word(b''))
+        self.assertTrue(victoria.found_wake_word(b''))
+
+    def test_window(self):
+        p = HotWordFactory.create_hotword('hey mycroft', {
+            'hey mycroft': dict(self.config['hey mycroft'], stream=False)
+        })
+        victoria = self.create('hey victoria')
+        p.add_hot_words([victoria])
+        self.assertIs(victoria.spotter, victoria)
+        p.update(b'\0\0')
+        self.assertFalse(p.decoder.process_raw.called)
+        self.assertTrue(SharedHotWord.can_share(p))
+
+
+class PreciseStopTest(unittest.TestCase):
+    def test_stop(self):
+        # Skip __init__, which downloads the runner and the model
+        p = PreciseHotword.__new__(PreciseHotword)
+        p.proc = mock.Mock(**{'poll.return_value': None})
+        p.stop()
+        p.proc.terminate.assert_called_once_with()
+        p.proc.wait.assert_called_once_with()
+
+        p.proc.poll.return_value = -15
+        p.stop()
+        self.assertEqual(p.proc.terminate.call_count, 1)
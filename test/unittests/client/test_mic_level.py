@@ -0,0 +1,64 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+import tempfile
+import unittest
+
+import mock
+
+from mycroft.client.speech.mic_level import MicLevelPublisher, \
+    MicLevelMonitor, parse_mic_level
+from mycroft.messagebus.message import Message
+
+
+@mock.patch('mycroft.client.speech.mic_level.time')
+class TestMicLevel(unittest.TestCase):
+    def test_rate_limit(self, mock_time):
+        emitter = mock.Mock()
+        publisher = MicLevelPublisher(emitter, interval=0.2)
+        for t in [0.0, 0.1, 0.19, 0.25, 0.3, 0.5]:
+            mock_time.return_value = 100 + t
+            publisher.update(t, 1.5)
+        levels = [c[0][1]['energy'] for c in emitter.emit.call_args_list]
+        self.assertEqual(levels, [0.0, 0.25, 0.5])
+
+    def test_file(self, mock_time):
+        mock_time.return_value = 100
+        level_file = tempfile.mktemp()
+        self.addCleanup(os.remove, level_file)
+        MicLevelPublisher(level_file=level_file).update(4, 1.5)
+        with open(level_file) as f:
+            self.assertEqual(parse_mic_level(f.read()), (4.0, 1.5))
+
+    def test_monitor(self, mock_time):
+        ws = mock.Mock()
+        updates = []
+        monitor = MicLevelMonitor(ws, lambda *level: updates.append(level))
+        self.assertEqual(ws.on.call_args[0][0], 'recognizer_loop:mic_level')
+        self.assertIsNone(monitor.get())
+
+        mock_time.return_value = 100
+        monitor.handle_mic_level(Message('recognizer_loop:mic_level',
+                                         {'energy': 4, 'threshold': 1.5}))
+        self.assertEqual(monitor.get(), (4, 1.5))
+        self.assertEqual(updates, [(4, 1.5)])
+
+        # The listener stopped sending levels
+        mock_time.return_value = 103
+        self.assertIsNone(monitor.get())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import audioop
+import shutil
+import struct
+import tempfile
+import unittest
+import wave
+from os.path import join
+from threading import Event
+
+import mock
+from speech_recognition import AudioData
+
+from mycroft.client.speech.hotword_factory import HotWordEngine, \
+    SharedHotWord
+from mycroft.client.speech.listener import AudioConsumer, AudioQueue, \
+    RecognizerLoop, RecognizerLoopState, SourceEmitter
+from mycroft.client.speech.mic import FileMicrophone
+from mycroft.session import SessionManager
+from mycroft.stt import STT
+
+SAMPLE_RATE = 16000
+
+
+class LoudWord(HotWordEngine):
+    """ Hears the wake word in any loud audio. """
+
+    def __init__(self):
+        super(LoudWord, self).__init__('hey mycroft', {})
+
+    def found_wake_word(self, frame_data):
+        return audioop.max(frame_data, 2) > 500
+
+
+class ToneSTT(STT):
+    """ Transcribes the amplitude of the phrase in thousands. """
+
+    def execute(self, audio, language=None):
+        return 'tone {}'.format(audioop.max(audio.frame_data, 2) // 1000)
+
+
+def write_wav(file_name, parts):
+    """ Write a wav file of (seconds, amplitude) parts of a square wave. """
+    samples = []
+    for seconds, amplitude in parts:
+        samples += [amplitude if i % 20 < 10 else -amplitude
+                    for i in range(int(seconds * SAMPLE_RATE))]
+    with wave.open(file_name, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(struct.pack('<{}h'.format(len(samples)), *samples))
+
+
+class TestSourceEmitter(unittest.TestCase):
+    def test_emit(self):
+        emitter = mock.Mock()
+        source = SourceEmitter(emitter, 'kitchen')
+        source.emit('recognizer_loop:record_begin')
+        source.emit('recognizer_loop:wakeword', {'utterance': 'hey'})
+        self.assertEqual([c[0][1] for c in emitter.emit.call_args_list],
+                         [{'source_id': 'kitchen'},
+                          {'utterance': 'hey', 'source_id': 'kitchen'}])
+
+
+class TestSharedHotWord(unittest.TestCase):
+    def test_share(self):
+        engines = [LoudWord(), LoudWord()]
+        shared = SharedHotWord(engines)
+        self.assertTrue(SharedHotWord.can_share(engines[0]))
+        self.assertEqual(shared.key_phrase, 'hey mycroft')
+        self.assertTrue(shared.found_wake_word(b'\xff\x7f'))
+        self.assertFalse(shared.found_wake_word(b'\0\0'))
+
+    def test_streaming_engine(self):
+        class StreamingWord(LoudWord):
+            def update(self, chunk):
+                pass
+        self.assertFalse(SharedHotWord.can_share(StreamingWord()))
+
+
+class TestFileMicrophone(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.file_name = join(self.dir, 'tone.wav')
+        write_wav(self.file_name, [(0.15, 1000)])
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_read(self):
+        with FileMicrophone(self.file_name, realtime=False) as source:
+            self.assertEqual(source.SAMPLE_RATE, SAMPLE_RATE)
+            self.assertEqual(len(source.stream.read(1024)), 2048)
+            source.mute()
+            self.assertEqual(source.stream.read(1024), b'\0' * 2048)
+            # The rest of the file
+            self.assertEqual(len(source.stream.read(1024)), 704)
+            with self.assertRaises(EOFError):
+                source.stream.read(1024)
+
+    def test_loop(self):
+        mic = FileMicrophone(self.file_name, realtime=False, loop=True)
+        with mic as source:
+            lengths = [len(source.stream.read(1600)) for _ in range(4)]
+        self.assertEqual(lengths, [3200, 1600, 3200, 1600])
+
+
+class TestMultiSourceConsumer(unittest.TestCase):
+    def test_tagged_utterance(self):
+        emitter = mock.Mock()
+        done = Event()
+
+        def emit(msg_type, data=None):
+            if msg_type == 'recognizer_loop:utterance':
+                done.set()
+        emitter.emit.side_effect = emit
+        recognizer = mock.Mock(key_phrase='hey mycroft')
+        queue = AudioQueue()
+        consumer = AudioConsumer(RecognizerLoopState(), queue, emitter,
+                                 ToneSTT(), recognizer, recognizer)
+
+        audio = AudioData(b'\0\x10' * 16000, SAMPLE_RATE, 2)
+        queue.put((audio, SourceEmitter(emitter, 'hall')))
+        consumer.read()
+        self.assertTrue(done.wait(2))
+        emitter.emit.assert_called_with('recognizer_loop:utterance', {
+            'utterances': ['tone 4'],
+            'lang': consumer.stt.lang,
+            'session': SessionManager.get('hall').session_id,
+            'ident': mock.ANY,
+            'source_id': 'hall'
+        })
+        self.assertNotEqual(SessionManager.get('hall').session_id,
+                            SessionManager.get().session_id)
+
+    def test_stopped_source(self):
+        emitter = mock.Mock()
+        recognizer = mock.Mock(key_phrase='hey mycroft')
+        queue = AudioQueue()
+        consumer = AudioConsumer(RecognizerLoopState(), queue, emitter,
+                                 ToneSTT(), recognizer, recognizer)
+        # Phrase of a source whose recognizer was stopped
+        queue.put((None, SourceEmitter(emitter, 'hall')))
+        consumer.read()
+        self.assertFalse(emitter.emit.called)
+
+
+class TestMultiSourceLoop(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    @mock.patch('mycroft.client.speech.mic.play_wav')
+    @mock.patch('mycroft.client.speech.listener.MutableMicrophone')
+    @mock.patch('mycroft.client.speech.listener.HotWordFactory')
+    @mock.patch('mycroft.client.speech.listener.STTFactory')
+    def test_file_sources(self, mock_stt_factory, mock_hotword_factory, *_):
+        mock_stt_factory.create.return_value = ToneSTT()
+        mock_hotword_factory.create_hotword.side_effect = \
+            lambda *args, **kwargs: LoudWord()
+        sources = []
+        for source_id, amplitude in (('kitchen', 2000), ('hall', 5000)):
+            file_name = join(self.dir, source_id + '.wav')
+            # Calibration, wake word and phrase, end of the phrase
+            write_wav(file_name, [(2.5, 0), (2.0, amplitude), (1.5, 0)])
+            sources.append({'id': source_id, 'module': 'file',
+                            'path': file_name, 'realtime': False})
+
+        loop = RecognizerLoop()
+        loop.config = dict(loop.config, sources=sources)
+        loop.hot_word_engines = {}
+        loop.sources = loop.create_sources()
+        self.assertEqual([s.source_id for s in loop.sources],
+                         ['kitchen', 'hall'])
+        self.assertIs(loop.sources[0].recognizer.wake_word_recognizer,
+                      loop.sources[1].recognizer.wake_word_recognizer)
+
+        utterances = {}
+        done = Event()
+
+        def handle_utterance(event):
+            utterances[event['source_id']] = event['utterances']
+            if len(utterances) == 2:
+                done.set()
+        loop.on('recognizer_loop:utterance', handle_utterance)
+        loop.start_async()
+        try:
+            self.assertTrue(done.wait(10))
+        finally:
+            loop.stop()
+        self.assertEqual(utterances, {'kitchen': ['tone 2'],
+                                      'hall': ['tone 5']})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,231 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import struct
+import unittest
+from threading import Event
+
+import mock
+
+from mycroft.client.speech.listener import RecognizerLoop
+from mycroft.client.speech.remote_audio import RemoteStream, \
+    RemoteMicrophone, RemoteAudioClient, RemoteAudioConnection, \
+    ACK_MESSAGE, READY_MESSAGE, ERROR_MESSAGE, START_MESSAGE
+from mycroft.messagebus.message import Message
+from test.unittests.client.test_multi_source import LoudWord, ToneSTT
+
+SAMPLE_RATE = 16000
+
+
+def square_wave(seconds, amplitude):
+    num_samples = int(seconds * SAMPLE_RATE)
+    return struct.pack('<{}h'.format(num_samples),
+                       *[amplitude if i % 20 < 10 else -amplitude
+                         for i in range(num_samples)])
+
+
+class TestRemoteStream(unittest.TestCase):
+    def test_read(self):
+        stream = RemoteStream(2, 100)
+        stream.write(b'\1\0\2\0\3')
+        self.assertEqual(stream.read(2), b'\1\0\2\0')
+        stream.write(b'\0')
+        stream.close()
+        # The rest of the audio is read after the stream closed
+        self.assertEqual(stream.read(2), b'\3\0')
+        with self.assertRaises(EOFError):
+            stream.read(2)
+
+    def test_overflow(self):
+        consumed = []
+        stream = RemoteStream(2, 4, consumed.append)
+        stream.write(b'\1\0\2\0\3\0')
+        self.assertEqual(stream.dropped, 2)
+        self.assertEqual(stream.read(2), b'\2\0\3\0')
+        self.assertEqual(consumed, [2, 4])
+
+
+class TestRemoteMicrophone(unittest.TestCase):
+    def test_ack(self):
+        send = mock.Mock()
+        mic = RemoteMicrophone(SAMPLE_RATE, 2, 16, send)
+        mic.stream.write(b'\0' * 8)
+        mic.stream.read(1)
+        self.assertFalse(send.called)
+        mic.stream.read(1)
+        message = send.call_args[0][0]
+        self.assertEqual(message.type, ACK_MESSAGE)
+        self.assertEqual(message.data, {'bytes': 4})
+
+    def test_mute(self):
+        mic = RemoteMicrophone(SAMPLE_RATE, 2, 16, mock.Mock())
+        mic.mute()
+        mic.stream.write(b'\1\1')
+        self.assertEqual(mic.stream.read(1), b'\0\0')
+
+
+class TestRemoteAudioClient(unittest.TestCase):
+    def test_window(self):
+        ws = mock.Mock()
+        client = RemoteAudioClient('ws://localhost:8182/audio', 'sat', None)
+        # Nothing is sent before the listener is ready
+        self.assertFalse(client.send_chunk(ws, b'\0' * 4))
+
+        client.handle_message(Message(READY_MESSAGE, {'window': 8}))
+        self.assertTrue(client.send_chunk(ws, b'\0' * 4))
+        self.assertTrue(client.send_chunk(ws, b'\0' * 4))
+        self.assertFalse(client.send_chunk(ws, b'\0' * 4))
+        client.handle_message(Message(ACK_MESSAGE, {'bytes': 4}))
+        self.assertTrue(client.send_chunk(ws, b'\0' * 4))
+        self.assertEqual(ws.send_binary.call_count, 3)
+        self.assertEqual(client.dropped, 8)
+
+
+class TestRemoteAudioConnection(unittest.TestCase):
+    def setUp(self):
+        self.listener = mock.Mock(config={'sample_rate': SAMPLE_RATE})
+        self.send = mock.Mock()
+        self.close = mock.Mock()
+        self.connection = RemoteAudioConnection(
+            self.listener, {'window': 1024}, self.send, self.close)
+        # Add the source on the calling thread
+        patcher = mock.patch(
+            'mycroft.client.speech.remote_audio.create_daemon',
+            side_effect=lambda target, args=(): target(*args))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def start(self, **data):
+        message = Message(START_MESSAGE, dict(
+            {'source_id': 'sat', 'sample_rate': SAMPLE_RATE,
+             'sample_width': 2}, **data), {'client_name': 'sat'})
+        self.connection.on_text(message.serialize())
+        return self.send.call_args[0][0] if self.send.called else None
+
+    def test_start(self):
+        reply = self.start()
+        self.assertEqual(reply.type, READY_MESSAGE)
+        self.assertEqual(reply.data, {'window': 1024})
+        source_id, mic, context = self.listener.add_source.call_args[0]
+        self.assertEqual(source_id, 'sat')
+        self.assertEqual(context, {'client_name': 'sat'})
+
+        self.connection.on_binary(b'\1\0')
+        self.assertEqual(mic.stream.read(1), b'\1\0')
+        self.connection.on_close()
+        self.listener.remove_source.assert_called_with(
+            self.listener.add_source.return_value)
+        with self.assertRaises(EOFError):
+            mic.stream.read(1)
+
+    def test_wrong_format(self):
+        reply = self.start(sample_rate=44100)
+        self.assertEqual(reply.type, ERROR_MESSAGE)
+        self.assertTrue(self.close.called)
+        self.assertFalse(self.listener.add_source.called)
+
+    def test_source_exists(self):
+        self.listener.add_source.side_effect = ValueError('exists')
+        reply = self.start()
+        self.assertEqual(reply.type, ERROR_MESSAGE)
+        self.assertTrue(self.close.called)
+
+    def test_closed_while_starting(self):
+        def add_source(source_id, mic, context):
+            self.connection.on_close()
+            return mock.Mock(source_id=source_id)
+        self.listener.add_source.side_effect = add_source
+        self.assertIsNone(self.start())
+        self.listener.remove_source.assert_called_once_with(mock.ANY)
+        mic = self.listener.add_source.call_args[0][1]
+        with self.assertRaises(EOFError):
+            mic.stream.read(1)
+
+
+class TestRemoteSource(unittest.TestCase):
+    @mock.patch('mycroft.client.speech.mic.play_wav')
+    @mock.patch('mycroft.client.speech.listener.MutableMicrophone')
+    @mock.patch('mycroft.client.speech.listener.HotWordFactory')
+    @mock.patch('mycroft.client.speech.listener.STTFactory')
+    def test_utterance(self, mock_stt_factory, mock_hotword_factory, *_):
+        mock_stt_factory.create.return_value = ToneSTT()
+        mock_hotword_factory.create_hotword.side_effect = \
+            lambda *args, **kwargs: LoudWord()
+        loop = RecognizerLoop()
+        loop.hot_word_engines = {}
+        # Only listen to the remote source
+        loop.sources = []
+        utterances = []
+        done = Event()
+
+        def handle_utterance(event):
+            utterances.append(event)
+            done.set()
+        loop.on('recognizer_loop:utterance', handle_utterance)
+        loop.start_async()
+
+        mic = RemoteMicrophone(SAMPLE_RATE, 2, 10 ** 6, mock.Mock())
+        loop.add_source('sat', mic, {'client_name': 'sat'})
+        try:
+            mic.stream.write(square_wave(2.5, 0) + square_wave(2.0, 3000) +
+                             square_wave(1.5, 0))
+            self.assertTrue(done.wait(10))
+        finally:
+            loop.stop()
+        self.assertEqual(utterances[0]['utterances'], ['tone 3'])
+        self.assertEqual(utterances[0]['source_id'], 'sat')
+        self.assertEqual(loop.get_source_context('sat'),
+                         {'client_name': 'sat'})
+        # Remote sources are closed when the loop stops
+        with self.assertRaises(EOFError):
+            mic.stream.read(1)
+
+    @mock.patch('mycroft.client.speech.listener.MutableMicrophone')
+    @mock.patch('mycroft.client.speech.listener.HotWordFactory')
+    def test_remove_source(self, mock_hotword_factory, _):
+        engines = []
+
+        def create_hotword(*args, **kwargs):
+            engine = mock.Mock(key_phrase='hey mycroft', num_phonemes=10,
+                               **{'is_streaming.return_value': True})
+            engines.append(engine)
+            return engine
+        mock_hotword_factory.create_hotword.side_effect = create_hotword
+        loop = RecognizerLoop()
+        created = len(engines)
+        mic = RemoteMicrophone(SAMPLE_RATE, 2, 1024, mock.Mock())
+        source = loop.add_source('sat', mic, {'client_name': 'sat'})
+        source_engines = engines[created:]
+        self.assertTrue(source_engines)
+        loop.remove_source(source)
+        self.assertEqual(loop.get_source_context('sat'), {})
+        # The engines of the source are stopped, not the ones of the loop
+        for engine in source_engines:
+            engine.stop.assert_called_once_with()
+        for engine in engines[:created]:
+            self.assertFalse(engine.stop.called)
+
+        # Reloading stops the engines of the sources and of the loop
+        mic = RemoteMicrophone(SAMPLE_RATE, 2, 1024, mock.Mock())
+        loop.add_source('sat', mic)
+        loop.consumer = mock.Mock()
+        with mock.patch.object(loop, '_load_config'), \
+                mock.patch.object(loop, 'start_async'):
+            loop.reload()
+        for engine in engines:
+            engine.stop.assert_called_once_with()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import unittest
+from threading import Event
+
+import mock
+from speech_recognition import AudioData, UnknownValueError
+
+from mycroft.client.speech.listener import RecognizerLoopState
+from mycroft.client.speech.stt_stream import STTStreamer
+from mycroft.stt import StreamingSTT
+
+
+class WordSTT(StreamingSTT):
+    """ Transcribes every 2 bytes of audio as a word. """
+
+    def __init__(self):
+        super(WordSTT, self).__init__()
+        self.words = []
+        self.fed = Event()
+
+    def stream_start(self, sample_rate, sample_width, language=None):
+        self.words = []
+
+    def stream_data(self, data):
+        self.words += ['word'] * (len(data) // 2)
+        self.fed.set()
+        return ' '.join(self.words)
+
+    def stream_stop(self):
+        if not self.words:
+            raise UnknownValueError()
+        return ' '.join(self.words)
+
+
+class TestSTTStreamer(unittest.TestCase):
+    def setUp(self):
+        self.emitter = mock.Mock()
+        self.state = RecognizerLoopState()
+        self.stt = WordSTT()
+        self.streamer = STTStreamer(self.stt, self.emitter, self.state)
+        self.source = mock.Mock(SAMPLE_RATE=16000, SAMPLE_WIDTH=2)
+
+    def record(self, chunks):
+        self.streamer.stream_start(self.source)
+        for chunk in chunks:
+            self.streamer.stream_chunk(chunk)
+            # Transcribed while recording
+            self.assertTrue(self.stt.fed.wait(1))
+            self.stt.fed.clear()
+        audio = AudioData(b''.join(chunks), 16000, 2)
+        self.streamer.stream_stop(audio)
+        return audio
+
+    def test_stream(self):
+        audio = self.record([b'\0\0', b'\0\0'])
+        self.assertEqual(self.streamer.pop(audio).result(1), 'word word')
+        partials = [c[0][1]['utterance']
+                    for c in self.emitter.emit.call_args_list
+                    if c[0][0] == 'recognizer_loop:partial_utterance']
+        self.assertEqual(partials, ['word', 'word word'])
+        self.assertIsNone(self.streamer.pop(audio))
+
+    def test_error(self):
+        audio = self.record([])
+        with self.assertRaises(UnknownValueError):
+            self.streamer.pop(audio).result(1)
+
+    def test_not_streamed(self):
+        self.state.sleeping = True
+        audio = self.record([])
+        self.assertIsNone(self.streamer.pop(audio))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import math
+import random
+import struct
+import unittest
+
+from mycroft.client.speech import vad
+from mycroft.client.speech.vad import EnergyVAD, FeatureVAD, VADFactory
+
+SAMPLE_RATE = 16000
+CHUNK = 1024
+SEC_PER_BUFFER = float(CHUNK) / SAMPLE_RATE
+
+
+def to_bytes(samples):
+    return struct.pack('<{}h'.format(len(samples)),
+                       *[max(-32768, min(32767, int(s))) for s in samples])
+
+
+def voiced(num_samples, amplitude=3000, start=0):
+    """ Harmonics of a 150 Hz tone, roughly like a vowel. """
+    return [amplitude * sum(math.sin(2 * math.pi * 150 * k * i / SAMPLE_RATE)
+                            / k for k in range(1, 8))
+            for i in range(start, start + num_samples)]
+
+
+def hiss(num_samples, amplitude):
+    rand = random.Random(1)
+    return [rand.gauss(0, amplitude) for _ in range(num_samples)]
+
+
+class TestEnergyVAD(unittest.TestCase):
+    def test_phrase_end(self):
+        engine = EnergyVAD({'min_silence': 0.25})
+        engine.start(SEC_PER_BUFFER, SAMPLE_RATE, 2)
+        for _ in range(10):
+            self.assertTrue(engine.update(b'', 500, 100))
+        self.assertFalse(engine.is_quiet())
+
+        quiet_chunks = 0
+        while not engine.is_quiet():
+            self.assertFalse(engine.update(b'', 50, 100))
+            quiet_chunks += 1
+        # The noise level decays before the silence is counted
+        self.assertGreater(quiet_chunks * SEC_PER_BUFFER, 0.25)
+
+    def test_factory(self):
+        self.assertIsInstance(VADFactory.create_vad(), EnergyVAD)
+        self.assertIsInstance(VADFactory.create_vad({'module': 'missing'}),
+                              EnergyVAD)
+
+
+@unittest.skipIf(vad.np is None, 'numpy not installed')
+class TestFeatureVAD(unittest.TestCase):
+    def setUp(self):
+        self.engine = FeatureVAD({'min_silence': 0.25})
+        self.engine.start(SEC_PER_BUFFER, SAMPLE_RATE, 2)
+
+    def test_classify(self):
+        speech = self.engine.classify(to_bytes(voiced(3200)), 300)
+        self.assertEqual(len(speech), 10)
+        self.assertTrue(speech.all())
+
+        self.engine.start(SEC_PER_BUFFER, SAMPLE_RATE, 2)
+        # Steady hiss louder than the threshold isn't speech
+        speech = self.engine.classify(to_bytes(hiss(3200, 600)), 300)
+        self.assertFalse(speech.any())
+
+    def test_batches(self):
+        audio = to_bytes(voiced(4000) + hiss(4000, 50))
+        whole = self.engine.classify(audio, 300)
+
+        self.engine.start(SEC_PER_BUFFER, SAMPLE_RATE, 2)
+        parts = [self.engine.classify(audio[i:i + 2 * CHUNK], 300)
+                 for i in range(0, len(audio), 2 * CHUNK)]
+        self.assertEqual([bool(s) for p in parts for s in p],
+                         [bool(s) for s in whole])
+
+    def test_phrase_end(self):
+        for i in range(5):
+            chunk = to_bytes(voiced(CHUNK, start=i * CHUNK))
+            self.assertTrue(self.engine.update(chunk, 3000, 300))
+        self.assertFalse(self.engine.is_quiet())
+
+        quiet_chunks = 0
+        while not self.engine.is_quiet():
+            self.engine.update(to_bytes(hiss(CHUNK, 50)), 50, 300)
+            quiet_chunks += 1
+        # Ends within the chunks holding the last 0.25s of frames
+        self.assertLessEqual(quiet_chunks * SEC_PER_BUFFER, 0.25 +
+                             2 * SEC_PER_BUFFER)
+
+
+if __name__ == '__main__':
+    unittest.main()
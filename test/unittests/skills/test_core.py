@@ -14,20 +14,23 @@
 # limitations under the License.
 #
 import sys
+import time
 import unittest
 
 import mock
 from adapt.intent import IntentBuilder
 from os.path import join, dirname, abspath
 from re import error
+from threading import Barrier, Thread
 from datetime import datetime
 
 from mycroft.configuration import Configuration
 from mycroft.messagebus.message import Message
 from mycroft.skills.skill_data import load_regex_from_file, load_regex, \
     load_vocab_from_file, load_vocabulary
-from mycroft.skills.core import MycroftSkill, load_skill, \
-    create_skill_descriptor, open_intent_envelope
+from mycroft.skills.core import MycroftSkill, FallbackSkill, load_skill, \
+    create_skill_descriptor, open_intent_envelope, dig_for_message, \
+    handling_message
 
 from test.util import base_config
 
@@ -481,6 +484,133 @@ class MycroftSkillTest(unittest.TestCase):
             # handler
             self.assertTrue('A:sched_handler1' not in [e[0] for e in s.events])
 
+    @mock.patch.dict(Configuration._Configuration__config, BASE_CONF)
+    def test_speak_replies_to_message(self):
+        emitter = mock.MagicMock()
+        s = SimpleSkill1()
+        s.bind(emitter)
+        s.handler = lambda: s.speak('hello')
+        s.add_event('handler1', s.handler)
+        msg = Message('handler1', context={'ident': 'abc'})
+        with mock.patch('mycroft.skills.core.report_timing'):
+            emitter.on.call_args[0][1](msg)
+        speak = [c[0][0] for c in emitter.emit.call_args_list
+                 if c[0][0].type == 'speak'][0]
+        self.assertEqual(speak.context['ident'], 'abc')
+        self.assertIsNone(dig_for_message())
+
+    def test_dig_for_message(self):
+        msg = Message('test')
+        self.assertIsNone(dig_for_message())
+        with handling_message(msg):
+            self.assertEqual(dig_for_message(), msg)
+            with handling_message(Message('inner')):
+                self.assertEqual(dig_for_message().type, 'inner')
+            self.assertEqual(dig_for_message(), msg)
+        self.assertIsNone(dig_for_message())
+
+        def handler(message):
+            return dig_for_message()
+        # Handlers registered on the emitter are found from the stack
+        self.assertEqual(handler(msg), msg)
+
+
+class ParallelFallbackTest(unittest.TestCase):
+    def setUp(self):
+        self.emitter = MockEmitter()
+        self.config = {'enabled': True, 'timeout': 0.5}
+
+    def run_tier(self, tier):
+        with mock.patch.object(FallbackSkill, 'parallel_config', self.config):
+            self.emitter.reset()
+            return FallbackSkill._run_fallback_tier(tier, Message('test'))
+
+    @mock.patch.dict(Configuration._Configuration__config, BASE_CONF)
+    def test_highest_priority_success_wins(self):
+        slow, fast = SimpleFallback(True, 0.2), SimpleFallback(True, 0)
+        winner = self.run_tier([slow.bind(self.emitter),
+                                fast.bind(self.emitter)])
+        self.assertEqual(winner.__self__, slow)
+        # Only the winner's speech reaches the bus
+        self.assertEqual(self.emitter.get_results()[-1]['utterance'],
+                         '0.2')
+        self.assertEqual(self.emitter.get_types().count('speak'), 1)
+
+    @mock.patch.dict(Configuration._Configuration__config, BASE_CONF)
+    def test_failure_and_timeout(self):
+        failing, hanging = SimpleFallback(False), SimpleFallback(True, 1)
+        working = SimpleFallback(True, 0.1)
+        winner = self.run_tier([failing.bind(self.emitter),
+                                hanging.bind(self.emitter),
+                                working.bind(self.emitter)])
+        self.assertEqual(winner.__self__, working)
+        self.assertIsNone(self.run_tier([failing.bind(self.emitter)]))
+
+    def test_priority_tiers(self):
+        handlers = {1: 'a', 5: 'b', 12: 'c', 55: 'd', 58: 'e'}
+        with mock.patch.object(FallbackSkill, 'override', False), \
+                mock.patch.object(FallbackSkill, 'fallback_handlers',
+                                  handlers):
+            self.assertEqual(FallbackSkill._fallback_tiers(),
+                             [['a', 'b'], ['c'], ['d', 'e']])
+
+    def test_ordered_tiers(self):
+        folders = {'a': 1, 'b': 2, 'c': 3, 'd': 4}
+        with mock.patch.object(FallbackSkill, 'override', True), \
+                mock.patch.object(FallbackSkill, 'order',
+                                  ['b', ['a', 'c'], 'x']), \
+                mock.patch.object(FallbackSkill, 'folders', folders):
+            self.assertEqual(FallbackSkill._fallback_tiers(),
+                             [[2], [1, 3], [4]])
+
+    def test_concurrent_registration(self):
+        handlers = []
+        for i in range(20):
+            handler = mock.Mock()
+            handler.__self__ = mock.Mock(_dir='/skills/skill-{}'.format(i))
+            handlers.append(handler)
+        barrier = Barrier(len(handlers))
+
+        def register(handler):
+            barrier.wait()
+            FallbackSkill._register_fallback(handler, 50)
+
+        with mock.patch.object(FallbackSkill, 'fallback_handlers', {}), \
+                mock.patch.object(FallbackSkill, 'folders', {}):
+            threads = [Thread(target=register, args=(h,)) for h in handlers]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            # Every handler got its own priority
+            self.assertEqual(sorted(FallbackSkill.fallback_handlers),
+                             list(range(50, 70)))
+            self.assertEqual(len(FallbackSkill.folders), 20)
+            for handler in handlers:
+                FallbackSkill.remove_fallback(handler)
+            self.assertEqual(FallbackSkill.fallback_handlers, {})
+            self.assertEqual(FallbackSkill.folders, {})
+
+
+class SimpleFallback(FallbackSkill):
+    """ Fallback answering with a delay for parallel fallback tests """
+    def __init__(self, result, delay=0):
+        super().__init__(name='SimpleFallback')
+        self.result = result
+        self.delay = delay
+
+    def bind(self, emitter):
+        super().bind(emitter)
+        return self.handle_fallback
+
+    def handle_fallback(self, message):
+        time.sleep(self.delay)
+        self.speak(str(self.delay))
+        return self.result
+
+    def stop(self):
+        pass
+
 
 class _TestSkill(MycroftSkill):
     def __init__(self):
@@ -2,14 +2,28 @@
     Test cases regarding the event scheduler.
 """
 
+import shutil
+import tempfile
+import threading
 import unittest
 import mock
 import time
 
-from mycroft.skills.event_scheduler import EventScheduler
+from os.path import join, isfile
+
+from mycroft.skills.event_scheduler import EventScheduler, ScheduleJournal
 
 
 class TestEventScheduler(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        patcher = mock.patch('mycroft.skills.event_scheduler.Configuration')
+        self.addCleanup(patcher.stop)
+        patcher.start().get.return_value = {'data_dir': self.data_dir}
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
     @mock.patch('threading.Thread')
     @mock.patch('json.load')
     @mock.patch('json.dump')
@@ -98,3 +112,121 @@ class TestEventScheduler(unittest.TestCase):
         self.assertEquals(emitter.emit.call_args[0][0].type, 'test')
         self.assertEquals(emitter.emit.call_args[0][0].data, {})
         es.shutdown()
+
+    @mock.patch('threading.Thread')
+    @mock.patch('json.load')
+    @mock.patch('json.dump')
+    @mock.patch('mycroft.skills.event_scheduler.open')
+    def test_repeat(self, mock_open, mock_dump, mock_load, mock_thread):
+        """
+            Test repeating events are scheduled again after being sent.
+        """
+        mock_load.return_value = ''
+        mock_open.return_value = mock.MagicMock()
+        emitter = mock.MagicMock()
+        es = EventScheduler(emitter)
+
+        sched_time = time.time() - 1
+        es.schedule_event('test-repeat', sched_time, 60)
+        es.check_state()
+        self.assertEqual(emitter.emit.call_args[0][0].type, 'test-repeat')
+        next_time = es.events['test-repeat'][0][0]
+        self.assertTrue(next_time > time.time() + 58)
+        self.assertEqual(es._heap[0][0], next_time)
+
+        # Removed events are skipped when their time comes up
+        emitter.reset_mock()
+        es.remove_event('test-repeat')
+        es._pop_due(next_time)
+        self.assertFalse(emitter.emit.called)
+        es.shutdown()
+
+    @mock.patch('json.load')
+    @mock.patch('json.dump')
+    @mock.patch('mycroft.skills.event_scheduler.open')
+    def test_wakeup(self, mock_open, mock_dump, mock_load):
+        """
+            Test the thread wakes up when the first event is due.
+        """
+        mock_load.return_value = ''
+        mock_open.return_value = mock.MagicMock()
+        emitter = mock.MagicMock()
+        sent = threading.Event()
+        emitter.emit.side_effect = lambda message: sent.set()
+        es = EventScheduler(emitter)
+
+        es.schedule_event('later', time.time() + 3600, None)
+        sched_time = time.time() + 0.1
+        es.schedule_event('soon', sched_time, None)
+        self.assertTrue(sent.wait(2))
+        self.assertLess(time.time() - sched_time, 0.3)
+        self.assertEqual(emitter.emit.call_args[0][0].type, 'soon')
+        es.shutdown()
+
+    def test_journal_recovery(self):
+        """
+            Test events scheduled since the last shutdown survive a crash.
+        """
+        emitter = mock.MagicMock()
+        es = EventScheduler(emitter)
+        es.schedule_event('test', 900000000000, None)
+        es.schedule_event('test-2', 900000000000, None, {'a': 1})
+        es.schedule_event('test-3', 900000000000, None)
+        es.schedule_event('test-repeat', 900000000000, 60)
+        es.remove_event('test-3')
+        es.update_event('test-2', {'a': 2})
+        es.journal.sync()
+
+        # Restart without shutting down
+        es2 = EventScheduler(emitter)
+        self.assertEqual(es2.events,
+                         {'test': [(900000000000, None, {})],
+                          'test-2': [(900000000000, None, {'a': 2})]})
+        es2.shutdown()
+        self.assertFalse(isfile(es2.journal.path))
+        es.isRunning = False
+
+    def test_journal_compaction(self):
+        """
+            Test the journal is rewritten with the current schedule.
+        """
+        journal = ScheduleJournal(join(self.data_dir, 'journal'),
+                                  compact_after=10)
+        events = {}
+        journal.compact(events)
+        for i in range(10):
+            events['test'] = [(900000000000 + i, None, {})]
+            journal.record('remove', 'test')
+            journal.record('schedule', 'test', 900000000000 + i, None, {})
+        self.assertTrue(journal.needs_compaction)
+        journal.compact(events)
+        self.assertFalse(journal.needs_compaction)
+        with open(journal.path) as f:
+            self.assertEqual(len(f.readlines()), 1)
+        self.assertEqual(journal.replay(), events)
+        journal.close()
+
+    def test_journal_sync_unlocked(self):
+        """
+            Test changes are recorded while the journal is synced.
+        """
+        journal = ScheduleJournal(join(self.data_dir, 'journal'))
+        journal.compact({})
+        syncing = threading.Event()
+        release = threading.Event()
+
+        def slow_fsync(fd):
+            syncing.set()
+            release.wait(5)
+        with mock.patch('mycroft.skills.event_scheduler.os.fsync',
+                        side_effect=slow_fsync):
+            sync = threading.Thread(target=journal.sync)
+            sync.start()
+            self.assertTrue(syncing.wait(5))
+            start = time.time()
+            journal.record('remove', 'test')
+            self.assertLess(time.time() - start, 1)
+            release.set()
+            sync.join()
+        journal.close()
+        self.assertEqual(journal.replay(), {})
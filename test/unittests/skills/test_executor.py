@@ -0,0 +1,124 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import time
+import unittest
+from threading import Event, Lock, current_thread
+
+import mock
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.core import MycroftSkill
+from mycroft.skills.executor import HandlerExecutor
+
+
+class TestHandlerExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = HandlerExecutor(workers=10, max_concurrent=2,
+                                        max_queued=2, timeout=0)
+        self.release = Event()
+        self.lock = Lock()
+        self.running = [0, 0]  # current, max
+
+    def tearDown(self):
+        self.release.set()
+        self.executor.shutdown()
+
+    def handler(self):
+        with self.lock:
+            self.running[0] += 1
+            self.running[1] = max(self.running)
+        self.release.wait(5)
+        with self.lock:
+            self.running[0] -= 1
+
+    def wait_idle(self, skill_id):
+        for _ in range(100):
+            stats = self.executor.get_stats()[skill_id]
+            if stats['running'] == 0 and stats['queued'] == 0:
+                return stats
+            time.sleep(0.02)
+        self.fail('Handlers did not finish')
+
+    def test_concurrency_limit(self):
+        results = [self.executor.submit('skill', 'handler', self.handler)
+                   for _ in range(5)]
+        # Two running, two queued, one dropped
+        self.assertEqual(results, [True, True, True, True, False])
+        # Other skills aren't affected
+        done = Event()
+        self.executor.submit('other', 'handler', done.set)
+        self.assertTrue(done.wait(1))
+
+        self.release.set()
+        stats = self.wait_idle('skill')
+        self.assertEqual(self.running[1], 2)
+        self.assertEqual(stats['completed'], 4)
+        self.assertEqual(stats['rejected'], 1)
+        self.assertGreater(stats['queue_wait_max'], 0)
+
+    def test_timeout(self):
+        self.executor.timeout = 0.1
+        self.executor.submit('skill', 'slow', self.handler)
+        self.executor.submit('skill', 'slow', self.handler)
+        self.executor.submit('skill', 'fast', lambda: None)
+        time.sleep(0.2)
+        self.executor.check_timeouts()
+        stats = self.wait_idle('skill')
+        self.assertEqual(stats['timeouts'], 2)
+        # The queued handler got to run while the slow ones still hang
+        self.assertEqual(stats['completed'], 1)
+        self.assertEqual(self.running[0], 2)
+
+    def test_queue_timeout(self):
+        self.executor.queue_timeout = 0.1
+        self.executor.submit('skill', 'slow', self.handler)
+        self.executor.submit('skill', 'slow', self.handler)
+        self.executor.submit('skill', 'outdated', lambda: None)
+        time.sleep(0.2)
+        self.release.set()
+        stats = self.wait_idle('skill')
+        self.assertEqual(stats['expired'], 1)
+
+    def test_errors(self):
+        self.executor.submit('skill', 'broken', lambda: 1 / 0)
+        self.assertEqual(self.wait_idle('skill')['errors'], 1)
+
+    def test_skill_handler(self):
+        emitter = mock.MagicMock()
+        skill = MycroftSkill(name='TestSkill')
+        skill.bind(emitter)
+        emitter.reset_mock()
+        threads = {}
+        done = Event()
+
+        def handler(message):
+            threads[message.type] = current_thread()
+            done.set()
+        skill.add_event('test.event', handler)
+        skill.add_event('mycroft.stop', handler)
+        # The last handler registered for an event is the wrapper
+        handlers = dict(c[0] for c in emitter.on.call_args_list)
+
+        with mock.patch('mycroft.skills.core.get_handler_executor',
+                        return_value=self.executor):
+            handlers['test.event'](Message('test.event'))
+            handlers['mycroft.stop'](Message('mycroft.stop'))
+        self.assertTrue(done.wait(1))
+        self.assertNotEqual(threads['test.event'], current_thread())
+        self.assertEqual(threads['mycroft.stop'], current_thread())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,8 +13,13 @@
 # limitations under the License.
 #
 import unittest
+from os.path import join
+from tempfile import mkdtemp
 
-from mycroft.skills.intent_service import ContextManager
+from adapt.intent import IntentBuilder
+
+from mycroft.skills.intent_service import ContextManager, IntentService, \
+    load_utterances
 
 
 class MockEmitter(object):
@@ -31,6 +36,9 @@ class MockEmitter(object):
     def get_results(self):
         return self.results
 
+    def on(self, event, f):
+        pass
+
     def reset(self):
         self.types = []
         self.results = []
@@ -68,5 +76,35 @@ class ContextManagerTest(unittest.TestCase):
         self.assertEqual(len(self.context_manager.frame_stack), 0)
 
 
+class IntentBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.service = IntentService(MockEmitter())
+        self.service.engine.register_entity('weather', 'WeatherKeyword')
+        self.service.engine.register_intent_parser(
+            IntentBuilder('0:WeatherIntent').require('WeatherKeyword')
+            .build())
+
+    def test_load_utterances(self):
+        path = join(mkdtemp(), 'utterances.txt')
+        with open(path, 'w') as f:
+            f.write('# comment\nwhat is the weather\n\ntell me a joke\n')
+        self.assertEqual(load_utterances(path),
+                         ['what is the weather', 'tell me a joke'])
+        self.assertEqual(load_utterances(['a', '', 'b']), ['a', 'b'])
+
+    def test_resolve_batch(self):
+        utterances = ['what is the weather', 'tell me a joke'] * 10
+        results = []
+        summary = self.service.resolve_batch(utterances, workers=3,
+                                             callback=results.append)
+        self.assertEqual([r['index'] for r in results], list(range(20)))
+        self.assertEqual(results[0]['intent_type'], '0:WeatherIntent')
+        self.assertIsNone(results[1]['intent_type'])
+        self.assertEqual(summary['total'], 20)
+        self.assertEqual(summary['matched'], 10)
+        self.assertEqual(summary['no_match_rate'], 0.5)
+        self.assertEqual(summary['intents'], {'0:WeatherIntent': 10})
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,99 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+import unittest
+from os.path import join
+from shutil import rmtree
+from tempfile import mkdtemp
+
+import mock
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.manifest import (ManifestRecorder, get_skill_hash,
+                                     load_manifest, save_manifest)
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.skill_dir = join(mkdtemp(), 'skill-test')
+        self.manifest_dir = mkdtemp()
+        os.makedirs(self.skill_dir)
+        self.write('__init__.py', 'print("hello")')
+        patcher = mock.patch('mycroft.skills.manifest.get_manifest_path',
+                             lambda name: join(self.manifest_dir, name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        rmtree(self.skill_dir)
+        rmtree(self.manifest_dir)
+
+    def write(self, name, content):
+        with open(join(self.skill_dir, name), 'w') as f:
+            f.write(content)
+
+    def test_hash(self):
+        skill_hash = get_skill_hash(self.skill_dir)
+        self.write('settings.json', '{}')
+        self.write('__init__.pyc', '')
+        self.assertEqual(get_skill_hash(self.skill_dir), skill_hash)
+        self.write('__init__.py', 'print("changed")')
+        self.assertNotEqual(get_skill_hash(self.skill_dir), skill_hash)
+
+    def test_recorder(self):
+        emitter = mock.MagicMock()
+        recorder = ManifestRecorder(emitter)
+        recorder.emit(Message('register_vocab', {'start': 'hello'}))
+        recorder.on('mycroft.stop', print)
+        recorder.on('TestIntent', print)
+        recorder.once('test.event', print)
+        recorder.stop()
+        recorder.emit(Message('speak', {'utterance': 'hi'}))
+        recorder.on('late.event', print)
+        self.assertEqual(emitter.emit.call_count, 2)
+        self.assertEqual(emitter.on.call_count, 3)
+
+        skill = mock.Mock(skill_id=3)
+        skill.name = 'TestSkill'
+        manifest = recorder.get_manifest(self.skill_dir, skill)
+        self.assertTrue(manifest['lazy'])
+        self.assertEqual(manifest['registrations'],
+                         [{'type': 'register_vocab',
+                           'data': {'start': 'hello'}}])
+        self.assertEqual(manifest['events'], ['TestIntent', 'test.event'])
+
+        save_manifest(self.skill_dir, manifest)
+        self.assertEqual(load_manifest(self.skill_dir, 3), manifest)
+        self.assertIsNone(load_manifest(self.skill_dir, 4))
+        self.write('__init__.py', 'print("changed")')
+        self.assertIsNone(load_manifest(self.skill_dir, 3))
+
+    def test_not_lazy(self):
+        emitter = mock.MagicMock()
+        recorder = ManifestRecorder(emitter, registered=True)
+        recorder.emit(Message('register_vocab', {'start': 'hello'}))
+        recorder.emit(Message('speak', {'utterance': 'hi'}))
+        # Registration was dropped
+        self.assertEqual(emitter.emit.call_count, 1)
+        skill = mock.Mock(skill_id=3)
+        skill.name = 'TestSkill'
+        manifest = recorder.get_manifest(self.skill_dir, skill)
+        self.assertFalse(manifest['lazy'])
+        save_manifest(self.skill_dir, manifest)
+        self.assertIsNone(load_manifest(self.skill_dir, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
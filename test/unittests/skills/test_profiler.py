@@ -0,0 +1,79 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import unittest
+from os.path import join, dirname, abspath
+from shutil import rmtree
+from tempfile import mkdtemp
+
+import mock
+
+from mycroft.skills.core import load_skill, create_skill_descriptor
+from mycroft.skills.profiler import (SkillLoadProfile, ProfileStore,
+                                     format_report)
+
+
+class TestSkillLoadProfile(unittest.TestCase):
+    def test_load_skill(self):
+        path = abspath(join(dirname(__file__), 'test_skill'))
+        profile = SkillLoadProfile('test_skill', path)
+        skill = load_skill(create_skill_descriptor(path), mock.MagicMock(),
+                           'test_skill', profile=profile)
+        self.assertIsNotNone(skill)
+        for phase in ['import', 'create', 'dialog', 'vocab', 'initialize',
+                      'register']:
+            self.assertIn(phase, profile.phases)
+        self.assertGreater(profile.total, 0)
+        self.assertGreaterEqual(profile.total, sum(profile.phases.values()))
+        # The data file methods are the skill's own again
+        self.assertNotIn('init_dialog', vars(skill))
+
+
+class TestProfileStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = mkdtemp()
+        self.path = join(self.tmp, 'profiles.json')
+
+    def tearDown(self):
+        rmtree(self.tmp)
+
+    def profile(self, skill_id, total):
+        return {'id': skill_id, 'time': 0, 'total': total,
+                'phases': {'import': total / 2}, 'messages': 3,
+                'rss_delta': 4096, 'thread_delta': 1, 'traced_memory': None}
+
+    def test_report(self):
+        store = ProfileStore(self.path, history_size=2)
+        store.add(self.profile('skill-a', 1.0))
+        store.add(self.profile('skill-b', 0.5))
+        store.save()
+
+        # Next boot
+        store = ProfileStore(self.path, history_size=2)
+        store.add(self.profile('skill-b', 2.0))
+        store.add(self.profile('skill-b', 1.5))
+        self.assertEqual(len(store.profiles['skill-b']), 2)
+        report = store.get_report()
+        self.assertEqual([p['id'] for p in report], ['skill-b', 'skill-a'])
+        self.assertAlmostEqual(report[0]['change'], -0.5)
+        self.assertNotIn('change', report[1])
+
+        table = format_report(report).split('\n')
+        self.assertEqual(len(table), 3)
+        self.assertTrue(table[1].startswith('skill-b'))
+        self.assertIn('-0.500', table[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,12 +13,15 @@
 # limitations under the License.
 #
 import json
+import shutil
+import tempfile
 import unittest
 
+import mock
 from os import remove
-from os.path import join, dirname
+from os.path import join, dirname, isfile
 
-from mycroft.skills.settings import SkillSettings
+from mycroft.skills.settings import SkillSettings, SettingsSyncScheduler
 
 
 class SkillSettingsTest(unittest.TestCase):
@@ -124,6 +127,88 @@ class SkillSettingsTest(unittest.TestCase):
         s.load_skill_settings_from_file()
         self.assertEqual(len(s), 1)
 
+    def test_store_only_changes(self):
+        s = SkillSettings(join(dirname(__file__), 'settings'),
+                          "test-skill-settings")
+        s.allow_overwrite = True
+        s.store()
+        self.assertFalse(isfile(s._settings_path))
+
+        s['test'] = 1
+        s.store()
+        self.assertTrue(isfile(s._settings_path))
+
+        s2 = SkillSettings(join(dirname(__file__), 'settings'),
+                           "test-skill-settings")
+        s2.allow_overwrite = True
+        s2.load_skill_settings_from_file()
+        self.assertTrue(s2._is_stored)
+        s2['test']
+        self.assertTrue(s2._is_stored)
+        del s2['test']
+        self.assertFalse(s2._is_stored)
+
+    def test_store_with_remote_list(self):
+        s = SkillSettings(join(dirname(__file__), 'settings'),
+                          "test-skill-settings")
+        s.allow_overwrite = True
+        s['names'] = ['a', 'b']
+        s._remote_settings = {'skillMetadata': {'sections': [
+            {'fields': [{'name': 'names', 'value': "['a', 'b']"}]}]}}
+        s.store()
+        # Comparing with the remote value doesn't count as a change
+        self.assertTrue(s._is_stored)
+
+
+class SettingsSyncSchedulerTest(unittest.TestCase):
+    @mock.patch('mycroft.skills.settings.is_paired')
+    def test_sync_all(self, mock_paired):
+        scheduler = SettingsSyncScheduler()
+        scheduler.start = mock.Mock()
+        fetch = mock.Mock(return_value=['settings'])
+        all_settings = [mock.Mock(), mock.Mock()]
+        for settings in all_settings:
+            scheduler.register(settings)
+            settings._poll_skill_settings.side_effect = (
+                lambda paired: scheduler.request('/path', fetch))
+
+        # Outside a pass every request goes to the backend
+        scheduler.request('/path', fetch)
+        self.assertEqual(fetch.call_count, 1)
+
+        # Within a pass the request is made once for all skills
+        with mock.patch('mycroft.skills.settings.current_thread',
+                        return_value=scheduler):
+            scheduler.sync_all()
+        self.assertEqual(fetch.call_count, 2)
+        self.assertEqual(mock_paired.call_count, 1)
+        for settings in all_settings:
+            settings._poll_skill_settings.assert_called_once_with(
+                mock_paired.return_value)
+
+        scheduler.unregister(all_settings[0])
+        self.assertEqual(list(scheduler._settings.values()),
+                         [all_settings[1]])
+
+    @mock.patch('mycroft.skills.settings.is_paired', return_value=True)
+    def test_register_skill_settings(self, _):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with open(join(directory, 'settingsmeta.json'), 'w') as f:
+            json.dump({'skillMetadata': {'sections': []}}, f)
+        scheduler = SettingsSyncScheduler()
+        scheduler.start = mock.Mock()
+        with mock.patch('mycroft.skills.settings.get_sync_scheduler',
+                        return_value=scheduler), \
+                mock.patch.object(SkillSettings,
+                                  'initialize_remote_settings') as init:
+            s = SkillSettings(directory, 'test-skill-settings')
+            # The first sync is done before the skill is initialized
+            init.assert_called_once_with()
+            self.assertEqual(list(scheduler._settings.values()), [s])
+            s.stop_polling()
+        self.assertEqual(len(scheduler._settings), 0)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,188 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+import time
+import unittest
+from os.path import join
+from shutil import rmtree
+from tempfile import mkdtemp
+from threading import Lock
+
+import mock
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.main import SkillManager
+
+
+class TestSkillManager(unittest.TestCase):
+    def setUp(self):
+        self.skills_dir = mkdtemp()
+        self.skill_paths = []
+        for i in range(6):
+            path = join(self.skills_dir, 'skill-{}'.format(i))
+            os.makedirs(path)
+            with open(join(path, '__init__.py'), 'w') as f:
+                f.write('')
+            self.skill_paths.append(path)
+        msm = mock.MagicMock()
+        msm.skills_dir = self.skills_dir
+        with mock.patch.object(SkillManager, 'create_msm',
+                               return_value=msm):
+            self.manager = SkillManager(mock.MagicMock())
+
+    def tearDown(self):
+        rmtree(self.skills_dir)
+
+    @mock.patch('mycroft.skills.main.load_skill')
+    def test_parallel_load(self, mock_load_skill):
+        lock = Lock()
+        running = [0, 0]  # current, max
+
+        def load_skill(*args, **kwargs):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.1)
+            with lock:
+                running[0] -= 1
+            return mock.MagicMock()
+        mock_load_skill.side_effect = load_skill
+
+        self.assertTrue(self.manager._load_or_reload_skills(
+            self.skill_paths))
+        self.assertGreater(running[1], 1)
+        self.assertEqual(sorted(self.manager.get_load_times()),
+                         ['skill-{}'.format(i) for i in range(6)])
+        self.assertTrue(all(t >= 0.1 for t in
+                            self.manager.get_load_times().values()))
+        # Nothing changed on disk, nothing to load
+        self.assertFalse(self.manager._load_or_reload_skills(
+            self.skill_paths))
+
+    @mock.patch('mycroft.skills.main.load_skill')
+    @mock.patch('mycroft.skills.main.load_manifest')
+    def test_lazy_load(self, mock_load_manifest, mock_load_skill):
+        mock_load_manifest.return_value = {
+            'name': 'TestSkill',
+            'registrations': [{'type': 'register_vocab',
+                               'data': {'start': 'hello'}}],
+            'events': ['TestIntent']
+        }
+        skill_handler = mock.Mock()
+        self.manager.ws.emitter.listeners.side_effect = [[], [skill_handler]]
+        path = self.skill_paths[0]
+        lazy_config = {'lazy_loading': {'enabled': True}}
+        with mock.patch.dict('mycroft.skills.main.skills_config',
+                             lazy_config):
+            self.assertTrue(self.manager._load_or_reload_skills([path]))
+        self.assertFalse(mock_load_skill.called)
+        emitted = [c[0][0].type for c in self.manager.ws.emit.call_args_list]
+        self.assertEqual(emitted, ['register_vocab', 'mycroft.skills.loaded'])
+        event, stub = self.manager.ws.on.call_args[0]
+        self.assertEqual(event, 'TestIntent')
+
+        # First use loads the skill and passes on the message
+        message = Message('TestIntent', {})
+        stub(message)
+        stub(message)
+        self.assertEqual(mock_load_skill.call_count, 1)
+        self.assertTrue(mock_load_skill.call_args[1]['registered'])
+        self.manager.ws.remove.assert_called_once_with('TestIntent', stub)
+        skill_handler.assert_called_once_with(message)
+        self.assertIsNotNone(self.manager.loaded_skills[path]['instance'])
+
+    @mock.patch('mycroft.skills.main.load_skill')
+    @mock.patch('mycroft.skills.main.load_manifest')
+    def test_lazy_reload(self, mock_load_manifest, mock_load_skill):
+        mock_load_manifest.return_value = {
+            'name': 'TestSkill',
+            'registrations': [],
+            'events': ['TestIntent']
+        }
+        path = self.skill_paths[0]
+        lazy_config = {'lazy_loading': {'enabled': True}}
+        with mock.patch.dict('mycroft.skills.main.skills_config',
+                             lazy_config):
+            self.assertTrue(self.manager._load_or_reload_skill(path))
+            self.manager.ws.emit.reset_mock()
+            # The skill changed on disk
+            self.manager.loaded_skills[path]['last_modified'] = 0
+            self.assertTrue(self.manager._load_or_reload_skill(path))
+        self.assertFalse(mock_load_skill.called)
+        messages = [c[0][0] for c in self.manager.ws.emit.call_args_list]
+        self.assertEqual([m.type for m in messages],
+                         ['detach_skill', 'mycroft.skills.shutdown',
+                          'mycroft.skills.loaded'])
+        self.assertEqual(messages[0].data, {'skill_id': 'skill-0:'})
+
+    @mock.patch('mycroft.skills.main.load_skill')
+    def test_isolated_load(self, mock_load_skill):
+        self.manager.supervisor = mock.Mock()
+        self.manager.supervisor.load_skill.return_value = 'skill-0'
+        path = self.skill_paths[0]
+        self.assertTrue(self.manager._load_or_reload_skill(path))
+        self.assertFalse(mock_load_skill.called)
+        self.assertEqual(self.manager.loaded_skills[path]['host'], 'skill-0')
+
+        self.manager.deactivate_skill(Message('skillmanager.deactivate',
+                                              {'skill': path}))
+        self.manager.supervisor.unload_skill.assert_called_once_with(path)
+
+        # Fallback skills are run in the skills service
+        self.manager.loaded_skills[path]['active'] = True
+        self.manager._skill_rejected(path)
+        self.assertTrue(self.manager._load_or_reload_skill(path))
+        self.assertTrue(mock_load_skill.called)
+
+    @mock.patch('mycroft.skills.main.load_manifest')
+    def test_idle_unload(self, mock_load_manifest):
+        mock_load_manifest.return_value = {
+            'name': 'TestSkill',
+            'registrations': [{'type': 'register_vocab',
+                               'data': {'start': 'hello'}}],
+            'events': ['TestIntent']
+        }
+        busy, idle, scheduled = [mock.Mock(last_used=time.time() - t)
+                                 for t in (10, 7200, 7200)]
+        busy.events = idle.events = [('TestIntent', None),
+                                     ('mycroft.stop', None)]
+        scheduled.events = [('TestIntent', None), ('skill-2:alarm', None)]
+        for path, instance in zip(self.skill_paths, [busy, idle, scheduled]):
+            self.manager.loaded_skills[path] = {
+                'id': os.path.basename(path), 'path': path,
+                'instance': instance, 'loaded': True}
+
+        self.manager.unload_idle_skills()
+        self.assertFalse(busy._shutdown.called)
+        self.assertFalse(scheduled._shutdown.called)
+        idle._shutdown.assert_called_once_with(detach=False)
+
+        skill = self.manager.loaded_skills[self.skill_paths[1]]
+        self.assertNotIn('instance', skill)
+        self.assertEqual(skill['unloads'], 1)
+        # Intents stay registered, a stub loads the skill on use
+        emitted = [c[0][0].type for c in self.manager.ws.emit.call_args_list]
+        self.assertEqual(emitted, ['mycroft.skills.unloaded'])
+        self.assertEqual(self.manager.ws.on.call_args[0][0], 'TestIntent')
+
+        report = self.manager.get_memory_report()
+        states = {s['id']: s['state'] for s in report['skills']}
+        self.assertEqual(states, {'skill-0': 'loaded', 'skill-1': 'unloaded',
+                                  'skill-2': 'loaded'})
+        self.assertEqual(report['reclaimed'], skill['reclaimed'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import unittest
+
+import mock
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.core import FallbackSkill
+from mycroft.skills.host import SkillHost
+from mycroft.skills.supervisor import SkillSupervisor
+
+
+class MockProcess(object):
+    pid = 1234
+
+    def __init__(self, *args, **kwargs):
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def send_signal(self, sig):
+        self.returncode = 0
+
+    def wait(self, timeout=None):
+        return self.returncode
+
+
+@mock.patch('mycroft.skills.supervisor.psutil')
+@mock.patch('mycroft.skills.supervisor.subprocess.Popen', MockProcess)
+class TestSkillSupervisor(unittest.TestCase):
+    def setUp(self):
+        self.ws = mock.MagicMock()
+
+    def emitted(self, msg_type):
+        return [c[0][0].data for c in self.ws.emit.call_args_list
+                if c[0][0].type == msg_type]
+
+    def test_host_per_skill(self, mock_psutil):
+        supervisor = SkillSupervisor(self.ws, {})
+        self.assertEqual(supervisor.load_skill('/skills/skill-a'), 'skill-a')
+        self.assertEqual(supervisor.load_skill('/skills/skill-b'), 'skill-b')
+        self.assertTrue(supervisor.hosts['skill-a'].is_running)
+
+        supervisor.handle_ready(Message('skill_host.ready',
+                                        {'host': 'skill-a'}))
+        self.assertEqual(self.emitted('skill_host.load'),
+                         [{'host': 'skill-a', 'path': '/skills/skill-a'}])
+
+        # Last skill unloaded stops the host
+        supervisor.unload_skill('/skills/skill-a')
+        self.assertFalse(supervisor.hosts['skill-a'].is_running)
+
+    def test_pool(self, mock_psutil):
+        supervisor = SkillSupervisor(self.ws, {'pool_size': 2})
+        hosts = [supervisor.load_skill('/skills/skill-{}'.format(i))
+                 for i in range(4)]
+        self.assertEqual(sorted(hosts),
+                         ['host-0', 'host-0', 'host-1', 'host-1'])
+        supervisor.handle_ready(Message('skill_host.ready',
+                                        {'host': 'host-0'}))
+        skill = sorted(supervisor.hosts['host-0'].skills)[0]
+        supervisor.unload_skill(skill)
+        self.assertEqual(self.emitted('skill_host.unload'),
+                         [{'host': 'host-0', 'path': skill}])
+        self.assertTrue(supervisor.hosts['host-0'].is_running)
+
+    def test_restart(self, mock_psutil):
+        supervisor = SkillSupervisor(self.ws, {'max_restarts': 2})
+        supervisor.load_skill('/skills/skill-a')
+        host = supervisor.hosts['skill-a']
+        for i in range(3):
+            host.process.returncode = -11
+            supervisor.check_hosts()
+        self.assertEqual(len(host.restarts), 2)
+        self.assertEqual(len(self.emitted('detach_skill')), 3)
+        self.assertTrue(host.failed)
+        self.assertEqual(self.emitted('skill_host.failed'),
+                         [{'host': 'skill-a',
+                           'skills': ['/skills/skill-a']}])
+
+    def test_rss_limit(self, mock_psutil):
+        supervisor = SkillSupervisor(self.ws, {'rss_limit_mb': 100})
+        supervisor.load_skill('/skills/skill-a')
+        host = supervisor.hosts['skill-a']
+        ps = mock_psutil.Process.return_value
+        ps.memory_info.return_value.rss = 50 * 1024 * 1024
+        ps.cpu_times.return_value.user = 1.5
+        supervisor.check_hosts()
+        self.assertEqual(len(host.restarts), 0)
+        self.assertEqual(supervisor.get_stats()[0]['cpu_user'], 1.5)
+
+        ps.memory_info.return_value.rss = 150 * 1024 * 1024
+        supervisor.check_hosts()
+        self.assertEqual(len(host.restarts), 1)
+        self.assertTrue(host.is_running)
+
+    def test_rejected(self, mock_psutil):
+        rejected = []
+        supervisor = SkillSupervisor(self.ws, {}, rejected.append)
+        supervisor.load_skill('/skills/fallback-a')
+        supervisor.handle_rejected(Message('skill_host.rejected',
+                                           {'path': '/skills/fallback-a'}))
+        self.assertEqual(rejected, ['/skills/fallback-a'])
+        self.assertFalse(supervisor.hosts['fallback-a'].is_running)
+
+
+class TestSkillHost(unittest.TestCase):
+    @mock.patch('mycroft.skills.host.create_skill_descriptor')
+    @mock.patch('mycroft.skills.host.load_skill')
+    def test_load(self, mock_load_skill, _):
+        ws = mock.MagicMock()
+        host = SkillHost('host-0', ws)
+        host.handle_load(Message('skill_host.load',
+                                 {'host': 'host-1', 'path': '/skills/a'}))
+        self.assertFalse(mock_load_skill.called)
+
+        mock_load_skill.return_value = mock.Mock(skill_id='a')
+        host.handle_load(Message('skill_host.load',
+                                 {'host': 'host-0', 'path': '/skills/a'}))
+        self.assertEqual(ws.emit.call_args[0][0].type,
+                         'mycroft.skills.loaded')
+
+        fallback = mock.Mock(spec=FallbackSkill)
+        mock_load_skill.return_value = fallback
+        host.load_skill('/skills/fallback')
+        self.assertTrue(fallback._shutdown.called)
+        self.assertEqual(ws.emit.call_args[0][0].type, 'skill_host.rejected')
+        self.assertEqual(list(host.skills), ['/skills/a'])
+
+        host.shutdown()
+        self.assertEqual(ws.emit.call_args[0][0].type,
+                         'mycroft.skills.shutdown')
+        self.assertEqual(host.skills, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+# Copyright 2017 Mycroft AI Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import os
+import time
+import unittest
+from os.path import join
+from shutil import rmtree
+from tempfile import mkdtemp
+
+import mock
+
+from mycroft.skills.watcher import SkillWatcher, is_ignored
+
+
+class TestSkillWatcher(unittest.TestCase):
+    def setUp(self):
+        self.skills_dir = mkdtemp()
+        for skill in ['skill-a', 'skill-b']:
+            os.makedirs(join(self.skills_dir, skill))
+            self.write(skill, '__init__.py')
+        self.changed = []
+
+    def tearDown(self):
+        rmtree(self.skills_dir)
+
+    def write(self, skill, name):
+        with open(join(self.skills_dir, skill, name), 'w') as f:
+            f.write(str(time.time()))
+
+    def test_ignored(self):
+        self.assertTrue(is_ignored('skill-a/__init__.pyc'))
+        self.assertTrue(is_ignored('skill-a/settings.json'))
+        self.assertTrue(is_ignored('skill-a/.git/HEAD'))
+        self.assertTrue(is_ignored('skill-a/__pycache__/x.py'))
+        self.assertFalse(is_ignored('skill-a/vocab/en-us/a.voc'))
+
+    def test_debounce(self):
+        watcher = SkillWatcher(self.skills_dir, self.changed.append,
+                               debounce=60)
+        for name in ['__init__.py', 'a.voc', 'settings.json', 'x.pyc']:
+            watcher.file_changed(join(self.skills_dir, 'skill-a', name))
+        watcher.file_changed(join(self.skills_dir, 'skill-b', '.hidden'))
+        self.assertEqual(watcher._pop_settled(), [])
+        watcher.debounce = 0
+        self.assertEqual(watcher._pop_settled(),
+                         [join(self.skills_dir, 'skill-a')])
+        self.assertEqual(watcher._pop_settled(), [])
+
+    def test_watch(self):
+        watcher = SkillWatcher(self.skills_dir, self.changed.append,
+                               debounce=0.1)
+        watcher.start()
+        try:
+            if not watcher.is_watching:
+                self.skipTest('File system events not available')
+            self.write('skill-b', 'a.voc')
+            self.write('skill-b', 'b.voc')
+            self.write('skill-a', 'settings.json')
+            time.sleep(1.5)
+        finally:
+            watcher.stop()
+        self.assertEqual(self.changed, [join(self.skills_dir, 'skill-b')])
+
+    @mock.patch('mycroft.skills.watcher.Observer', None)
+    def test_poll(self):
+        watcher = SkillWatcher(self.skills_dir, self.changed.append,
+                               poll_interval=0.1)
+        watcher.start()
+        try:
+            self.assertFalse(watcher.is_watching)
+            time.sleep(0.3)
+            self.assertEqual(self.changed, [])
+            future = time.time() + 10
+            path = join(self.skills_dir, 'skill-a', '__init__.py')
+            os.utime(path, (future, future))
+            time.sleep(0.5)
+        finally:
+            watcher.stop()
+        self.assertEqual(self.changed, [join(self.skills_dir, 'skill-a')])
+
+
+if __name__ == '__main__':
+    unittest.main()
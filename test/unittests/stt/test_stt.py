@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import time
 import unittest
 
 import mock
@@ -22,6 +23,18 @@ from mycroft.configuration import Configuration
 from test.util import base_config
 
 
+class DelayedSTT(mycroft.stt.STT):
+    def execute(self, audio, language=None):
+        time.sleep(self.config.get('delay', 0))
+        if 'error' in self.config:
+            raise ConnectionError(self.config['error'])
+        return self.config['text']
+
+
+ENGINES = {name: type(name, (DelayedSTT,), {})
+           for name in ['remote', 'local']}
+
+
 class TestSTT(unittest.TestCase):
     @mock.patch.object(Configuration, 'get')
     def test_factory(self, mock_get):
@@ -268,3 +281,65 @@ class TestSTT(unittest.TestCase):
         stt = mycroft.stt.HoundifySTT()
         stt.execute(audio)
         self.assertTrue(stt.recognizer.recognize_houndify.called)
+
+    @mock.patch('mycroft.stt.pocketsphinx_stt.PS_Recognizer')
+    @mock.patch.object(Configuration, 'get')
+    def test_pocketsphinx_stream(self, mock_get, mock_recognizer):
+        config = base_config()
+        config.merge({'stt': {'module': 'pocketsphinx'}, 'lang': 'en-US'})
+        mock_get.return_value = config
+
+        stt = mycroft.stt.PocketSphinxSTT()
+        recognizer = mock_recognizer.return_value
+        recognizer.process.return_value = 'hello'
+        recognizer.end_utterance.return_value = 'hello world'
+
+        # 8 kHz audio is resampled for the decoder
+        stt.stream_start(8000, 2)
+        self.assertEqual(stt.stream_data(b'\0\0' * 800), 'hello')
+        self.assertAlmostEqual(len(recognizer.process.call_args[0][0]), 3200,
+                               delta=4)
+        self.assertEqual(stt.stream_stop(), 'hello world')
+        self.assertTrue(recognizer.start_utterance.called)
+
+
+@mock.patch.dict(mycroft.stt.STTFactory.CLASSES, ENGINES)
+@mock.patch.object(Configuration, 'get')
+class TestCompositeSTT(unittest.TestCase):
+    def create(self, mock_get, remote, local):
+        config = base_config()
+        config.merge({'stt': {'module': 'composite',
+                              'composite': {'engines': ['remote', 'local'],
+                                            'patience': 0.2,
+                                            'deadline': 1.0},
+                              'remote': remote, 'local': local},
+                      'lang': 'en-US'})
+        mock_get.return_value = config
+        return mycroft.stt.STTFactory.create()
+
+    def test_preferred(self, mock_get):
+        stt = self.create(mock_get, {'text': 'remote', 'delay': 0.1},
+                          {'text': 'local'})
+        self.assertEqual(stt.execute(mock.Mock()), 'remote')
+        stats = stt.get_stats()
+        self.assertEqual(stats['remote']['wins'], 1)
+        self.assertEqual(stats['local']['calls'], 1)
+
+    def test_slow_preferred(self, mock_get):
+        stt = self.create(mock_get, {'text': 'remote', 'delay': 0.5},
+                          {'text': 'local'})
+        self.assertEqual(stt.execute(mock.Mock()), 'local')
+        self.assertEqual(stt.get_stats()['remote']['abandoned'], 1)
+        # Still busy with the last phrase
+        self.assertEqual(stt.execute(mock.Mock()), 'local')
+        self.assertEqual(stt.get_stats()['remote']['busy'], 1)
+
+    def test_errors(self, mock_get):
+        stt = self.create(mock_get, {'error': 'down'}, {'text': 'local'})
+        self.assertEqual(stt.execute(mock.Mock()), 'local')
+        self.assertEqual(stt.get_stats()['remote']['error_rate'], 1.0)
+
+        stt = self.create(mock_get, {'error': 'down'}, {'error': 'failed'})
+        with self.assertRaises(ConnectionError) as ctx:
+            stt.execute(mock.Mock())
+        self.assertEqual(str(ctx.exception), 'down')
@@ -12,12 +12,32 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import os
+import time
 import unittest
+
+import mock
 from shutil import rmtree
+from threading import Thread
 
 from os.path import exists, isfile
 
 from mycroft.util import create_signal, check_for_signal
+from mycroft.util.signal import SignalRegistry
+
+
+class FakeBus(object):
+    """ Delivers messages to all handlers right away. """
+
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, msg_type, handler):
+        self.handlers.setdefault(msg_type, []).append(handler)
+
+    def emit(self, message):
+        for handler in self.handlers.get(message.type, []):
+            handler(message)
 
 
 class TestSignals(unittest.TestCase):
@@ -42,5 +62,73 @@ class TestSignals(unittest.TestCase):
         self.assertFalse(isfile('/tmp/mycroft/ipc/signal/test_signal'))
 
 
+class TestSignalRegistry(unittest.TestCase):
+    def setUp(self):
+        if exists('/tmp/mycroft'):
+            rmtree('/tmp/mycroft')
+        bus = FakeBus()
+        self.registry = SignalRegistry()
+        self.registry.bind(bus)
+        self.other = SignalRegistry()
+        self.other.bind(bus)
+
+    def test_single_use(self):
+        self.assertTrue(self.registry.create('test_signal'))
+        self.assertTrue(isfile('/tmp/mycroft/ipc/signal/test_signal'))
+        # Seen by the other process, consuming it removes it everywhere
+        self.assertTrue(self.other.check('test_signal'))
+        self.assertFalse(self.registry.check('test_signal'))
+        self.assertFalse(isfile('/tmp/mycroft/ipc/signal/test_signal'))
+
+    def test_consumed_once(self):
+        # Both processes see the signal before the removal is announced
+        bus = FakeBus()
+        registries = [SignalRegistry(), SignalRegistry()]
+        for registry in registries:
+            registry.bind(bus)
+        registries[0].create('test_signal')
+        bus.handlers.clear()
+        self.assertEqual([r.check('test_signal') for r in registries],
+                         [True, False])
+        self.assertFalse(registries[1].check('test_signal', -1))
+
+    def test_lifetime(self):
+        self.registry.create('test_signal')
+        self.assertTrue(self.other.check('test_signal', -1))
+        self.assertTrue(self.other.check('test_signal', 10))
+        with mock.patch('mycroft.util.signal.time') as mock_time:
+            mock_time.time.return_value = time.time() + 20
+            self.assertFalse(self.other.check('test_signal', 10))
+        self.assertFalse(self.registry.check('test_signal', -1))
+
+    def test_existing_signal(self):
+        create_signal('test_signal')
+        registry = SignalRegistry()
+        registry.bind(FakeBus())
+        self.assertTrue(registry.check('test_signal', -1))
+
+    def test_wait_while(self):
+        self.registry.create('test_signal')
+        self.assertFalse(self.other.wait_while('test_signal', 0.05))
+
+        def consume():
+            time.sleep(0.1)
+            self.registry.check('test_signal')
+        Thread(target=consume).start()
+        self.assertTrue(self.other.wait_while('test_signal', 5))
+
+    def test_wait_while_removed_file(self):
+        self.registry.create('test_signal')
+        self.other.FILE_CHECK_INTERVAL = 0.05
+
+        def remove_file():
+            time.sleep(0.1)
+            # Removed by a process which isn't connected to the bus
+            os.remove('/tmp/mycroft/ipc/signal/test_signal')
+        Thread(target=remove_file).start()
+        self.assertTrue(self.other.wait_while('test_signal', 5))
+        self.assertFalse(self.other.check('test_signal', -1))
+
+
 if __name__ == "__main__":
     unittest.main()